@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Trained models are written by `manage.py train_models` into versioned folders:
+#   artifacts/<name>/<version>/<files...> + manifest.json
+#   artifacts/<name>/LATEST  -> version the API loads by default
+ARTIFACTS_DIR = Path(os.environ.get("FRAUDLENS_ARTIFACTS_DIR", Path(__file__).resolve().parent / "artifacts"))
+
+# When no artifact has been exported yet, model modules fall back to training in-process.
+# `train_models` turns this off so importing a module never trains it twice.
+AUTO_TRAIN = os.environ.get("FRAUDLENS_AUTO_TRAIN", "1") == "1"
+
+MANIFEST = "manifest.json"
+LATEST = "LATEST"
+
+
+class ArtifactError(Exception):
+    pass
+
+
+class ArtifactNotFound(ArtifactError):
+    pass
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def new_version():
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+class Artifact:
+    def __init__(self, name, version, directory, manifest):
+        self.name = name
+        self.version = version
+        self.directory = directory
+        self.manifest = manifest
+
+    @property
+    def metadata(self):
+        return self.manifest.get("metadata", {})
+
+    def path(self, filename):
+        if filename not in self.manifest["files"]:
+            raise ArtifactError(f"'{filename}' is not part of artifact {self.name}@{self.version}")
+        return self.directory / filename
+
+    def verify(self):
+        for filename, expected in self.manifest["files"].items():
+            actual = sha256_file(self.directory / filename)
+            if actual != expected:
+                raise ArtifactError(f"Checksum mismatch for {self.name}@{self.version}/{filename}")
+
+
+def save_artifact(name, writers, metadata=None, root=None):
+    """Write a new version of artifact `name`.
+
+    `writers` maps each filename to a callable that writes that file given its path.
+    The version only becomes LATEST once every file and the manifest are on disk.
+    """
+    root = Path(root or ARTIFACTS_DIR) / name
+    version = new_version()
+    tmp_dir = root / f".{version}.tmp"
+    tmp_dir.mkdir(parents=True)
+    try:
+        files = {}
+        for filename, write in writers.items():
+            write(str(tmp_dir / filename))
+            files[filename] = sha256_file(tmp_dir / filename)
+        manifest = {
+            "name": name,
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "files": files,
+            "metadata": metadata or {},
+        }
+        with open(tmp_dir / MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+        tmp_dir.rename(root / version)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    latest_tmp = root / f".{LATEST}.tmp"
+    latest_tmp.write_text(version)
+    os.replace(latest_tmp, root / LATEST)
+    return version
+
+
+def latest_version(name, root=None):
+    latest = Path(root or ARTIFACTS_DIR) / name / LATEST
+    if not latest.exists():
+        raise ArtifactNotFound(f"No trained artifact for '{name}'. Run `python manage.py train_models`.")
+    return latest.read_text().strip()
+
+
+def load_artifact(name, version=None, verify=True, root=None):
+    version = version or latest_version(name, root)
+    directory = Path(root or ARTIFACTS_DIR) / name / version
+    if not (directory / MANIFEST).exists():
+        raise ArtifactNotFound(f"Artifact {name}@{version} does not exist in {directory.parent}")
+    with open(directory / MANIFEST) as f:
+        manifest = json.load(f)
+    artifact = Artifact(name, version, directory, manifest)
+    if verify:
+        artifact.verify()
+    return artifact
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+
+class CategoricalCodec:
+    """Category -> code for every label-encoded column, built once from the fitted
+    LabelEncoders' classes. Codes match LabelEncoder.transform(): the position in the
+    sorted classes. A scalar is one dict lookup instead of a scan of classes_ plus a
+    transform() call; a column is one hash-based get_indexer(). Categories the model never
+    saw (and unhashable values) get `unknown`."""
+
+    __slots__ = ("classes", "codes", "indexes", "unknown")
+
+    def __init__(self, classes, unknown=-1):
+        self.classes = {col: list(values) for col, values in classes.items()}
+        self.codes = {col: {value: code for code, value in enumerate(values)} for col, values in self.classes.items()}
+        self.indexes = {col: pd.Index(values, dtype=object) for col, values in self.classes.items()}
+        self.unknown = unknown
+
+    @classmethod
+    def from_encoders(cls, label_encoders, unknown=-1):
+        return cls({col: le.classes_.tolist() for col, le in label_encoders.items()}, unknown)
+
+    @property
+    def columns(self):
+        return self.codes.keys()
+
+    def encode(self, col, value):
+        try:
+            return self.codes[col].get(value, self.unknown)
+        except TypeError:  # unhashable, e.g. a list: not a category
+            return self.unknown
+
+    def encode_column(self, col, values):
+        if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+            # Look up each distinct category once, then gather by the column's own codes
+            category_codes = self.indexes[col].get_indexer(pd.Index(values.cat.categories, dtype=object))
+            value_codes = values.cat.codes.to_numpy()
+            codes = np.where(value_codes >= 0, category_codes[value_codes], -1)
+        else:
+            codes = self.indexes[col].get_indexer(pd.Index(values, dtype=object))
+        if self.unknown != -1:
+            codes[codes == -1] = self.unknown
+        return codes
+
+    # Stored with the model as {column: [classes in code order]}
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.classes, f)
+
+    @classmethod
+    def load(cls, path, unknown=-1):
+        with open(path) as f:
+            return cls(json.load(f), unknown)
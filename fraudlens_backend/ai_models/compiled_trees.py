@@ -0,0 +1,231 @@
+import ctypes
+import ctypes.util
+import json
+import math
+import os
+
+import numpy as np
+
+# Optional inference backend for the tree models. A trained XGBoost / LightGBM ensemble is
+# flattened into node arrays (feature, threshold, children, leaf value) and scored with
+# NumPy for batches and a plain Python loop for single rows, skipping DMatrix/DataFrame
+# construction and the native dispatch. Arithmetic follows each library (float32 and
+# `x < t` for XGBoost, float64 and `x <= t` for LightGBM) so scores match predict_proba
+# bit for bit; benchmarks/bench_compiled_trees.py checks that.
+ENABLED = os.environ.get("FRAUDLENS_COMPILED_TREES", "0") == "1"
+
+# The single-row loop beats XGBoost's predict_proba up to a handful of rows; past that
+# the native batch kernel wins. For the 800-tree fraud model the native predictor on a
+# float64 array is faster even for one row, so only the trust models use this backend.
+ROW_LOOP_LIMIT = 4
+
+# Missing-value handling per split node
+MISSING_AS_ZERO = 0  # NaN is scored as 0.0 (LightGBM missing_type None)
+MISSING_ZERO = 1  # 0.0 and NaN take the default branch (LightGBM missing_type Zero)
+MISSING_NAN = 2  # NaN takes the default branch (XGBoost, LightGBM missing_type NaN)
+LIGHTGBM_MISSING = {"None": MISSING_AS_ZERO, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+LIGHTGBM_ZERO_THRESHOLD = 1e-35
+
+BLOCK_ROWS = 2048  # rows scored at once; bounds the (rows x trees) work arrays
+
+
+# XGBoost's sigmoid calls the C library's expf, which is not always the correctly rounded
+# float32(exp(x)) and so differs from NumPy in the last bit for some margins. Use the same
+# function where the C library can be loaded.
+def _load_expf():
+    try:
+        libm = ctypes.CDLL(ctypes.util.find_library("m") or "libm.so.6")
+        expf = libm.expf
+    except (OSError, AttributeError):
+        return lambda x: np.float32(math.exp(x))
+    expf.restype = ctypes.c_float
+    expf.argtypes = [ctypes.c_float]
+    return expf
+
+_expf = _load_expf()
+
+
+def xgboost_sigmoid(margins):
+    one = np.float32(1)
+    exps = np.array([_expf(min(-m, 88.7)) for m in margins], dtype=np.float32)
+    return one / (exps + one)
+
+# LightGBM's sigmoid is double precision std::exp, i.e. math.exp (NumPy's SIMD exp can
+# round differently)
+def lightgbm_sigmoid(margins):
+    return np.array([1.0 / (1.0 + math.exp(-m)) for m in margins], dtype=np.float64)
+
+
+class CompiledEnsemble:
+    """Binary-logistic tree ensemble stored as flat node arrays.
+
+    Leaves have feature -1 and point to themselves, so every row can be walked
+    max_depth steps in lockstep.
+    """
+
+    __slots__ = ("feature", "threshold", "left", "right", "value", "default_left", "missing",
+                 "roots", "max_depth", "base_margin", "dtype", "inclusive", "sigmoid", "_nodes",
+                 "_split_at", "_zero_is_missing")
+
+    def __init__(self, nodes, roots, max_depth, base_margin, dtype, inclusive, sigmoid):
+        feature, threshold, left, right, value, default_left, missing = zip(*nodes)
+        self.dtype = np.dtype(dtype)
+        self.feature = np.array(feature, dtype=np.int32)
+        self.threshold = np.array(threshold, dtype=self.dtype)
+        self.left = np.array(left, dtype=np.int32)
+        self.right = np.array(right, dtype=np.int32)
+        self.value = np.array(value, dtype=self.dtype)
+        self.default_left = np.array(default_left, dtype=bool)
+        self.missing = np.array(missing, dtype=np.int8)
+        self.roots = np.array(roots, dtype=np.int32)
+        self.max_depth = max_depth
+        self.base_margin = self.dtype.type(base_margin)
+        self.inclusive = inclusive  # LightGBM goes left on x <= threshold, XGBoost on x < threshold
+        self.sigmoid = sigmoid
+        # Plain lists (with thresholds already rounded to dtype) for the single-row loop
+        self._nodes = (self.feature.tolist(), self.threshold.tolist(), self.left.tolist(),
+                       self.right.tolist(), self.value.tolist(), self.default_left.tolist(),
+                       self.missing.tolist())
+        # For rows without NaN every split becomes `x <= split_at`: on dtype values x < t is
+        # the same test as x <= (largest value below t)
+        split_at = self.threshold if inclusive else np.nextafter(self.threshold, self.dtype.type(-np.inf))
+        self._split_at = split_at.tolist()
+        self._zero_is_missing = bool((self.missing == MISSING_ZERO).any())
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def _go_left(self, x, nodes):
+        threshold = self.threshold[nodes]
+        missing = self.missing[nodes]
+        is_nan = np.isnan(x)
+        x = np.where(is_nan & (missing != MISSING_NAN), 0, x)
+        is_missing = np.where(missing == MISSING_ZERO, np.abs(x) <= LIGHTGBM_ZERO_THRESHOLD,
+                              is_nan & (missing == MISSING_NAN))
+        split = x <= threshold if self.inclusive else x < threshold
+        return np.where(is_missing, self.default_left[nodes], split)
+
+    def predict_margin(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=self.dtype))
+        margins = np.empty(len(X), dtype=self.dtype)
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            rows = np.arange(len(block))[:, None]
+            nodes = np.repeat(self.roots[None, :], len(block), axis=0)
+            for _ in range(self.max_depth):
+                go_left = self._go_left(block[rows, self.feature[nodes]], nodes)
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            # Trees are added one after another like the native predictors; cumsum keeps
+            # that order where sum() would pair values up and round differently
+            leaves = np.concatenate([np.full((len(block), 1), self.base_margin), self.value[nodes]], axis=1)
+            margins[start:start + BLOCK_ROWS] = np.cumsum(leaves, axis=1, dtype=self.dtype)[:, -1]
+        return margins
+
+    # Probability of the positive class for each row of X
+    def predict(self, X):
+        return self.sigmoid(self.predict_margin(X).tolist())
+
+    # Probability of the positive class for one feature row (a dtype scalar, like the native
+    # predictors return), without NumPy per node
+    def predict_row(self, row):
+        feature, threshold, left, right, value, default_left, missing = self._nodes
+        row = np.asarray(row, dtype=self.dtype).tolist()
+        inclusive = self.inclusive
+        leaves = [self.base_margin]
+        if not self._zero_is_missing and not any(x != x for x in row):  # no NaN: one comparison per node
+            split_at = self._split_at
+            for node in self.roots.tolist():
+                f = feature[node]
+                while f >= 0:
+                    node = left[node] if row[f] <= split_at[node] else right[node]
+                    f = feature[node]
+                leaves.append(value[node])
+            margin = np.cumsum(np.array(leaves, dtype=self.dtype))[-1]
+            return self.sigmoid([float(margin)])[0]
+
+        for node in self.roots.tolist():
+            f = feature[node]
+            while f >= 0:
+                x = row[f]
+                if x != x and missing[node] != MISSING_NAN:  # NaN
+                    x = 0.0
+                if (missing[node] == MISSING_ZERO and abs(x) <= LIGHTGBM_ZERO_THRESHOLD) or x != x:
+                    node = left[node] if default_left[node] else right[node]
+                elif x <= threshold[node] if inclusive else x < threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+                f = feature[node]
+            leaves.append(value[node])
+        margin = np.cumsum(np.array(leaves, dtype=self.dtype))[-1]
+        return self.sigmoid([float(margin)])[0]
+
+
+def from_xgboost(model):
+    """Compile an XGBClassifier (or its Booster) trained with binary:logistic."""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    if learner["objective"]["name"] != "binary:logistic":
+        raise ValueError(f"Unsupported XGBoost objective {learner['objective']['name']}")
+
+    # base_score is stored as a probability, e.g. "[5.5698776E-1]"; XGBoost starts from its logit
+    base_score = np.float32(learner["learner_model_param"]["base_score"].strip("[]"))
+    # (the odds are computed in float32, the log in float64)
+    base_margin = np.float32(-np.log(np.float64(np.float32(1) / base_score - np.float32(1))))
+
+    nodes, roots, max_depth = [], [], 0
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        if int(tree["tree_param"].get("size_leaf_vector", "1")) > 1 or any(tree["split_type"]):
+            raise ValueError("Multi-output and categorical XGBoost trees are not supported")
+        offset = len(nodes)
+        roots.append(offset)
+        depth = [0] * len(tree["left_children"])
+        for i, (lc, rc) in enumerate(zip(tree["left_children"], tree["right_children"])):
+            if lc == -1:  # leaf: the value is stored in split_conditions
+                nodes.append((-1, 0.0, offset + i, offset + i, tree["split_conditions"][i], True, MISSING_NAN))
+            else:
+                depth[lc] = depth[rc] = depth[i] + 1
+                nodes.append((tree["split_indices"][i], tree["split_conditions"][i], offset + lc, offset + rc,
+                              0.0, bool(tree["default_left"][i]), MISSING_NAN))
+        max_depth = max(max_depth, max(depth))
+    return CompiledEnsemble(nodes, roots, max_depth, base_margin, np.float32, inclusive=False,
+                            sigmoid=xgboost_sigmoid)
+
+
+def from_lightgbm(booster):
+    """Compile a LightGBM Booster trained with the binary objective."""
+    dump = booster.dump_model()
+    objective = dump["objective"].split()
+    if objective[0] != "binary" or objective[1:] != ["sigmoid:1"] or dump["num_tree_per_iteration"] != 1:
+        raise ValueError(f"Unsupported LightGBM objective {dump['objective']}")
+
+    nodes, roots, max_depth = [], [], 0
+    for tree in dump["tree_info"]:
+        roots.append(len(nodes))
+        # Depth-first with explicit stack; children are patched in once they get an index
+        stack = [(tree["tree_structure"], None, 0)]
+        while stack:
+            node, parent, depth = stack.pop()
+            index = len(nodes)
+            if parent is not None:
+                parent_index, side = parent
+                fields = list(nodes[parent_index])
+                fields[side] = index
+                nodes[parent_index] = tuple(fields)
+            if "split_index" not in node:
+                nodes.append((-1, 0.0, index, index, node["leaf_value"], True, MISSING_AS_ZERO))
+                max_depth = max(max_depth, depth)
+                continue
+            if node["decision_type"] != "<=":
+                raise ValueError("Categorical LightGBM splits are not supported")
+            nodes.append((node["split_feature"], node["threshold"], -1, -1, 0.0, node["default_left"],
+                          LIGHTGBM_MISSING[node["missing_type"]]))
+            stack.append((node["right_child"], (index, 3), depth + 1))
+            stack.append((node["left_child"], (index, 2), depth + 1))
+    return CompiledEnsemble(nodes, roots, max_depth, 0.0, np.float64, inclusive=True,
+                            sigmoid=lightgbm_sigmoid)
@@ -1,7 +1,10 @@
-import pandas as pd
+try:
+    from ai_models import feature_store
+except ImportError:  # running as a script from inside ai_models/
+    import feature_store
 
-# Load the dataset
-df = pd.read_csv("transactions.csv")
+# Load the dataset (parsed once into the feature store, memory-mapped afterwards)
+df = feature_store.transactions("transactions.csv")
 
 # Display dataset info
 print("Dataset Information:")
@@ -1,18 +1,27 @@
 import pandas as pd
 import numpy as np
 import lightgbm as lgb
+import matplotlib
+matplotlib.use("Agg")  # headless: the chart is written to a file instead of blocking on a window
 import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
 from imblearn.over_sampling import SMOTE  
 from sklearn.preprocessing import LabelEncoder  
 from sklearn.metrics import classification_report, accuracy_score
 
-# Load dataset
-df = pd.read_csv("transactions.csv")
+try:
+    from ai_models import feature_store
+    from ai_models.categorical_codec import CategoricalCodec
+except ImportError:  # running as a script from inside ai_models/
+    import feature_store
+    from categorical_codec import CategoricalCodec
 
-# Convert date and extract day of the week
-df["Transaction_Date"] = pd.to_datetime(df["Transaction_Date"], dayfirst=True, errors='coerce')
-df["Transaction_Day"] = df["Transaction_Date"].dt.dayofweek
+# Seeded jitter so reruns train the same model
+rng = np.random.default_rng(42)
+
+# Load dataset: parsed dates, Transaction_Day and categorical text columns, memory-mapped
+# from the feature store after the first run (see feature_store.py)
+df = feature_store.transactions("transactions.csv")
 
 # Remove unwanted columns (State, Transaction_Location, Age, Gender)
 df.drop(columns=["Transaction_ID", "Customer_ID", "Transaction_Date", "City", "Bank_Branch",
@@ -20,15 +29,15 @@ df.drop(columns=["Transaction_ID", "Customer_ID", "Transaction_Date", "City", "B
                  "Transaction_Location", "State", "Age", "Gender"], inplace=True)
 
 # **Target Encoding for `Transaction_Currency` (Fraud Likelihood)**
-currency_fraud_prob = df.groupby("Transaction_Currency")["Is_Fraud"].mean().to_dict()
-df["Transaction_Currency_Encoded"] = df["Transaction_Currency"].map(currency_fraud_prob).fillna(0.5)
-df["Transaction_Currency_Encoded"] += np.random.uniform(-0.01, 0.01, df.shape[0])  
+currency_fraud_prob = df.groupby("Transaction_Currency", observed=True)["Is_Fraud"].mean().to_dict()
+df["Transaction_Currency_Encoded"] = df["Transaction_Currency"].map(currency_fraud_prob).astype(float).fillna(0.5)
+df["Transaction_Currency_Encoded"] += rng.uniform(-0.01, 0.01, df.shape[0])  
 
 # **Force Splitting on `Transaction_Currency`**
 df["Transaction_Currency_Dup1"] = df["Transaction_Currency_Encoded"]*5
 df["Transaction_Currency_Dup2"] = df["Transaction_Currency_Encoded"]*5
-df["Transaction_Currency_Dup1"] += np.random.uniform(-0.01, 0.01, df.shape[0])
-df["Transaction_Currency_Dup2"] += np.random.uniform(-0.01, 0.01, df.shape[0])
+df["Transaction_Currency_Dup1"] += rng.uniform(-0.01, 0.01, df.shape[0])
+df["Transaction_Currency_Dup2"] += rng.uniform(-0.01, 0.01, df.shape[0])
 
 
 # Define Features & Target
@@ -36,14 +45,17 @@ X = df.drop(columns=["Is_Fraud"])  # Exclude target column
 y = df["Is_Fraud"]  # Target variable
 
 # Identify categorical columns
-categorical_features = X.select_dtypes(include=['object']).columns.tolist()
+categorical_features = X.select_dtypes(include=['category']).columns.tolist()
 
-# Encode categorical columns using Label Encoding
+# Encode categorical columns using Label Encoding: the feature store's categories are
+# sorted, so the codes are exactly what LabelEncoder.fit_transform would return
 label_encoders = {}
 for col in categorical_features:
     le = LabelEncoder()
-    X[col] = le.fit_transform(X[col])
+    le.classes_ = X[col].cat.categories.to_numpy(dtype=object)
+    X[col] = X[col].cat.codes.astype("int64")
     label_encoders[col] = le  # Save encoder for later use
+codec = CategoricalCodec.from_encoders(label_encoders)  # O(1) lookups for predict_fraud
 
 
 # Train-Test Split
@@ -70,9 +82,10 @@ lgb_model = lgb.LGBMClassifier(
 
 
 
-weights = np.ones(df.shape[0])  
-weights[df["Transaction_Currency_Dup1"] > 0.5] *= 2  # Boost impact
-weights[df["Transaction_Currency_Dup2"] > 0.5] *= 2  # Boost impact
+# One weight per (resampled) training row
+weights = np.ones(X_train_smote.shape[0])
+weights[X_train_smote["Transaction_Currency_Dup1"].to_numpy() > 0.5] *= 2  # Boost impact
+weights[X_train_smote["Transaction_Currency_Dup2"].to_numpy() > 0.5] *= 2  # Boost impact
 
 lgb_model.fit(X_train_smote, y_train_smote, sample_weight=weights)
 
@@ -87,7 +100,8 @@ print(classification_report(y_test, y_pred))
 feature_importance = pd.Series(lgb_model.feature_importances_, index=X.columns)
 feature_importance.nlargest(20).plot(kind='barh')
 plt.title("Top 10 Feature Importance (Boosted `Transaction_Currency`)")
-plt.show()
+plt.savefig("feature_importance.png", bbox_inches="tight")
+print("Feature importance chart: feature_importance.png")
 
 # Function to Predict Fraud
 def predict_fraud(transaction, fraud_threshold=0.2):  
@@ -105,9 +119,9 @@ def predict_fraud(transaction, fraud_threshold=0.2):
     transaction_df["Currency_Transaction_Amount"] = transaction_df["Transaction_Currency_Encoded"] * transaction_df["Transaction_Amount"]
 
     # Encode categorical features
-    for col, le in label_encoders.items():
+    for col in codec.columns:
         if col in transaction_df.columns:
-            transaction_df[col] = transaction_df[col].map(lambda x: le.transform([x])[0] if x in le.classes_ else -1)
+            transaction_df[col] = codec.encode_column(col, transaction_df[col])
         else:
             print(f"Warning: Column '{col}' is missing in input transaction! Assigning default value.")
             transaction_df[col] = -1  # Assign unknown category
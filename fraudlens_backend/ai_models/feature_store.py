@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from ai_models import matrix_cache
+    from ai_models.training import StageTimer, cached_matrices
+except ImportError:  # running as a script from inside ai_models/
+    import matrix_cache
+    from training import StageTimer, cached_matrices
+
+# The cleaned transactions frame, materialized once per version of the CSV: dates parsed,
+# Transaction_Day derived and every text column turned into a categorical (sorted
+# categories, so its codes are what LabelEncoder.fit_transform would give). Stored in the
+# matrix cache as memory-mapped .npy columns plus the category dictionaries, keyed by
+# the CSV's hash: editing the file rebuilds it, every other load skips parsing entirely.
+TRANSACTIONS_CSV = Path(__file__).resolve().parent / "transactions.csv"
+# Bump when build_transactions() changes
+TRANSACTIONS_TAG = "transactions-clean-1"
+
+
+# Convert date and extract day of the week
+def parse_dates(df):
+    df["Transaction_Date"] = pd.to_datetime(df["Transaction_Date"], dayfirst=True, errors='coerce')
+    df["Transaction_Day"] = df["Transaction_Date"].dt.dayofweek
+    return df
+
+
+def build_transactions(csv_path=TRANSACTIONS_CSV, timer=None):
+    timer = timer or StageTimer()
+    with timer.stage("load"):
+        df = pd.read_csv(csv_path)
+    with timer.stage("encode"):
+        df = parse_dates(df)
+        for col in df.select_dtypes(include=["object", "string"]).columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def transactions(csv_path=TRANSACTIONS_CSV, timer=None, use_cache=True):
+    """All columns of the CSV, cleaned; text columns are categoricals."""
+    timer = timer or StageTimer()
+
+    def build():
+        return matrix_cache.frame_arrays(build_transactions(csv_path, timer))
+
+    arrays, meta = cached_matrices(timer, "transactions", [csv_path], build, TRANSACTIONS_TAG, use_cache)
+    return matrix_cache.arrays_frame(arrays, meta)
@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# Append-only log of labelled messages reported by users, one JSON object per line.
+# Lines are only ever added, so a byte offset into the file marks "everything up to here":
+# a model artifact records the offset it was trained up to and only what follows is replayed.
+FEEDBACK_DIR = Path(os.environ.get("FRAUDLENS_FEEDBACK_DIR", Path(__file__).resolve().parent / "feedback"))
+LABELS = {"ham": 0, "spam": 1}
+
+
+class FeedbackStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_model(cls, name):
+        return cls(FEEDBACK_DIR / f"{name}.jsonl")
+
+    def append(self, text, label):
+        """Record one labelled message; returns the offset just past it."""
+        if label not in LABELS:
+            raise ValueError(f"label must be one of: {', '.join(LABELS)}")
+        line = json.dumps({"text": text, "label": label, "reported_at": time.time()}, ensure_ascii=False) + "\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One O_APPEND write per record: concurrent writers (threads or worker processes)
+        # never interleave inside a line
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+                return os.lseek(fd, 0, os.SEEK_CUR)
+            finally:
+                os.close(fd)
+
+    def size(self):
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def read(self, start=0):
+        """(records, end offset) for the complete lines from byte offset `start` onwards."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return [], start
+        complete = data[:data.rfind(b"\n") + 1]  # a line still being written is left for next time
+        records = [json.loads(line) for line in complete.splitlines() if line.strip()]
+        return records, start + len(complete)
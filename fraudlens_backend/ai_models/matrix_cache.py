@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+# Preprocessed training matrices, cached so retraining skips CSV parsing and encoding:
+#   cache/<name>/<key>/<i>.npy (or .npz for sparse) + meta.json
+# The key hashes the source files' bytes and a tag naming the preprocessing, so editing a
+# dataset or the preprocessing code (bump the tag) builds a fresh entry instead of reusing a stale one.
+CACHE_DIR = Path(os.environ.get("FRAUDLENS_MATRIX_CACHE_DIR", Path(__file__).resolve().parent / "cache"))
+META = "meta.json"
+
+
+def source_key(sources, tag=""):
+    digest = hashlib.sha256(tag.encode("utf-8"))
+    for source in sources:
+        digest.update(b"\0")
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:20]
+
+
+def _save(directory, arrays, meta):
+    kinds = []
+    for i, value in enumerate(arrays.values()):
+        if scipy.sparse.issparse(value):
+            scipy.sparse.save_npz(directory / f"{i}.npz", value.tocsr(), compressed=False)
+            kinds.append("sparse")
+        else:
+            np.save(directory / f"{i}.npy", np.asarray(value), allow_pickle=False)
+            kinds.append("dense")
+    with open(directory / META, "w") as f:
+        json.dump({"arrays": list(arrays), "kinds": kinds, "meta": meta}, f)
+
+
+def _load(directory):
+    with open(directory / META) as f:
+        index = json.load(f)
+    arrays = {}
+    for i, (name, kind) in enumerate(zip(index["arrays"], index["kinds"])):
+        if kind == "sparse":
+            arrays[name] = scipy.sparse.load_npz(directory / f"{i}.npz")
+        else:
+            # Memory-mapped: a cache hit costs page faults, not a parse
+            arrays[name] = np.load(directory / f"{i}.npy", mmap_mode="r", allow_pickle=False)
+    return arrays, index["meta"]
+
+
+def load_or_build(name, sources, build, tag="", enabled=True, root=None):
+    """(arrays, meta, hit). `build()` returns (arrays, meta): arrays maps names to NumPy or
+    SciPy sparse matrices (no object dtypes), meta is anything JSON can hold."""
+    if not enabled:
+        arrays, meta = build()
+        return arrays, meta, False
+    directory = Path(root or CACHE_DIR) / name / source_key(sources, tag)
+    if (directory / META).exists():
+        arrays, meta = _load(directory)
+        return arrays, meta, True
+
+    arrays, meta = build()
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = directory.parent / f".{directory.name}.{os.getpid()}.tmp"
+    tmp_dir.mkdir()
+    try:
+        _save(tmp_dir, arrays, meta)
+        os.rename(tmp_dir, directory)
+    except OSError:
+        # Another process cached the same key first; its copy is identical
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (directory / META).exists():
+            raise
+    return arrays, meta, False
+
+
+# A frame as one array per column and back, dtypes and column order preserved. Categorical
+# columns are stored as their integer codes; the categories go in the entry's meta.
+def frame_arrays(df):
+    arrays, categories = {}, {}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays[f"column:{col}"] = values.cat.codes.to_numpy()
+            categories[col] = values.cat.categories.tolist()
+        else:
+            arrays[f"column:{col}"] = values.to_numpy()
+    return arrays, {"categories": categories}
+
+
+def arrays_frame(arrays, meta=None):
+    categories = (meta or {}).get("categories", {})
+    columns = {}
+    for name, value in arrays.items():
+        if not name.startswith("column:"):
+            continue
+        col = name.removeprefix("column:")
+        if col in categories:
+            columns[col] = pd.Categorical.from_codes(np.asarray(value), categories[col])
+        else:
+            columns[col] = np.asarray(value)
+    return pd.DataFrame(columns)
@@ -0,0 +1,245 @@
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+
+# In-process latency histograms and counters, exposed in the Prometheus text format by
+# the /metrics endpoint. Each worker process keeps its own numbers (scrape each worker,
+# or sum them in the query). With ENABLED = False, timers and decorators are no-ops:
+# decorated functions are returned unwrapped, so instrumentation costs nothing.
+DEFAULTS = {
+    "ENABLED": True,
+    # Upper bounds in seconds; probes time out at trust.PROBE_TIMEOUT = 3 s
+    "BUCKETS": (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _settings():
+    config = dict(DEFAULTS)
+    try:
+        from django.conf import settings
+        if settings.configured or os.environ.get("DJANGO_SETTINGS_MODULE"):
+            config.update(getattr(settings, "FRAUDLENS_METRICS", {}))
+    except ImportError:
+        pass
+    return config
+
+
+_config = _settings()
+ENABLED = _config["ENABLED"]
+BUCKETS = tuple(float(bound) for bound in _config["BUCKETS"])
+
+
+def _label_key(labelnames, labels):
+    if len(labels) != len(labelnames) or not all(name in labels for name in labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count per combination of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class _Timer:
+    """Observes the elapsed time of a `with` block, or of every call when used as a decorator."""
+
+    __slots__ = ("histogram", "key", "started")
+
+    def __init__(self, histogram, key):
+        self.histogram = histogram
+        self.key = key
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram._observe(self.key, time.perf_counter() - self.started)
+        return False
+
+    def __call__(self, fn):
+        histogram, key = self.histogram, self.key
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    histogram._observe(key, time.perf_counter() - started)
+        else:
+            @functools.wraps(fn)
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    histogram._observe(key, time.perf_counter() - started)
+        return timed
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __call__(self, fn):
+        return fn
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Histogram:
+    """Observed durations per combination of label values, in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets or BUCKETS))
+        self._series = {}  # label values -> [count per bucket (last one +Inf), sum]
+        self._lock = threading.Lock()
+
+    def _observe(self, key, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def observe(self, value, **labels):
+        if ENABLED:
+            self._observe(_label_key(self.labelnames, labels), value)
+
+    # `with histogram.time(probe="ssl"):` or `@histogram.time(probe="ssl")`
+    def time(self, **labels):
+        if not ENABLED:
+            return NULL_TIMER
+        return _Timer(self, _label_key(self.labelnames, labels))
+
+    def count(self, **labels):
+        with self._lock:
+            series = self._series.get(_label_key(self.labelnames, labels))
+            return sum(series[0]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = (("le", _format_value(float(bound))),)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    # Declaring the same metric again (e.g. a reloaded module) returns the first one
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.setdefault(metric.name, metric)
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered with other labels or type")
+        return existing
+
+    def expose(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=None):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def expose():
+    return REGISTRY.expose()
+
+
+# Shared by every model: seconds per call (one call may score a whole batch) and rows scored
+MODEL_SECONDS = histogram("fraudlens_model_seconds", "Time spent in one model predict call.", ["model"])
+MODEL_ROWS = counter("fraudlens_model_rows_total", "Rows scored by each model.", ["model"])
+
+
+def model_call(model, rows=1):
+    if not ENABLED:
+        return NULL_TIMER
+    MODEL_ROWS.inc(rows, model=model)
+    return MODEL_SECONDS.time(model=model)
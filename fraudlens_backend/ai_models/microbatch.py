@@ -0,0 +1,184 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+
+# Micro-batching in front of the models: single-row predictions from concurrent requests
+# are collected for up to MAX_WAIT_MS (or until MAX_BATCH_SIZE rows are waiting) and
+# scored with one vectorized call, amortizing the per-call overhead of predict_proba.
+# With MAX_WAIT_MS = 0 nothing waits on purpose: rows that arrive while a batch is
+# being scored form the next batch, so a lone request pays no extra latency.
+DEFAULTS = {
+    "ENABLED": True,
+    "MAX_BATCH_SIZE": 64,
+    "MAX_WAIT_MS": 0,
+}
+
+
+def _settings():
+    config = dict(DEFAULTS)
+    try:
+        from django.conf import settings
+        if settings.configured or os.environ.get("DJANGO_SETTINGS_MODULE"):
+            config.update(getattr(settings, "FRAUDLENS_MICROBATCH", {}))
+    except ImportError:
+        pass
+    return config
+
+
+class _Slot:
+    __slots__ = ("item", "result", "error", "done")
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class MicroBatcher:
+    """Batches rows submitted from concurrent threads (WSGI).
+
+    There is no background thread: the first caller to find no batch in progress
+    becomes the leader, gathers the batch, scores it and hands out the results.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait_ms=0, enabled=True):
+        self.predict_batch = predict_batch  # list of rows -> list of results, same order
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.enabled = enabled
+        self._pending = []
+        self._leading = False
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.rows = 0
+
+    @classmethod
+    def from_settings(cls, predict_batch):
+        config = _settings()
+        return cls(predict_batch, config["MAX_BATCH_SIZE"], config["MAX_WAIT_MS"], config["ENABLED"])
+
+    def submit_many(self, items):
+        if not self.enabled or len(items) >= self.max_batch_size:
+            return self.predict_batch(items)  # already a batch of its own
+        slots = [_Slot(item) for item in items]
+        with self._cond:
+            self._pending.extend(slots)
+            if len(self._pending) >= self.max_batch_size:
+                self._cond.notify_all()
+            while not all(slot.done for slot in slots):
+                if self._leading:
+                    self._cond.wait()
+                    continue
+                self._leading = True
+                batch = self._collect()
+                self._cond.release()
+                try:
+                    self._run(batch)
+                finally:
+                    self._cond.acquire()
+                    self._leading = False
+                    self._cond.notify_all()
+        for slot in slots:
+            if slot.error is not None:
+                raise slot.error
+        return [slot.result for slot in slots]
+
+    def submit(self, item):
+        return self.submit_many([item])[0]
+
+    # Called with the lock held: wait up to max_wait_ms for a full batch, then take it
+    def _collect(self):
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(self._pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        return batch
+
+    def _run(self, batch):
+        try:
+            results = self.predict_batch([slot.item for slot in batch])
+            for slot, result in zip(batch, results):
+                slot.result = result
+        except Exception as exc:
+            for slot in batch:
+                slot.error = exc
+        for slot in batch:
+            slot.done = True
+        self.batches += 1
+        self.rows += len(batch)
+
+    def stats(self):
+        return {"batches": self.batches, "rows": self.rows,
+                "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0}
+
+
+class AsyncMicroBatcher:
+    """Batches rows submitted from coroutines (ASGI); each batch is scored in `executor`
+    so the event loop keeps running."""
+
+    def __init__(self, predict_batch, executor=None, max_batch_size=64, max_wait_ms=0, enabled=True):
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.enabled = enabled
+        self._queues = weakref.WeakKeyDictionary()  # event loop -> [(row, future), ...]
+        self.batches = 0
+        self.rows = 0
+
+    @classmethod
+    def from_settings(cls, predict_batch, executor=None):
+        config = _settings()
+        return cls(predict_batch, executor, config["MAX_BATCH_SIZE"], config["MAX_WAIT_MS"], config["ENABLED"])
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        if not self.enabled:
+            return (await loop.run_in_executor(self.executor, self.predict_batch, [item]))[0]
+        queue = self._queues.get(loop)
+        if queue is None:
+            queue = self._queues[loop] = []
+        future = loop.create_future()
+        queue.append((item, future))
+        if len(queue) >= self.max_batch_size:
+            self._flush(loop)
+        elif len(queue) == 1:
+            # max_wait 0 still collects every row submitted in this turn of the loop (gather)
+            loop.call_later(self.max_wait_ms / 1000, self._flush, loop)
+        return await future
+
+    def _flush(self, loop):
+        queue = self._queues.get(loop)
+        if not queue:
+            return
+        batch = queue[:self.max_batch_size]
+        del queue[:self.max_batch_size]
+        if queue:  # rows left over from a full batch start the next wait
+            loop.call_later(self.max_wait_ms / 1000, self._flush, loop)
+        self.batches += 1
+        self.rows += len(batch)
+        scored = loop.run_in_executor(self.executor, self.predict_batch, [item for item, _ in batch])
+        scored.add_done_callback(lambda done: self._resolve(batch, done))
+
+    @staticmethod
+    def _resolve(batch, done):
+        error = done.exception()
+        results = None if error is not None else done.result()
+        for i, (_, future) in enumerate(batch):
+            if future.done():  # caller cancelled
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def stats(self):
+        return {"batches": self.batches, "rows": self.rows,
+                "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0}
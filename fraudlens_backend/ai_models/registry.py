@@ -0,0 +1,147 @@
+import importlib
+import os
+import threading
+import time
+
+# The loaded models, created on first use instead of when their module is imported, so
+# importing the API (URLconf, management commands, health checks) doesn't pay for pandas,
+# XGBoost, scikit-learn and reading the artifacts. Serving processes load them ahead of
+# the first request with warm_up() (fraudlens_backend.preload, run by wsgi.py/asgi.py).
+DEFAULTS = {
+    "WARM_UP": ("trust", "sms"),  # loaded when a server process starts; others load on first use
+    "BACKGROUND": True,  # warm up in a thread: the process answers /api/ready/ (503) meanwhile
+}
+
+# Model name -> module that registers its loader on import
+MODULES = {"trust": "ai_models.trust", "sms": "ai_models.smsScam", "fraud": "ai_models.transactionFraud"}
+
+
+def _settings():
+    config = dict(DEFAULTS)
+    try:
+        from django.conf import settings
+        if settings.configured or os.environ.get("DJANGO_SETTINGS_MODULE"):
+            config.update(getattr(settings, "FRAUDLENS_MODELS", {}))
+    except ImportError:
+        pass
+    return config
+
+
+class _Entry:
+    __slots__ = ("loader", "value", "loaded", "state", "error", "seconds", "import_seconds", "lock")
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.value = None
+        self.loaded = False
+        self.state = "cold"
+        self.error = None
+        self.seconds = None
+        self.import_seconds = None  # when the registry imported the module itself
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        with self._lock:
+            self._entries.setdefault(name, _Entry(loader))
+
+    def _entry(self, name):
+        entry = self._entries.get(name)
+        if entry is None:
+            started = time.perf_counter()
+            importlib.import_module(MODULES[name])  # registers it
+            entry = self._entries[name]
+            if entry.import_seconds is None and not entry.loaded:
+                entry.import_seconds = time.perf_counter() - started
+        return entry
+
+    def get(self, name):
+        """The loaded model (None if there is none to load), loading it on the first call.
+        Concurrent first calls wait for one load; a failed load is retried by the next call."""
+        entry = self._entry(name)
+        if entry.loaded:
+            return entry.value
+        with entry.lock:
+            if not entry.loaded:
+                entry.state = "loading"
+                started = time.perf_counter()
+                try:
+                    entry.value = entry.loader()
+                except Exception as exc:
+                    entry.state, entry.error = "failed", repr(exc)
+                    raise
+                entry.seconds = time.perf_counter() - started
+                entry.state = "warm" if entry.value is not None else "missing"
+                entry.error = None
+                entry.loaded = True
+        return entry.value
+
+    def _after_fork(self):
+        # A fork copies held locks but not the threads holding them: a model that was
+        # loading in another thread of the parent would block this child forever
+        self._lock = threading.Lock()
+        for entry in self._entries.values():
+            entry.lock = threading.Lock()
+            if not entry.loaded:
+                entry.state = "cold"
+
+    def is_loaded(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and entry.loaded
+
+    def warm_up(self, names):
+        """Load each model now; returns the names that failed to load."""
+        failed = []
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as exc:
+                print(f"Warning: loading the {name} model failed: {exc!r}")
+                failed.append(name)
+        return failed
+
+    def status(self):
+        models = {}
+        for name in MODULES:
+            entry = self._entries.get(name)
+            if entry is None:
+                models[name] = {"state": "cold"}
+                continue
+            models[name] = {
+                "state": entry.state,
+                "version": getattr(entry.value, "version", None),
+                "import_seconds": None if entry.import_seconds is None else round(entry.import_seconds, 3),
+                "load_seconds": None if entry.seconds is None else round(entry.seconds, 3),
+            }
+            if entry.error:
+                models[name]["error"] = entry.error
+        return models
+
+
+models = ModelRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=models._after_fork)
+
+
+def warm_up(names=None, background=None):
+    """Load the FRAUDLENS_MODELS['WARM_UP'] models, in a daemon thread by default. Never in
+    the background in a process that forks workers afterwards: they would inherit neither
+    the thread nor the models (preload.preload_models loads them synchronously instead)."""
+    config = _settings()
+    names = list(config["WARM_UP"] if names is None else names)
+    if not (config["BACKGROUND"] if background is None else background):
+        return models.warm_up(names)
+    threading.Thread(target=models.warm_up, args=(names,), name="model-warm-up", daemon=True).start()
+    return None
+
+
+def readiness():
+    """(ready, status): ready once every WARM_UP model is loaded."""
+    status = models.status()
+    ready = all(status[name]["state"] == "warm" for name in _settings()["WARM_UP"])
+    return ready, status
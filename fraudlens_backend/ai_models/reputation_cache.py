@@ -0,0 +1,107 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Raw results of the trust probes (check_ip_address, check_ssl_state, ...), keyed by
+# (probe, domain or url). Failed probes return 0 and are cached for a shorter time
+# so a flaky site is retried sooner than a healthy one is re-checked.
+DEFAULTS = {
+    "MAX_ENTRIES": 10000,
+    "TTL": 3600,
+    "NEGATIVE_TTL": 300,
+    "SHARED_CACHE": None,  # alias of a Django cache to share results across workers
+}
+
+
+class ReputationCache:
+    def __init__(self, max_entries=10000, ttl=3600, negative_ttl=300, shared_cache=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.shared_cache = shared_cache
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_settings(cls):
+        config = dict(DEFAULTS)
+        shared_cache = None
+        try:
+            from django.conf import settings
+            if settings.configured or os.environ.get("DJANGO_SETTINGS_MODULE"):
+                config.update(getattr(settings, "FRAUDLENS_REPUTATION_CACHE", {}))
+                if config["SHARED_CACHE"]:
+                    from django.core.cache import caches
+                    shared_cache = caches[config["SHARED_CACHE"]]
+        except ImportError:
+            pass
+        return cls(config["MAX_ENTRIES"], config["TTL"], config["NEGATIVE_TTL"], shared_cache)
+
+    @staticmethod
+    def shared_key(probe, target):
+        # Django cache keys must stay short and free of spaces/control characters
+        return "fraudlens:probe:%s:%s" % (probe, hashlib.sha1(target.encode("utf-8")).hexdigest())
+
+    def get(self, probe, target):
+        """Return (found, value) for a cached probe result."""
+        key = (probe, target)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+
+        if self.shared_cache is not None:
+            value = self.shared_cache.get(self.shared_key(probe, target))
+            if value is not None:
+                self._store(key, value, now)
+                with self._lock:
+                    self.shared_hits += 1
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def set(self, probe, target, value):
+        self._store((probe, target), value, time.monotonic())
+        if self.shared_cache is not None:
+            self.shared_cache.set(self.shared_key(probe, target), value, self._ttl_for(value))
+
+    def _ttl_for(self, value):
+        return self.ttl if value else self.negative_ttl
+
+    def _store(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (value, now + self._ttl_for(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.shared_hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
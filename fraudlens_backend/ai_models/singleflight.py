@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import weakref
+
+# Request coalescing: while a call for some key is running, other callers asking for the
+# same key wait for that call and get its result (or its exception) instead of repeating it.
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical calls across threads (WSGI workers)."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "executed": self.executed, "coalesced": self.coalesced}
+
+
+class AsyncSingleFlight:
+    """Coalesces identical coroutine calls on an event loop (ASGI)."""
+
+    def __init__(self):
+        self._calls = weakref.WeakKeyDictionary()  # event loop -> {key: task}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key, coro_fn, *args):
+        calls = self._calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = asyncio.ensure_future(coro_fn(*args))
+            task.add_done_callback(lambda _: calls.pop(key, None))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        # shield: a waiter that gets cancelled (client went away) must not cancel the others
+        return await asyncio.shield(task)
+
+    def stats(self):
+        in_flight = sum(len(calls) for calls in list(self._calls.values()))
+        return {"in_flight": in_flight, "executed": self.executed, "coalesced": self.coalesced}
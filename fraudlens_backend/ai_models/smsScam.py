@@ -2,52 +2,295 @@ import pandas as pd
 import numpy as np
 import re
 import string
+import copy
+import threading
+import time
+import joblib
+import scipy.sparse
+from pathlib import Path
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.metrics import accuracy_score, classification_report
 
-# Load cleaned dataset
-df = pd.read_csv(r".\ai_models\spam.csv", encoding="latin-1").iloc[:, :2]
-df.columns = ["Label", "Message"]
-df["Label"] = df["Label"].map({"ham": 0, "spam": 1})
+try:
+    from ai_models import artifacts, metrics
+    from ai_models.feedback_store import LABELS, FeedbackStore
+    from ai_models.microbatch import MicroBatcher
+    from ai_models.registry import models
+    from ai_models.training import StageTimer, cached_matrices
+except ImportError:  # running as a script from inside ai_models/
+    import artifacts
+    import metrics
+    from feedback_store import LABELS, FeedbackStore
+    from microbatch import MicroBatcher
+    from registry import models
+    from training import StageTimer, cached_matrices
+
+SPAM_CSV = Path(__file__).resolve().parent / "spam.csv"
+ARTIFACT_NAME = "sms"
+
+# Precompiled normalizer tables
+NUMBERS = re.compile(r'\d+')
+PUNCTUATION = str.maketrans("", "", string.punctuation)
+# For ASCII text \d only matches 0-9, so numbers and punctuation go in one translate
+ASCII_NUMBERS_AND_PUNCTUATION = str.maketrans("", "", string.punctuation + string.digits)
 
 # Function to clean text
 def clean_text(text):
     text = text.lower()  # Convert to lowercase
-    text = re.sub(r'\d+', '', text)  # Remove numbers
-    text = text.translate(str.maketrans("", "", string.punctuation))  # Remove punctuation
+    if text.isascii():
+        return text.translate(ASCII_NUMBERS_AND_PUNCTUATION).strip()
+    text = NUMBERS.sub('', text)  # Remove numbers
+    text = text.translate(PUNCTUATION)  # Remove punctuation
     text = text.strip()  # Remove whitespace
     return text
 
-# Apply cleaning function to messages
-df["Message"] = df["Message"].apply(clean_text)
+# clean_text() over a batch. Translating one joined string was measured slower: a single
+# non-ASCII message pushes the whole batch off CPython's ASCII fast path.
+def clean_texts(texts):
+    return [clean_text(text) for text in texts]
+
+def make_vectorizer(kind="hashing"):
+    if kind == "hashing":
+        # Stateless: nothing to fit or store, constant memory. Raw non-negative term counts
+        # (no normalisation) are what MultinomialNB models best.
+        return HashingVectorizer(stop_words="english", n_features=2 ** 15, alternate_sign=False, norm=None)
+    return TfidfVectorizer(stop_words="english", max_features=3000)
+
+# Load cleaned dataset
+def read_dataset(csv_path=SPAM_CSV):
+    df = pd.read_csv(csv_path, encoding="latin-1").iloc[:, :2]
+    df.columns = ["Label", "Message"]
+    df["Label"] = df["Label"].map(LABELS)
+
+    # Apply cleaning function to messages
+    df["Message"] = clean_texts(df["Message"])
+    return df
+
+# The messages train_model() holds out for testing, to compare models on the same rows
+def holdout_set(csv_path=SPAM_CSV):
+    df = read_dataset(csv_path)
+    _, test = train_test_split(df, test_size=0.2, random_state=42, stratify=df["Label"])
+    return test["Message"].tolist(), test["Label"].to_numpy()
+
+# Train the vectorizer + classifier. `feedback` records (see feedback_store) are added to
+# the training split only, so accuracy is always measured on the spam.csv test split.
+def train_model(csv_path=SPAM_CSV, vectorizer_kind="hashing", feedback=(), timer=None, use_cache=True):
+    timer = timer or StageTimer()
+    vectorizer = make_vectorizer(vectorizer_kind)
+
+    def build():
+        with timer.stage("load"):
+            df = read_dataset(csv_path)
+
+        # Convert text into numerical features using TF-IDF (or feature hashing)
+        with timer.stage("encode"):
+            X = vectorizer.fit_transform(df["Message"])
+        return {"X": X, "y": df["Label"].to_numpy()}, {}
+
+    if vectorizer_kind == "hashing":
+        # Stateless features: the matrix is the same on every run, so it can be cached
+        tag = "sms-hashing-1" + str(sorted(vectorizer.get_params().items()))
+        arrays, _ = cached_matrices(timer, "sms", [csv_path], build, tag, use_cache)
+    else:
+        arrays, _ = build()
+    X, y = arrays["X"], np.asarray(arrays["y"])
+
+    # Split into Training & Test Set
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    if feedback:
+        X_train = scipy.sparse.vstack([X_train, vectorizer.transform(clean_texts([r["text"] for r in feedback]))])
+        y_train = np.concatenate([y_train, [LABELS[r["label"]] for r in feedback]])
+
+    # Train Naive Bayes Classifier
+    with timer.stage("fit"):
+        model = MultinomialNB()
+        model.fit(X_train, y_train)
+
+    # Evaluate Model
+    with timer.stage("evaluate"):
+        y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    #print(f"Accuracy: {accuracy * 100:.2f}%")
+    return vectorizer, model, {"accuracy": float(accuracy), "vectorizer": vectorizer_kind,
+                               "feedback_records": len(feedback)}
+
+# feedback_offset: how far into the feedback store the model has already learned
+def save_model(vectorizer, model, metrics=None, feedback_offset=0):
+    return artifacts.save_artifact(ARTIFACT_NAME, {
+        "vectorizer.joblib": lambda path: joblib.dump(vectorizer, path),
+        "model.joblib": lambda path: joblib.dump(model, path),
+    }, metadata={"metrics": metrics or {}, "feedback_offset": feedback_offset})
 
-# Convert text into numerical features using TF-IDF
-vectorizer = TfidfVectorizer(stop_words="english", max_features=3000)
-X = vectorizer.fit_transform(df["Message"])
-y = df["Label"]
+# Load the persisted vectorizer + classifier once per process; train in-process only if none was exported yet
+def load_model():
+    try:
+        artifact = artifacts.load_artifact(ARTIFACT_NAME)
+    except artifacts.ArtifactNotFound as exc:
+        if not artifacts.AUTO_TRAIN:
+            return None, None, None, 0
+        print(f"Warning: {exc} Training the SMS model in-process.")
+        vectorizer, model, _ = train_model()
+        return vectorizer, model, None, 0
+    vectorizer = joblib.load(artifact.path("vectorizer.joblib"))
+    model = joblib.load(artifact.path("model.joblib"))
+    return vectorizer, model, artifact.version, artifact.metadata.get("feedback_offset", 0)
 
-# Split into Training & Test Set
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+class SpamScorer:
+    """The fitted vectorizer and classifier, without the training messages or matrices.
 
-# Train Naive Bayes Classifier
-model = MultinomialNB()
-model.fit(X_train, y_train)
+    On hashing features the classifier keeps learning from reported messages
+    (MultinomialNB.partial_fit); a TF-IDF vocabulary can only change with a full retrain.
+    Updates are fitted on a copy of the classifier and swapped in, so predictions never
+    see a half-updated one and don't wait for the lock.
+    """
 
-# Predictions
-y_pred = model.predict(X_test)
+    __slots__ = ("vectorizer", "model", "version", "artifact_version", "feedback_offset", "checked_at", "lock")
 
-# Evaluate Model
-accuracy = accuracy_score(y_test, y_pred)
-#print(f"Accuracy: {accuracy * 100:.2f}%")
+    def __init__(self, vectorizer, model, version=None, feedback_offset=0):
+        self.vectorizer = vectorizer
+        self.model = model
+        self.version = version
+        self.artifact_version = version
+        self.feedback_offset = feedback_offset
+        self.checked_at = None  # when catch_up last looked at the feedback store
+        self.lock = threading.RLock()
 
+    # None when there is no exported model and in-process training is disabled
+    @classmethod
+    def load(cls, feedback=None):
+        vectorizer, model, version, feedback_offset = load_model()
+        if model is None:
+            return None
+        scorer = cls(vectorizer, model, version, feedback_offset)
+        if feedback is not None:
+            scorer.catch_up(feedback)
+        return scorer
+
+    @property
+    def incremental(self):
+        return isinstance(self.vectorizer, HashingVectorizer)
+
+    def learn(self, texts, labels):
+        if not self.incremental:
+            raise RuntimeError("Incremental updates need hashing features. "
+                               "Run `python manage.py train_models sms --sms-vectorizer hashing`.")
+        X = self.vectorizer.transform(clean_texts(texts))
+        with self.lock:
+            model = copy.deepcopy(self.model)
+            model.partial_fit(X, labels)
+            self.model = model
+
+    # Learn the reports appended to the store since this model last read it (also the ones
+    # other worker processes appended). Returns how many were learned. With an `interval`
+    # (seconds) the store is looked at no more often than that, e.g. on the request path.
+    def catch_up(self, feedback, interval=0):
+        if not self.incremental:
+            return 0
+        now = time.monotonic()
+        if interval and self.checked_at is not None and now - self.checked_at < interval:
+            return 0
+        self.checked_at = now
+        if feedback.size() <= self.feedback_offset:
+            return 0
+        with self.lock:
+            records, offset = feedback.read(self.feedback_offset)
+            if records:
+                self.learn([r["text"] for r in records], [LABELS[r["label"]] for r in records])
+            self.feedback_offset = offset
+            # Responses cached for the model before this update must not be served for it
+            if self.artifact_version is not None:
+                self.version = f"{self.artifact_version}+{offset}"
+        return len(records)
+
+    def accuracy(self, messages, labels):
+        return float(accuracy_score(labels, self.predict_spam_proba(messages) >= 0.5))
+
+    # Function to Predict Spam/Ham and give output
+    def predict_spam(self, text):
+        text = clean_text(text)
+        text_vectorized = self.vectorizer.transform([text])
+        prediction = self.model.predict(text_vectorized)
+        return {"result": "Spam"} if prediction[0] == 1 else {"result": "Not Spam"}
+
+    # Spam probability for many messages: one sparse transform and one predict_proba call
+    def predict_spam_proba(self, texts):
+        model = self.model  # read once: learn() may swap in an updated copy meanwhile
+        text_vectorized = self.vectorizer.transform(clean_texts(texts))
+        return model.predict_proba(text_vectorized)[:, 1]
+
+
+feedback_store = FeedbackStore.for_model(ARTIFACT_NAME)
+# Loaded on first use (or by the server's warm-up), not at import
+models.register("sms", lambda: SpamScorer.load(feedback_store))
+
+# smsScam.scorer: the loaded SpamScorer
+def __getattr__(name):
+    if name == "scorer":
+        return models.get("sms")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Function to Predict Spam/Ham and give output
 def predict_spam(text):
-    text = clean_text(text)
-    text_vectorized = vectorizer.transform([text])
-    prediction = model.predict(text_vectorized)
-    return {"result": "Spam"} if prediction[0] == 1 else {"result": "Not Spam"}
+    scorer = models.get("sms")
+    with metrics.model_call("sms"):
+        return scorer.predict_spam(text)
+
+def predict_spam_proba(texts):
+    scorer = models.get("sms")
+    with metrics.model_call("sms", len(texts)):
+        return scorer.predict_spam_proba(texts)
+
+# Store a user's label for a message and learn it right away (incremental models)
+def report_feedback(text, label):
+    feedback_store.append(text, label)
+    scorer = models.get("sms")
+    if scorer is not None:
+        scorer.catch_up(feedback_store)
+
+# Full retrain on spam.csv plus every report so far (the latest label wins for a repeated
+# message), compared on the spam.csv test split with the model that learned incrementally
+def compact_feedback(csv_path=SPAM_CSV, vectorizer_kind="hashing"):
+    records, offset = feedback_store.read(0)
+    latest = {clean_text(record["text"]): record for record in records}
+    vectorizer, model, metrics = train_model(csv_path, vectorizer_kind, list(latest.values()))
+
+    incremental = SpamScorer.load(feedback_store)
+    incremental_accuracy = None
+    if incremental is not None:
+        incremental_accuracy = incremental.accuracy(*holdout_set(csv_path))
+    report = {
+        "feedback_records": len(records),
+        "distinct_messages": len(latest),
+        "feedback_offset": offset,
+        "retrained_accuracy": metrics["accuracy"],
+        "incremental_accuracy": incremental_accuracy,
+        "incremental_version": incremental.version if incremental is not None else None,
+        "drift": None if incremental_accuracy is None else incremental_accuracy - metrics["accuracy"],
+    }
+    return vectorizer, model, metrics, report
+
+# Messages from concurrent requests share one transform/predict_proba call (FRAUDLENS_MICROBATCH)
+spam_batcher = MicroBatcher.from_settings(predict_spam_proba)
+
+def spam_verdict(probability):
+    scam_probability = round(float(probability) * 100, 2)
+    if probability >= 0.5:
+        return {"result": "Spam", "scam_probability": scam_probability, "message": "Likely a scam"}
+    return {"result": "Not Spam", "scam_probability": scam_probability, "message": "Looks legitimate"}
 
+# Score a list of messages; results keep the input order and invalid entries get an "error"
+def predict_spam_batch(texts):
+    results = [None] * len(texts)
+    valid = []
+    for i, text in enumerate(texts):
+        if isinstance(text, str):
+            valid.append((i, text))
+        else:
+            results[i] = {"error": "message must be a string"}
 
+    if valid:
+        probabilities = spam_batcher.submit_many([text for _, text in valid])
+        for (i, _), probability in zip(valid, probabilities):
+            results[i] = spam_verdict(probability)
+    return results
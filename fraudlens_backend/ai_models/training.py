@@ -0,0 +1,136 @@
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+
+try:
+    from ai_models.registry import MODULES
+except ImportError:  # running as a script from inside ai_models/
+    from registry import MODULES
+
+# Training jobs for `manage.py train_models`: each model trains and exports on its own,
+# optionally in a separate process with its own thread budget, and reports how long
+# every stage took (import, load, encode, smote, fit, evaluate, export).
+MODELS = ["trust", "sms", "fraud"]
+THREAD_VARIABLES = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+        self.cache = {}  # matrix name -> "hit" / "miss" / "off"
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        self.stages[name] = round(self.stages.get(name, 0.0) + seconds, 4)
+
+
+def cached_matrices(timer, name, sources, build, tag="", use_cache=True):
+    """matrix_cache.load_or_build(), timed: build() records its own load/encode stages and
+    reading a cached entry counts as "load"."""
+    try:
+        from ai_models import matrix_cache
+    except ImportError:  # running as a script from inside ai_models/
+        import matrix_cache
+
+    started = time.perf_counter()
+    arrays, meta, hit = matrix_cache.load_or_build(name, sources, build, tag=tag, enabled=use_cache)
+    if hit:
+        timer.record("load", time.perf_counter() - started)
+    timer.cache[name] = "off" if not use_cache else "hit" if hit else "miss"
+    return arrays, meta
+
+
+def _train_trust(timer, threads, use_cache, options):
+    from ai_models import trust
+
+    model, lexical_model, metrics = trust.train_model(timer=timer, n_jobs=threads, use_cache=use_cache)
+    with timer.stage("export"):
+        return trust.save_model(model, lexical_model, metrics), metrics
+
+
+def _train_sms(timer, threads, use_cache, options):
+    from ai_models import smsScam
+
+    vectorizer, model, metrics = smsScam.train_model(vectorizer_kind=options.get("sms_vectorizer", "hashing"),
+                                                     timer=timer, use_cache=use_cache)
+    with timer.stage("export"):
+        return smsScam.save_model(vectorizer, model, metrics), metrics
+
+
+def _train_fraud(timer, threads, use_cache, options):
+    from ai_models import transactionFraud
+
+    csv_path = options.get("transactions") or transactionFraud.TRANSACTIONS_CSV
+    booster, label_encoders, feature_columns, metrics = transactionFraud.train_model(
+        csv_path, timer=timer, n_jobs=threads, use_cache=use_cache)
+    with timer.stage("export"):
+        return transactionFraud.save_model(booster, label_encoders, feature_columns, metrics), metrics
+
+
+TRAINERS = {"trust": _train_trust, "sms": _train_sms, "fraud": _train_fraud}
+
+
+def train_job(name, threads=None, use_cache=True, options=None):
+    """Train and export one model. Returns its version, metrics and per-stage seconds."""
+    if threads:
+        # Read by OpenMP/BLAS when they load: effective for a fresh (spawned) process
+        for variable in THREAD_VARIABLES:
+            os.environ[variable] = str(threads)
+    from threadpoolctl import threadpool_limits
+
+    try:
+        from ai_models import artifacts
+    except ImportError:
+        import artifacts
+    artifacts.AUTO_TRAIN = False  # importing a model module must not train it first
+
+    timer = StageTimer()
+    started = time.perf_counter()
+    with timer.stage("import"):  # the ML libraries, in a fresh process
+        importlib.import_module(MODULES[name])
+    # ...and capped at runtime too, for libraries this process had already loaded
+    with threadpool_limits(limits=threads) if threads else nullcontext():
+        version, metrics = TRAINERS[name](timer, threads, use_cache, options or {})
+    return {
+        "model": name,
+        "version": version,
+        "metrics": metrics,
+        "seconds": round(time.perf_counter() - started, 3),
+        "stages": timer.stages,
+        "cache": timer.cache,
+        "threads": threads,
+        "pid": os.getpid(),
+    }
+
+
+def run_jobs(names, processes=1, threads=None, use_cache=True, options=None):
+    """Yield (name, result or exception) as each job finishes. `threads` maps model names
+    to thread counts. With processes > 1 jobs run in spawned processes: forking a parent
+    that already started OpenMP threads can deadlock the child."""
+    threads = threads or {}
+    if processes <= 1:
+        for name in names:
+            try:
+                yield name, train_job(name, threads.get(name), use_cache, options)
+            except Exception as exc:
+                yield name, exc
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        futures = {pool.submit(train_job, name, threads.get(name), use_cache, options): name for name in names}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as exc:
+                yield futures[future], exc
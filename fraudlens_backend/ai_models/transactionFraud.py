@@ -1,23 +1,27 @@
 import pandas as pd
 import numpy as np
 import lightgbm as lgb
-import matplotlib.pyplot as plt
+from pathlib import Path
 from sklearn.model_selection import train_test_split
 from imblearn.over_sampling import SMOTE  
 from sklearn.preprocessing import LabelEncoder  
 from sklearn.metrics import classification_report, accuracy_score
 
-# Load dataset
-df = pd.read_csv("transactions.csv")
+try:
+    from ai_models import artifacts, feature_store, metrics
+    from ai_models.categorical_codec import CategoricalCodec
+    from ai_models.registry import models
+    from ai_models.training import StageTimer
+except ImportError:  # running as a script from inside ai_models/
+    import artifacts
+    import feature_store
+    import metrics
+    from categorical_codec import CategoricalCodec
+    from registry import models
+    from training import StageTimer
 
-# Convert date and extract day of the week
-df["Transaction_Date"] = pd.to_datetime(df["Transaction_Date"], dayfirst=True, errors='coerce')
-df["Transaction_Day"] = df["Transaction_Date"].dt.dayofweek
-
-# Remove unwanted columns (State, Transaction_Location, Age, Gender)
-df.drop(columns=["Transaction_ID", "Customer_ID", "Transaction_Date", "City", "Bank_Branch",
-                 "Customer_Name", "Customer_Contact", "Customer_Email", 
-                 "Transaction_Location", "State", "Age", "Gender"], inplace=True)
+TRANSACTIONS_CSV = feature_store.TRANSACTIONS_CSV
+ARTIFACT_NAME = "transaction_fraud"
 
 # Assign Higher Fraud Risk to `Transaction_Currency`
 currency_risk = {
@@ -28,7 +32,6 @@ currency_risk = {
     "GBP": 1.7,  
     "JPY": 1.8
 }
-df["Currency_Risk"] = df["Transaction_Currency"].map(currency_risk).fillna(1.0)
 
 # Introduce Device Risk Factor
 device_risk = {
@@ -38,119 +41,350 @@ device_risk = {
     "Android App": 1.2,
     "iOS App": 1.0
 }
-df["Device_Risk"] = df["Device_Type"].map(device_risk).fillna(1.0)
-
-# **Boost Feature Importance for `Transaction_Currency` & `Device_Type`**
-df["Transaction_Currency_Encoded"] = df["Transaction_Currency"]
-df["Device_Type_Encoded"] = df["Device_Type"]
-df["Currency_Device_Interaction"] = df["Currency_Risk"] * df["Device_Risk"]  # Interaction effect
-
-# Define Features & Target
-X = df.drop(columns=["Is_Fraud"])  # Exclude target column
-y = df["Is_Fraud"]  # Target variable
-
-# Identify categorical columns
-categorical_features = X.select_dtypes(include=['object']).columns.tolist()
-
-# Encode categorical columns using Label Encoding
-label_encoders = {}
-for col in categorical_features:
-    le = LabelEncoder()
-    X[col] = le.fit_transform(X[col])
-    label_encoders[col] = le  # Save encoder for later use
-
-# Train-Test Split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-
-# Apply SMOTE (Include 90% Fraud Cases)
-smote = SMOTE(sampling_strategy=0.9, random_state=42)
-X_train_smote, y_train_smote = smote.fit_resample(X_train, y_train)
-
-# Train LightGBM Model (Force `Transaction_Currency` & `Device_Type` to be in Top Features)
-lgb_model = lgb.LGBMClassifier(
-    n_estimators=800,  # More trees for feature separation
-    learning_rate=0.015, 
-    max_depth=20, 
-    boosting_type='gbdt', 
-    objective='binary', 
-    feature_fraction=0.8,  # Higher chance of selecting important features
-    min_gain_to_split=0.3,  
-    importance_type='gain',  # Focus on important splits
-    random_state=42
-)
-lgb_model.fit(X_train_smote, y_train_smote)
-
-# Evaluate Model
-y_pred = lgb_model.predict(X_test)
-print("Accuracy:", accuracy_score(y_test, y_pred))
-print(classification_report(y_test, y_pred))
-
-# Plot Feature Importance to Check Key Fraud Indicators
-feature_importance = pd.Series(lgb_model.feature_importances_, index=X.columns)
-feature_importance.nlargest(10).plot(kind='barh')
-plt.title("Top 10 Feature Importance (Boosted `Transaction_Currency` & `Device_Type`)")
-plt.show()
-
-# Function to Predict Fraud (Currency & Device Type Impact Increased Further)
-def predict_fraud(transaction, fraud_threshold=0.35):  # Adjusted threshold for better fraud detection
-    transaction_df = pd.DataFrame([transaction])
-
-    # Remove ignored features before prediction
-    transaction_df.drop(columns=["State", "Transaction_Location", "Age", "Gender"], errors='ignore', inplace=True)
-
-    # Assign Currency Risk & Device Risk Multiplier
-    transaction_df["Currency_Risk"] = transaction_df["Transaction_Currency"].map(currency_risk).fillna(1.0)
-    transaction_df["Device_Risk"] = transaction_df["Device_Type"].map(device_risk).fillna(1.0)
-    transaction_df["Currency_Device_Interaction"] = transaction_df["Currency_Risk"] * transaction_df["Device_Risk"]
-
-    # Encode categorical features
-    for col, le in label_encoders.items():
-        if col in transaction_df.columns:
-            transaction_df[col] = transaction_df[col].map(lambda x: le.transform([x])[0] if x in le.classes_ else -1)
-        else:
-            print(f"Warning: Column '{col}' is missing in input transaction! Assigning default value.")
-            transaction_df[col] = -1  # Assign unknown category
-    
-    # Align columns with training data
-    transaction_df = transaction_df.reindex(columns=X.columns, fill_value=0)
-
-    # Use predict_proba() to get fraud probability & Scale with Currency & Device Risk
-    fraud_prob = lgb_model.predict_proba(transaction_df)[:, 1][0] * transaction_df["Currency_Device_Interaction"].values[0]
-
-    return "Fraudulent" if fraud_prob > fraud_threshold else "Legitimate"
-
-# Example Test Cases (Currency & Device Type Have Even Stronger Effect)
-legit_transaction = {
-    "Transaction_Amount": 200.0,  
-    "Account_Balance": 5000.0,  
-    "Transaction_Time": 14,  
-    "Transaction_Day": 2,  
-    "Days_Since_First_Transaction": 1500,  
-    "Account_Type": "Savings",
-    "Transaction_Type": "Card Payment",
-    "Merchant_Category": "Grocery",
-    "Merchant_ID": "M56789",
-    "Transaction_Device": "iOS App",
-    "Transaction_Description": "Supermarket Purchase",
-    "Device_Type": "iOS App",
-    "Transaction_Currency": "USD"
-}
 
-fraud_transaction = {
-    "Transaction_Amount": 9500.0,  
-    "Account_Balance": 200.0,  
-    "Transaction_Time": 2,  
-    "Transaction_Day": 6,  
-    "Days_Since_First_Transaction": 3,  
-    "Account_Type": "Checking",
-    "Transaction_Type": "Wire Transfer",
-    "Merchant_Category": "Cryptocurrency",
-    "Merchant_ID": "M98765",
-    "Transaction_Device": "Unknown",
-    "Transaction_Description": "Bitcoin Purchase",
-    "Device_Type": "Unregistered",
-    "Transaction_Currency": "Bitcoin"
+# Identifiers, PII and ignored features (State, Transaction_Location, Age, Gender)
+DROPPED_COLUMNS = ["Transaction_ID", "Customer_ID", "Transaction_Date", "City", "Bank_Branch",
+                   "Customer_Name", "Customer_Contact", "Customer_Email",
+                   "Transaction_Location", "State", "Age", "Gender"]
+
+# Explicit dtypes for reading transaction files: repeated strings as categories
+# instead of one Python object per cell
+TRANSACTION_DTYPES = {
+    "Transaction_Amount": "float64",
+    "Account_Balance": "float64",
+    "Account_Type": "category",
+    "Transaction_Type": "category",
+    "Merchant_Category": "category",
+    "Merchant_ID": "category",
+    "Transaction_Device": "category",
+    "Transaction_Description": "category",
+    "Device_Type": "category",
+    "Transaction_Currency": "category",
 }
 
-print("Legitimate Transaction Status:", predict_fraud(legit_transaction))
-print("Fraudulent Transaction Status:", predict_fraud(fraud_transaction))
\ No newline at end of file
+# Convert date, extract day of the week and remove unwanted columns
+def prepare_transactions(df):
+    return feature_store.parse_dates(df).drop(columns=DROPPED_COLUMNS, errors='ignore')
+
+# Stream a transactions CSV or Parquet file in chunks of at most `chunksize` rows. PII
+# columns are never loaded; Transaction_ID/Date are kept for the output and Transaction_Day.
+def read_transaction_chunks(source, chunksize):
+    source = Path(source)
+    wanted = lambda col: col not in DROPPED_COLUMNS or col in ("Transaction_ID", "Transaction_Date")
+
+    if source.suffix == ".parquet":
+        import pyarrow.parquet as pq  # optional: only needed for Parquet input
+        parquet = pq.ParquetFile(source)
+        columns = [col for col in parquet.schema_arrow.names if wanted(col)]
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, usecols=wanted, dtype=TRANSACTION_DTYPES, chunksize=chunksize)
+
+# Rows in a transactions file, for progress reporting (CSV: lines after the header)
+def count_transactions(source):
+    source = Path(source)
+    if source.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(source).metadata.num_rows
+    lines, last = 0, b"\n"
+    with open(source, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+# Model inputs for training: risk features and label-encoded categoricals
+def encode_transactions(df):
+    df["Currency_Risk"] = df["Transaction_Currency"].map(currency_risk).astype(float).fillna(1.0)
+    df["Device_Risk"] = df["Device_Type"].map(device_risk).astype(float).fillna(1.0)
+
+    # **Boost Feature Importance for `Transaction_Currency` & `Device_Type`**
+    df["Transaction_Currency_Encoded"] = df["Transaction_Currency"]
+    df["Device_Type_Encoded"] = df["Device_Type"]
+    df["Currency_Device_Interaction"] = df["Currency_Risk"] * df["Device_Risk"]  # Interaction effect
+
+    # Define Features & Target
+    X = df.drop(columns=["Is_Fraud"])  # Exclude target column
+    y = df["Is_Fraud"]  # Target variable
+
+    # Identify categorical columns
+    categorical_features = X.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
+
+    # Encode categorical columns using Label Encoding
+    label_encoders = {}
+    for col in categorical_features:
+        le = LabelEncoder()
+        if isinstance(X[col].dtype, pd.CategoricalDtype):
+            # Feature-store columns have sorted categories: their codes are what fit_transform
+            # would return, so nothing is refitted
+            le.classes_ = X[col].cat.categories.to_numpy(dtype=object)
+            X[col] = X[col].cat.codes.astype("int64")
+        else:
+            X[col] = le.fit_transform(X[col])
+        label_encoders[col] = le  # Save encoder for later use
+    return X, y, label_encoders
+
+# Encoded training frame from the transactions feature store
+def training_frame(csv_path=TRANSACTIONS_CSV, timer=None, use_cache=True):
+    timer = timer or StageTimer()
+    df = feature_store.transactions(csv_path, timer, use_cache).drop(columns=DROPPED_COLUMNS, errors='ignore')
+    with timer.stage("encode"):
+        return encode_transactions(df)
+
+# n_jobs: LightGBM threads (None: all cores)
+def train_model(csv_path=TRANSACTIONS_CSV, timer=None, n_jobs=None, use_cache=True):
+    timer = timer or StageTimer()
+    X, y, label_encoders = training_frame(csv_path, timer, use_cache)
+
+    # Train-Test Split
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    # Apply SMOTE (Include 90% Fraud Cases)
+    with timer.stage("smote"):
+        smote = SMOTE(sampling_strategy=0.9, random_state=42)
+        X_train_smote, y_train_smote = smote.fit_resample(X_train, y_train)
+
+    # Train LightGBM Model (Force `Transaction_Currency` & `Device_Type` to be in Top Features)
+    lgb_model = lgb.LGBMClassifier(
+        n_estimators=800,  # More trees for feature separation
+        learning_rate=0.015, 
+        max_depth=20, 
+        boosting_type='gbdt', 
+        objective='binary', 
+        feature_fraction=0.8,  # Higher chance of selecting important features
+        min_gain_to_split=0.3,  
+        importance_type='gain',  # Focus on important splits
+        random_state=42,
+        n_jobs=n_jobs,
+        deterministic=True,  # same model on every run with the same thread count
+        force_row_wise=True,
+        verbose=-1
+    )
+    with timer.stage("fit"):
+        lgb_model.fit(X_train_smote, y_train_smote)
+
+    # Evaluate Model
+    with timer.stage("evaluate"):
+        y_pred = lgb_model.predict(X_test)
+    print("Accuracy:", accuracy_score(y_test, y_pred))
+    print(classification_report(y_test, y_pred))
+
+    metrics = {"accuracy": float(accuracy_score(y_test, y_pred))}
+    return lgb_model.booster_, label_encoders, X.columns.tolist(), metrics
+
+def save_model(booster, label_encoders, feature_columns, metrics=None):
+    codec = CategoricalCodec.from_encoders(label_encoders)
+    return artifacts.save_artifact(ARTIFACT_NAME, {
+        "model.txt": booster.save_model,
+        "label_encoders.json": codec.save,
+    }, metadata={
+        "metrics": metrics or {},
+        "feature_columns": feature_columns,
+        "currency_risk": currency_risk,
+        "device_risk": device_risk,
+    })
+
+# Load the persisted booster, categorical codec and risk maps once per process; train in-process only if none was exported yet
+def load_model():
+    try:
+        artifact = artifacts.load_artifact(ARTIFACT_NAME)
+    except artifacts.ArtifactNotFound as exc:
+        if not artifacts.AUTO_TRAIN:
+            return None, None, None, currency_risk, device_risk, None
+        print(f"Warning: {exc} Training the transaction fraud model in-process.")
+        booster, label_encoders, feature_columns, _ = train_model()
+        codec = CategoricalCodec.from_encoders(label_encoders)
+        return booster, codec, feature_columns, currency_risk, device_risk, None
+
+    booster = lgb.Booster(model_file=str(artifact.path("model.txt")))
+    codec = CategoricalCodec.load(artifact.path("label_encoders.json"))
+    # Risk maps are part of the model: use the ones it was trained with
+    metadata = artifact.metadata
+    return (booster, codec, metadata["feature_columns"],
+            metadata["currency_risk"], metadata["device_risk"], artifact.version)
+
+# Build a frame from a list of transaction dicts. Numeric fields missing from a dict
+# become 0, like the reindex(fill_value=0) in predict_fraud.
+def _records_frame(records, encoded_columns, feature_columns):
+    df = pd.DataFrame.from_records(records)
+    for col in df.columns:
+        if col in encoded_columns or col not in feature_columns:
+            continue
+        missing_rows = np.flatnonzero(df[col].isna().to_numpy())
+        absent = [i for i in missing_rows if col not in records[i]]
+        if absent:
+            df.loc[df.index[absent], col] = 0
+    return df
+
+_warned_missing = set()
+
+
+class FraudScorer:
+    """Everything predict_fraud needs and nothing from training: the booster, the training
+    column order, the categorical codec and the risk maps the model was trained with."""
+
+    __slots__ = ("booster", "codec", "feature_columns", "currency_risk", "device_risk", "version")
+
+    def __init__(self, booster, codec, feature_columns, currency_risk, device_risk, version=None):
+        self.booster = booster
+        self.codec = codec  # unknown categories encode as -1
+        self.feature_columns = feature_columns
+        self.currency_risk = currency_risk
+        self.device_risk = device_risk
+        self.version = version
+
+    # None when there is no exported model and in-process training is disabled
+    @classmethod
+    def load(cls):
+        booster, codec, feature_columns, currency_risk, device_risk, version = load_model()
+        if booster is None:
+            return None
+        return cls(booster, codec, feature_columns, currency_risk, device_risk, version)
+
+    # Function to Predict Fraud (Currency & Device Type Impact Increased Further)
+    def predict_fraud(self, transaction, fraud_threshold=0.35):  # Adjusted threshold for better fraud detection
+        transaction_df = pd.DataFrame([transaction])
+
+        # Remove ignored features before prediction
+        transaction_df.drop(columns=["State", "Transaction_Location", "Age", "Gender"], errors='ignore', inplace=True)
+
+        # Assign Currency Risk & Device Risk Multiplier
+        transaction_df["Currency_Risk"] = transaction_df["Transaction_Currency"].map(self.currency_risk).fillna(1.0)
+        transaction_df["Device_Risk"] = transaction_df["Device_Type"].map(self.device_risk).fillna(1.0)
+        transaction_df["Currency_Device_Interaction"] = transaction_df["Currency_Risk"] * transaction_df["Device_Risk"]
+
+        # Encode categorical features
+        for col in self.codec.columns:
+            if col in transaction_df.columns:
+                transaction_df[col] = self.codec.encode(col, transaction[col])
+            else:
+                print(f"Warning: Column '{col}' is missing in input transaction! Assigning default value.")
+                transaction_df[col] = -1  # Assign unknown category
+
+        # Align columns with training data
+        transaction_df = transaction_df.reindex(columns=self.feature_columns, fill_value=0)
+
+        # Booster.predict() returns the fraud probability; Scale it with Currency & Device Risk.
+        # A plain float64 row skips LightGBM's DataFrame handling (same scores, ~4x less overhead).
+        features = transaction_df.to_numpy(dtype=np.float64)
+        fraud_prob = self.booster.predict(features)[0] * transaction_df["Currency_Device_Interaction"].values[0]
+
+        return "Fraudulent" if fraud_prob > fraud_threshold else "Legitimate"
+
+    # Feature matrix in training column order plus the Currency x Device risk multiplier,
+    # for a DataFrame of transactions
+    def feature_matrix(self, df):
+        n = len(df)
+
+        # Assign Currency Risk & Device Risk Multiplier column-wise
+        currency = df["Transaction_Currency"].map(self.currency_risk).fillna(1.0).to_numpy(dtype=np.float64)
+        device = df["Device_Type"].map(self.device_risk).fillna(1.0).to_numpy(dtype=np.float64)
+        computed = {
+            "Currency_Risk": currency,
+            "Device_Risk": device,
+            "Currency_Device_Interaction": currency * device,
+        }
+
+        # Fill the feature matrix in training column order
+        matrix = np.zeros((n, len(self.feature_columns)), dtype=np.float64)
+        for j, col in enumerate(self.feature_columns):
+            if col in self.codec.columns:
+                if col in df.columns:
+                    matrix[:, j] = self.codec.encode_column(col, df[col])
+                else:
+                    if col not in _warned_missing:
+                        # Once per column, not once per chunk of a streamed file
+                        print(f"Warning: Column '{col}' is missing in input transactions! Assigning default value.")
+                        _warned_missing.add(col)
+                    matrix[:, j] = -1  # Assign unknown category
+            elif col in computed:
+                matrix[:, j] = computed[col]
+            elif col in df.columns:
+                matrix[:, j] = df[col].to_numpy(dtype=np.float64)
+        return matrix, computed["Currency_Device_Interaction"]
+
+    # Score a whole batch of transactions (DataFrame or list of dicts) with one LightGBM call.
+    # Returns (fraud_probabilities, labels) matching predict_fraud() row by row.
+    def predict_fraud_batch(self, transactions, fraud_threshold=0.35):
+        if isinstance(transactions, pd.DataFrame):
+            df = transactions
+        else:
+            df = _records_frame(list(transactions), self.codec.columns, self.feature_columns)
+        matrix, interaction = self.feature_matrix(df)
+        fraud_probs = self.booster.predict(matrix) * interaction
+        labels = np.where(fraud_probs > fraud_threshold, "Fraudulent", "Legitimate")
+        return fraud_probs, labels
+
+
+# Loaded on first use, not at import
+models.register("fraud", FraudScorer.load)
+
+# transactionFraud.scorer: the loaded FraudScorer
+def __getattr__(name):
+    if name == "scorer":
+        return models.get("fraud")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def predict_fraud(transaction, fraud_threshold=0.35):
+    scorer = models.get("fraud")
+    with metrics.model_call("fraud"):
+        return scorer.predict_fraud(transaction, fraud_threshold)
+
+def predict_fraud_batch(transactions, fraud_threshold=0.35):
+    scorer = models.get("fraud")
+    if not isinstance(transactions, pd.DataFrame):
+        transactions = list(transactions)
+    with metrics.model_call("fraud", len(transactions)):
+        return scorer.predict_fraud_batch(transactions, fraud_threshold)
+
+if __name__ == "__main__":
+    import matplotlib
+    matplotlib.use("Agg")  # headless: write the chart to a file instead of blocking on a window
+    import matplotlib.pyplot as plt
+
+    # Plot Feature Importance to Check Key Fraud Indicators
+    scorer = models.get("fraud")
+    feature_importance = pd.Series(scorer.booster.feature_importance(importance_type='gain'), index=scorer.feature_columns)
+    feature_importance.nlargest(10).plot(kind='barh')
+    plt.title("Top 10 Feature Importance (Boosted `Transaction_Currency` & `Device_Type`)")
+    plt.savefig("transaction_fraud_feature_importance.png", bbox_inches="tight")
+    print("Feature importance chart: transaction_fraud_feature_importance.png")
+
+    # Example Test Cases (Currency & Device Type Have Even Stronger Effect)
+    legit_transaction = {
+        "Transaction_Amount": 200.0,  
+        "Account_Balance": 5000.0,  
+        "Transaction_Time": 14,  
+        "Transaction_Day": 2,  
+        "Days_Since_First_Transaction": 1500,  
+        "Account_Type": "Savings",
+        "Transaction_Type": "Card Payment",
+        "Merchant_Category": "Grocery",
+        "Merchant_ID": "M56789",
+        "Transaction_Device": "iOS App",
+        "Transaction_Description": "Supermarket Purchase",
+        "Device_Type": "iOS App",
+        "Transaction_Currency": "USD"
+    }
+
+    fraud_transaction = {
+        "Transaction_Amount": 9500.0,  
+        "Account_Balance": 200.0,  
+        "Transaction_Time": 2,  
+        "Transaction_Day": 6,  
+        "Days_Since_First_Transaction": 3,  
+        "Account_Type": "Checking",
+        "Transaction_Type": "Wire Transfer",
+        "Merchant_Category": "Cryptocurrency",
+        "Merchant_ID": "M98765",
+        "Transaction_Device": "Unknown",
+        "Transaction_Description": "Bitcoin Purchase",
+        "Device_Type": "Unregistered",
+        "Transaction_Currency": "Bitcoin"
+    }
+
+    print("Legitimate Transaction Status:", predict_fraud(legit_transaction))
+    print("Fraudulent Transaction Status:", predict_fraud(fraud_transaction))
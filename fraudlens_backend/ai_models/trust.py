@@ -1,18 +1,126 @@
+import numpy as np
 import pandas as pd
 import re
 import requests
 import socket
-from urllib.parse import urlparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from urllib.parse import urlparse, urlsplit, urlunsplit
 from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
 from xgboost import XGBClassifier
 import warnings
 warnings.simplefilter(action='ignore', category=UserWarning)
 
+try:
+    from ai_models import artifacts, compiled_trees, matrix_cache, metrics
+    from ai_models.microbatch import MicroBatcher
+    from ai_models.registry import models
+    from ai_models.reputation_cache import ReputationCache
+    from ai_models.singleflight import SingleFlight
+    from ai_models.training import StageTimer, cached_matrices
+except ImportError:  # running as a script from inside ai_models/
+    import artifacts
+    import compiled_trees
+    import matrix_cache
+    import metrics
+    from microbatch import MicroBatcher
+    from registry import models
+    from reputation_cache import ReputationCache
+    from singleflight import SingleFlight
+    from training import StageTimer, cached_matrices
 
+PHISHTANK_CSV = Path(__file__).resolve().parent / "phishtank.csv"
+ARTIFACT_NAME = "trust"
+
+
+# Probe endpoints and limits; benchmarks point the URLs (and resolve_host) at local stubs
+SSL_PROBE_URL = "https://{domain}"
+GOOGLE_INDEX_URL = "https://www.google.com/search?q=site:{url}"
+WEB_TRAFFIC_URL = "https://data.alexa.com/data?cli=10&url={domain}"
+PROBE_TIMEOUT = 3  # seconds, per HTTP probe
+REQUEST_DEADLINE = 5  # seconds, for all probes of one extract_features() call
+BATCH_DEADLINE = 30  # seconds, for all probes of one extract_features_batch() call
+PROBE_WORKERS = 32
+DNS_TIMEOUT = 2  # seconds, per DNS lookup
+DNS_WORKERS = 8
+
+TRUST_MODES = ("full", "offline", "tiered")
+# Lexical scores in [low, high) are not trusted on their own in "tiered" mode: that is
+# the High Risk / Suspicious range of trust_verdict(), where the network probes decide
+LEXICAL_UNCERTAIN_BAND = (30, 75)
+
+# Shared, bounded pool so a burst of requests can't spawn unbounded threads
+probe_executor = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="trust-probe")
+# socket.gethostbyname() has no timeout: lookups run on their own pool and are given up
+# after DNS_TIMEOUT, so a hanging resolver only ever ties up these threads, never the
+# probe workers
+dns_executor = ThreadPoolExecutor(max_workers=DNS_WORKERS, thread_name_prefix="trust-dns")
+reputation_cache = ReputationCache.from_settings()
+
+# Where a slow check-website goes: each network probe's duration (cache hits excluded)
+PROBE_SECONDS = metrics.histogram("fraudlens_probe_seconds", "Time spent in one trust probe call.", ["probe"])
+PROBE_TIMEOUTS = metrics.counter("fraudlens_probe_timeouts_total", "Probes that ran past the deadline or timed out, scored as failed.", ["probe"])
+PROBE_QUEUE_TIMEOUTS = metrics.counter("fraudlens_probe_queue_timeouts_total", "Probes that never got a probe worker before the deadline (pool saturated).", ["probe"])
+
+
+class PoolLoad:
+    """Probes waiting for a worker of a probe pool and probes running on one."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.queued = 0
+        self.running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, executor, fn, *args):
+        with self._lock:
+            self.queued += 1
+        future = executor.submit(self._run, fn, *args)
+        future.add_done_callback(self._cancelled)
+        return future
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def _cancelled(self, future):
+        if future.cancelled():  # never started
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "running": self.running, "queued": self.queued,
+                    "saturated": self.running >= self.workers}
+
+probe_load = PoolLoad(PROBE_WORKERS)
+
+
+# Raises TimeoutError when there is no answer within DNS_TIMEOUT: the probe's result is
+# then unknown, not "no record", and the probe is scored like one that missed the deadline
+def resolve_host(host):
+    future = dns_executor.submit(socket.gethostbyname, host)
+    try:
+        return future.result(timeout=DNS_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+@PROBE_SECONDS.time(probe="ip")
 def check_ip_address(url):
     try:
-        ip = socket.gethostbyname(urlparse(url).netloc)
+        ip = resolve_host(urlparse(url).netloc)
         return 1 if re.match(r'\d+\.\d+\.\d+\.\d+', ip) else 0
+    except TimeoutError:
+        raise
     except:
         return 0
 
@@ -20,95 +128,418 @@ def check_shortening_service(url):
     shortening_services = ["bit.ly", "goo.gl", "tinyurl.com", "ow.ly", "t.co"]
     return 1 if any(service in url for service in shortening_services) else 0
 
+@PROBE_SECONDS.time(probe="ssl")
 def check_ssl_state(domain):
     try:
-        response = requests.get("https://" + domain, timeout=3)
+        response = requests.get(SSL_PROBE_URL.format(domain=domain), timeout=PROBE_TIMEOUT)
         return 1 if response.url.startswith("https") else 0
     except:
         return 0
 
+@PROBE_SECONDS.time(probe="index")
 def check_google_index(url):
     try:
-        google_api = f"https://www.google.com/search?q=site:{url}"
-        response = requests.get(google_api)
+        google_api = GOOGLE_INDEX_URL.format(url=url)
+        response = requests.get(google_api, timeout=PROBE_TIMEOUT)
         return 1 if "did not match any documents" not in response.text else 0
     except:
         return 0
 
+@PROBE_SECONDS.time(probe="dns")
 def check_dns_record(domain):
     try:
-        socket.gethostbyname(domain)
+        resolve_host(domain)
         return 1
+    except TimeoutError:
+        raise
     except:
         return 0
 
+@PROBE_SECONDS.time(probe="traffic")
 def check_web_traffic(domain):
     try:
-        alexa_api = f"https://data.alexa.com/data?cli=10&url={domain}"
-        response = requests.get(alexa_api)
+        alexa_api = WEB_TRAFFIC_URL.format(domain=domain)
+        response = requests.get(alexa_api, timeout=PROBE_TIMEOUT)
         return 1 if "RANK" in response.text else 0
     except:
         return 0
 
-def extract_features(url):
+PROBES = {
+    "ip": check_ip_address,
+    "ssl": check_ssl_state,
+    "dns": check_dns_record,
+    "traffic": check_web_traffic,
+    "index": check_google_index,
+}
+
+# Which argument each probe is called with: the full url or only its domain
+def probe_targets(url, domain):
+    return {"ip": url, "ssl": domain, "dns": domain, "traffic": domain, "index": url}
+
+# Run each distinct (probe, target) job once, concurrently, skipping those with a cached
+# result. Probes that miss the deadline (or time out, like a DNS lookup) count as failed
+# (0), the same value the probes return on any error, and are not cached; their (probe,
+# target) jobs are added to `timed_out` when a set is passed, so a verdict scored from
+# them can be marked partial. Probes still queued at the deadline never got a worker:
+# they are counted apart (PROBE_QUEUE_TIMEOUTS), as the pool is saturated.
+# Probes run on probe_executor (its load is in probe_load) unless another `executor` is
+# given (e.g. for bulk scans, so they can't hold up interactive requests).
+def run_probe_jobs(jobs, deadline, timed_out=None, executor=None):
+    results = {}
+    futures = {}
+    for name, target in jobs:
+        found, value = reputation_cache.get(name, target)
+        if found:
+            results[(name, target)] = value
+        elif executor is None:
+            futures[(name, target)] = probe_load.submit(probe_executor, PROBES[name], target)
+        else:
+            futures[(name, target)] = executor.submit(PROBES[name], target)
+    wait(futures.values(), timeout=deadline)
+
+    for (name, target), future in futures.items():
+        if future.done() and future.exception() is None:
+            results[(name, target)] = future.result()
+            reputation_cache.set(name, target, results[(name, target)])
+        else:
+            if future.cancel():
+                PROBE_QUEUE_TIMEOUTS.inc(probe=name)
+            else:
+                PROBE_TIMEOUTS.inc(probe=name)
+            results[(name, target)] = 0
+            if timed_out is not None:
+                timed_out.add((name, target))
+    return results
+
+def run_probes(url, domain, deadline=None, timed_out=None):
+    deadline = REQUEST_DEADLINE if deadline is None else deadline
+    targets = probe_targets(url, domain)
+    results = run_probe_jobs(targets.items(), deadline, timed_out)
+    return {name: results[(name, target)] for name, target in targets.items()}
+
+def extract_features(url, deadline=None, timed_out=None):
     parsed_url = urlparse(url)
     domain = parsed_url.netloc
-    
-    features = {
-        "having_IP": check_ip_address(url),
+    probes = run_probes(url, domain, deadline, timed_out)
+    return build_features(url, domain, probes)
+
+# Probe every url of a batch under one deadline; urls sharing a domain share its probes
+def extract_features_batch(urls, deadline=None, timed_out=None, executor=None):
+    deadline = BATCH_DEADLINE if deadline is None else deadline
+    targets = [probe_targets(url, urlparse(url).netloc) for url in urls]
+    jobs = set()
+    for url_targets in targets:
+        jobs.update(url_targets.items())
+    results = run_probe_jobs(jobs, deadline, timed_out, executor)
+
+    rows = []
+    for url, url_targets in zip(urls, targets):
+        probes = {name: results[(name, target)] for name, target in url_targets.items()}
+        rows.append(build_features(url, urlparse(url).netloc, probes))
+    return rows
+
+# Features computed from the url string alone (no network)
+def lexical_features(url, domain):
+    return {
         "URL_Length": len(url),
         "Shortening_Service": check_shortening_service(url),
         "having_At_Symbol": 1 if "@" in url else 0,
         "double_slash_redirecting": 1 if "//" in url[7:] else 0,
         "Prefix_Suffix": 1 if "-" in domain else 0,
         "having_Sub_Domain": domain.count('.') - 1,
-        "SSLfinal_State": check_ssl_state(domain),
-        "Domain_registeration_length": check_dns_record(domain),
-        "Favicon": check_ssl_state(domain),
         "port": 1 if ":" in domain else 0,
         "HTTPS_token": 1 if "https" in domain else 0,
-        "Request_URL": check_google_index(url),
-        "URL_of_Anchor": check_google_index(url),
-        "Links_in_tags": check_google_index(url),
-        "SFH": check_google_index(url),
-        "Submitting_to_email": check_google_index(url),
-        "Abnormal_URL": check_google_index(url),
         "Redirect": 1 if "redirect" in url else 0,
+    }
+
+def named_features(url, domain, probes):
+    lexical = lexical_features(url, domain)
+    features = {
+        "having_IP": probes["ip"],
+        "URL_Length": lexical["URL_Length"],
+        "Shortening_Service": lexical["Shortening_Service"],
+        "having_At_Symbol": lexical["having_At_Symbol"],
+        "double_slash_redirecting": lexical["double_slash_redirecting"],
+        "Prefix_Suffix": lexical["Prefix_Suffix"],
+        "having_Sub_Domain": lexical["having_Sub_Domain"],
+        "SSLfinal_State": probes["ssl"],
+        "Domain_registeration_length": probes["dns"],
+        "Favicon": probes["ssl"],
+        "port": lexical["port"],
+        "HTTPS_token": lexical["HTTPS_token"],
+        "Request_URL": probes["index"],
+        "URL_of_Anchor": probes["index"],
+        "Links_in_tags": probes["index"],
+        "SFH": probes["index"],
+        "Submitting_to_email": probes["index"],
+        "Abnormal_URL": probes["index"],
+        "Redirect": lexical["Redirect"],
         "on_mouseover": 0,
         "RightClick": 0,
         "popUpWidnow": 0,
         "Iframe": 0,
-        "age_of_domain": check_dns_record(domain),
-        "DNSRecord": check_dns_record(domain),
-        "web_traffic": check_web_traffic(domain),
-        "Page_Rank": check_web_traffic(domain),
-        "Google_Index": check_google_index(url),
-        "Links_pointing_to_page": check_google_index(url),
-        "Statistical_report": check_google_index(url)
+        "age_of_domain": probes["dns"],
+        "DNSRecord": probes["dns"],
+        "web_traffic": probes["traffic"],
+        "Page_Rank": probes["traffic"],
+        "Google_Index": probes["index"],
+        "Links_pointing_to_page": probes["index"],
+        "Statistical_report": probes["index"]
     }
-    
-    return list(features.values())
+    return features
+
+def build_features(url, domain, probes):
+    return list(named_features(url, domain, probes).values())
+
+FEATURE_NAMES = list(named_features("", "", dict.fromkeys(PROBES, 0)))
+LEXICAL_INDEXES = [FEATURE_NAMES.index(name) for name in lexical_features("", "")]
+
+# lexical_features() on the dataset's scale (1 legitimate, 0 suspicious, -1 phishing) so
+# the lexical model sees inputs like the rows it was trained on
+def lexical_codes(url, domain):
+    lexical = lexical_features(url, domain)
+    length = lexical["URL_Length"]
+    sub_domains = domain.removeprefix("www.").count(".")
+    return [
+        1 if length < 54 else 0 if length <= 75 else -1,
+        -1 if lexical["Shortening_Service"] else 1,
+        -1 if lexical["having_At_Symbol"] else 1,
+        -1 if lexical["double_slash_redirecting"] else 1,
+        -1 if lexical["Prefix_Suffix"] else 1,
+        1 if sub_domains <= 1 else 0 if sub_domains == 2 else -1,
+        -1 if lexical["port"] else 1,
+        -1 if lexical["HTTPS_token"] else 1,
+        1 if url.count("//") > 1 else 0,
+    ]
+
+# Bump when the dataset preprocessing below changes so cached matrices are rebuilt
+FEATURES_TAG = "phishtank-features-1"
 
-# Load dataset and train model
-df = pd.read_csv(r".\ai_models\phishtank.csv")
-features = df.drop(columns=["index", "Result"])  # Remove unnecessary columns
-target = df["Result"].replace(-1, 0)  # Convert -1 to 0
+# Load dataset and train model (only called by `manage.py train_models` or as a fallback)
+# n_jobs: XGBoost threads (None: all cores)
+def train_model(csv_path=PHISHTANK_CSV, timer=None, n_jobs=None, use_cache=True):
+    timer = timer or StageTimer()
 
-X_train, X_test, y_train, y_test = train_test_split(features, target, test_size=0.2, random_state=42, stratify=target)
-model = XGBClassifier(n_estimators=100, learning_rate=0.1, use_label_encoder=False, eval_metric='logloss')
-model.fit(X_train, y_train)
+    def build():
+        with timer.stage("load"):
+            df = pd.read_csv(csv_path)
+            features = df.drop(columns=["index", "Result"])  # Remove unnecessary columns
+            target = df["Result"].replace(-1, 0)  # Convert -1 to 0
+        arrays, meta = matrix_cache.frame_arrays(features)
+        return {**arrays, "target": target.to_numpy()}, meta
+
+    arrays, meta = cached_matrices(timer, "phishtank", [csv_path], build, FEATURES_TAG, use_cache)
+    features = matrix_cache.arrays_frame(arrays, meta)
+    target = pd.Series(np.asarray(arrays["target"]), name="Result")
+
+    X_train, X_test, y_train, y_test = train_test_split(features, target, test_size=0.2, random_state=42, stratify=target)
+    with timer.stage("fit"):
+        model = XGBClassifier(n_estimators=100, learning_rate=0.1, use_label_encoder=False, eval_metric='logloss',
+                              n_jobs=n_jobs)
+        model.fit(X_train, y_train)
+
+        # Lexical-only model on the same split: dataset columns are in extract_features() order
+        lexical_model = XGBClassifier(n_estimators=100, learning_rate=0.1, eval_metric='logloss', n_jobs=n_jobs)
+        lexical_model.fit(X_train.iloc[:, LEXICAL_INDEXES], y_train)
+
+    with timer.stage("evaluate"):
+        metrics = {
+            "accuracy": float(accuracy_score(y_test, model.predict(X_test))),
+            "lexical_accuracy": float(accuracy_score(y_test, lexical_model.predict(X_test.iloc[:, LEXICAL_INDEXES]))),
+        }
+    return model, lexical_model, metrics
+
+def save_model(model, lexical_model, metrics=None):
+    return artifacts.save_artifact(ARTIFACT_NAME, {
+        "model.ubj": model.save_model,
+        "lexical_model.ubj": lexical_model.save_model,
+    }, metadata={"metrics": metrics or {}})
+
+# Load the persisted XGBoost models once per process; train in-process only if none was exported yet
+def load_model():
+    try:
+        artifact = artifacts.load_artifact(ARTIFACT_NAME)
+    except artifacts.ArtifactNotFound as exc:
+        if not artifacts.AUTO_TRAIN:
+            return None, None, None
+        print(f"Warning: {exc} Training the trust model in-process.")
+        model, lexical_model, _ = train_model()
+        return model, lexical_model, None
+    loaded = XGBClassifier()
+    loaded.load_model(artifact.path("model.ubj"))
+    lexical = None
+    if "lexical_model.ubj" in artifact.manifest["files"]:  # absent from artifacts exported before it existed
+        lexical = XGBClassifier()
+        lexical.load_model(artifact.path("lexical_model.ubj"))
+    return loaded, lexical, artifact.version
+
+class TrustScorer:
+    """The loaded trust models and nothing from training: the full and lexical XGBoost
+    classifiers plus their array-backed copies (FRAUDLENS_COMPILED_TREES=1)."""
+
+    __slots__ = ("model", "lexical_model", "compiled_model", "compiled_lexical_model", "version")
+
+    def __init__(self, model, lexical_model=None, version=None):
+        self.model = model
+        self.lexical_model = lexical_model
+        self.version = version
+        # Same scores as the native models, less per-call overhead
+        compile_model = compiled_trees.from_xgboost if compiled_trees.ENABLED else lambda estimator: None
+        self.compiled_model = compile_model(model)
+        self.compiled_lexical_model = compile_model(lexical_model) if lexical_model is not None else None
+
+    # None when there is no exported model and in-process training is disabled
+    @classmethod
+    def load(cls):
+        model, lexical_model, version = load_model()
+        if model is None:
+            return None
+        return cls(model, lexical_model, version)
+
+    # Positive-class probabilities; a few rows go through the compiled model when there is one
+    @staticmethod
+    def _predict_proba(estimator, compiled, rows):
+        if compiled is not None and len(rows) <= compiled_trees.ROW_LOOP_LIMIT:
+            return [compiled.predict_row(row) for row in rows]
+        return estimator.predict_proba(np.asarray(rows, dtype=float))[:, 1]
+
+    # Trust scores (probability of being legitimate x 100) for feature rows
+    def score(self, feature_rows):
+        predictions = self._predict_proba(self.model, self.compiled_model, feature_rows)
+        return [round(prediction * 100, 2) for prediction in predictions]
+
+    def score_lexical(self, lexical_rows):
+        if self.lexical_model is None:
+            raise RuntimeError("The trust artifact has no lexical model. Run `python manage.py train_models trust`.")
+        predictions = self._predict_proba(self.lexical_model, self.compiled_lexical_model, lexical_rows)
+        return [round(prediction * 100, 2) for prediction in predictions]
+
+
+# Loaded on first use (or by the server's warm-up), not at import
+models.register("trust", TrustScorer.load)
+
+# trust.scorer: the loaded TrustScorer
+def __getattr__(name):
+    if name == "scorer":
+        return models.get("trust")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Score many feature rows with a single XGBoost call
+def predict_trust_scores(feature_rows):
+    scorer = models.get("trust")
+    with metrics.model_call("trust", len(feature_rows)):
+        return scorer.score(feature_rows)
+
+# Network-free trust scores from the lexical model
+def predict_lexical_scores(urls):
+    scorer = models.get("trust")
+    with metrics.model_call("trust_lexical", len(urls)):
+        return scorer.score_lexical([lexical_codes(url, urlparse(url).netloc) for url in urls])
+
+# Single rows from concurrent requests are scored together (FRAUDLENS_MICROBATCH)
+trust_batcher = MicroBatcher.from_settings(predict_trust_scores)
+lexical_batcher = MicroBatcher.from_settings(predict_lexical_scores)
 
 # Function to predict trust score
-def predict_trust_score(url):
-    feature_values = extract_features(url)
-    prediction = model.predict_proba([feature_values])[:, 1][0]  # Probability of being a scam
-    trust_score = (prediction) * 100  # Convert to percentage (Higher = Safer)
-    return round(trust_score, 2)
+def predict_trust_score(url, timed_out=None):
+    feature_values = extract_features(url, timed_out=timed_out)
+    return trust_batcher.submit(feature_values)
+
+def predict_lexical_score(url):
+    return lexical_batcher.submit(url)
+
+inflight = SingleFlight()
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Spelling of a url that doesn't change what it points to: surrounding whitespace, the
+# case of the scheme and host, a default port and the #fragment (never sent to the site)
+# are dropped. The API scores this form, so equivalent urls share one result.
+def canonical_url(url):
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:  # e.g. "http://[::1" or a port that isn't a number: leave the url alone
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    userinfo, _, _ = parts.netloc.rpartition("@")
+    netloc = (userinfo + "@" if "@" in parts.netloc else "") + (f"[{host}]" if ":" in host else host)
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc += f":{port}"
+    return urlunsplit((scheme, netloc, parts.path, parts.query, ""))
+
+def is_uncertain(trust_score):
+    low, high = LEXICAL_UNCERTAIN_BAND
+    return low <= trust_score < high
 
 #Input URL to get FLTS
 #Returns as list in form [int score, str flag, str message]
-def run_trust(url):
-    trust_score = predict_trust_score(url)
+# mode: "full" (all probes), "offline" (lexical model only) or "tiered" (lexical, then
+# probes only when the lexical score falls in LEXICAL_UNCERTAIN_BAND)
+# Concurrent calls for the same url and mode share one probe run and score (each caller
+# gets its own copy of the result)
+def run_trust(url, mode="full"):
+    return dict(inflight.do((url, mode), _run_trust, url, mode))
+
+# A verdict scored with probes that missed the deadline (counted as failed) is marked
+# "partial": it may only reflect a slow network, so it is not cached.
+def probed_verdict(score, timed_out, mode):
+    verdict = trust_verdict(score) if mode == "full" else {**trust_verdict(score), "scoring": "full"}
+    if timed_out:
+        verdict["partial"] = True
+    return verdict
+
+def _run_trust(url, mode):
+    if mode != "full":
+        lexical_score = predict_lexical_score(url)
+        if mode == "offline" or not is_uncertain(lexical_score):
+            return {**trust_verdict(lexical_score), "scoring": "lexical"}
+    timed_out = set()
+    return probed_verdict(predict_trust_score(url, timed_out), timed_out, mode)
+
+# Whether the probes and feature extraction can parse url: urlsplit() raises ValueError on
+# e.g. an unclosed IPv6 bracket ("http://[::1")
+def is_valid_url(url):
+    try:
+        urlsplit(url)
+    except ValueError:
+        return False
+    return True
+
+# Score a list of urls; results keep the input order and invalid entries get an "error"
+def run_trust_batch(urls, mode="full", executor=None):
+    results = [None] * len(urls)
+    valid = []
+    for i, url in enumerate(urls):
+        if not isinstance(url, str) or not url.strip():
+            results[i] = {"url": url, "error": "url must be a non-empty string"}
+        elif not is_valid_url(url):
+            results[i] = {"url": url, "error": "invalid url"}
+        else:
+            valid.append((i, url))
+
+    unique_urls = list(dict.fromkeys(url for _, url in valid))
+    scored = {}
+    if unique_urls and mode != "full":
+        for url, score in zip(unique_urls, predict_lexical_scores(unique_urls)):
+            if mode == "offline" or not is_uncertain(score):
+                scored[url] = {**trust_verdict(score), "scoring": "lexical"}
+    network_urls = [url for url in unique_urls if url not in scored]
+    if network_urls:
+        timed_out = set()
+        scores = predict_trust_scores(extract_features_batch(network_urls, timed_out=timed_out, executor=executor))
+        for url, score in zip(network_urls, scores):
+            url_timed_out = timed_out.intersection(probe_targets(url, urlparse(url).netloc).items())
+            scored[url] = probed_verdict(score, url_timed_out, mode)
+    for i, url in valid:
+        results[i] = {"url": url, **scored[url]}
+    return results
+
+def trust_verdict(trust_score):
     if trust_score>=90:
         return {"trust_score": int(trust_score), "risk_level": "Very Safe","action": "Trusted & legitimate. No action needed."}
     elif trust_score>=75:
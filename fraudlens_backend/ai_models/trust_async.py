@@ -0,0 +1,191 @@
+import asyncio
+import contextlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:  # optional: without it the HTTP probes run in threads
+    aiohttp = None
+
+try:
+    from ai_models import metrics, trust
+    from ai_models.microbatch import AsyncMicroBatcher
+    from ai_models.singleflight import AsyncSingleFlight
+except ImportError:  # running as a script from inside ai_models/
+    import metrics
+    import trust
+    from microbatch import AsyncMicroBatcher
+    from singleflight import AsyncSingleFlight
+
+# Async twins of the trust probes for the ASGI endpoint. Probe URLs, timeouts, the
+# reputation cache, feature layout and model all come from ai_models.trust, so both
+# paths score a url identically.
+
+# XGBoost is CPU-bound: keep it off the event loop in a small dedicated pool
+model_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="trust-model")
+PROBE_CONNECTIONS = 500  # concurrent outbound probe connections per event loop
+inflight = AsyncSingleFlight()
+
+# Rows awaited by concurrent coroutines go to model_executor as one batch
+trust_batcher = AsyncMicroBatcher.from_settings(trust.predict_trust_scores, model_executor)
+lexical_batcher = AsyncMicroBatcher.from_settings(trust.predict_lexical_scores, model_executor)
+
+# Probe durations on the event loop (without aiohttp the HTTP ones also show up in trust's
+# fraudlens_probe_seconds, from the thread they run in)
+PROBE_SECONDS = metrics.histogram("fraudlens_async_probe_seconds", "Time spent in one async trust probe call.", ["probe"])
+PROBE_TIMEOUTS = metrics.counter("fraudlens_async_probe_timeouts_total", "Async probes still running at the deadline or timed out, scored as failed.", ["probe"])
+
+
+# trust.resolve_host in a thread, like the loop's own getaddrinfo: both paths resolve
+# through the same hook, with its DNS_TIMEOUT (TimeoutError)
+async def resolve_host_async(host):
+    return await asyncio.to_thread(trust.resolve_host, host)
+
+@PROBE_SECONDS.time(probe="ip")
+async def check_ip_address_async(client, url):
+    try:
+        ip = await resolve_host_async(urlparse(url).netloc)
+        return 1 if re.match(r'\d+\.\d+\.\d+\.\d+', ip) else 0
+    except TimeoutError:
+        raise
+    except Exception:
+        return 0
+
+@PROBE_SECONDS.time(probe="dns")
+async def check_dns_record_async(client, domain):
+    try:
+        await resolve_host_async(domain)
+        return 1
+    except TimeoutError:
+        raise
+    except Exception:
+        return 0
+
+@PROBE_SECONDS.time(probe="ssl")
+async def check_ssl_state_async(client, domain):
+    if client is None:
+        return await asyncio.to_thread(trust.check_ssl_state, domain)
+    try:
+        async with client.get(trust.SSL_PROBE_URL.format(domain=domain)) as response:
+            return 1 if str(response.url).startswith("https") else 0
+    except Exception:
+        return 0
+
+@PROBE_SECONDS.time(probe="index")
+async def check_google_index_async(client, url):
+    if client is None:
+        return await asyncio.to_thread(trust.check_google_index, url)
+    try:
+        async with client.get(trust.GOOGLE_INDEX_URL.format(url=url)) as response:
+            return 1 if "did not match any documents" not in await response.text() else 0
+    except Exception:
+        return 0
+
+@PROBE_SECONDS.time(probe="traffic")
+async def check_web_traffic_async(client, domain):
+    if client is None:
+        return await asyncio.to_thread(trust.check_web_traffic, domain)
+    try:
+        async with client.get(trust.WEB_TRAFFIC_URL.format(domain=domain)) as response:
+            return 1 if "RANK" in await response.text() else 0
+    except Exception:
+        return 0
+
+PROBES = {
+    "ip": check_ip_address_async,
+    "ssl": check_ssl_state_async,
+    "dns": check_dns_record_async,
+    "traffic": check_web_traffic_async,
+    "index": check_google_index_async,
+}
+
+def new_http_client():
+    # Redirects are followed (like requests); the SSL probe relies on that
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=PROBE_CONNECTIONS),
+        timeout=aiohttp.ClientTimeout(total=trust.PROBE_TIMEOUT),
+    )
+
+# Pooled sessions of the event loops that serve for the whole process: building a session
+# (and its TLS context) per request costs more CPU than the probes themselves. A server's
+# loop opens its pool at ASGI lifespan startup (fraudlens_backend.asgi). Any other loop,
+# e.g. the one-request loops of WSGI or the test client, gets a session per request: a
+# session holds on to its loop, so pooling one per short-lived loop would leak both.
+_clients = {}
+
+async def open_http_pool():
+    if aiohttp is not None and asyncio.get_running_loop() not in _clients:
+        _clients[asyncio.get_running_loop()] = new_http_client()
+
+async def close_http_pool():
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+# The session for one request's probes (None without aiohttp)
+@contextlib.asynccontextmanager
+async def http_client():
+    client = _clients.get(asyncio.get_running_loop())
+    if aiohttp is None or client is not None:
+        yield client
+        return
+    client = new_http_client()
+    try:
+        yield client
+    finally:
+        await client.close()
+
+# Same contract as trust.run_probes: cached results are reused, the rest run concurrently,
+# and probes still pending at the deadline (or timed out) count as failed (0) and are not
+# cached. Cancelled probes are awaited before their session is closed.
+async def run_probes_async(url, domain, deadline=None, timed_out=None):
+    deadline = trust.REQUEST_DEADLINE if deadline is None else deadline
+    targets = trust.probe_targets(url, domain)
+
+    results = {}
+    pending = {}
+    for name, target in targets.items():
+        found, value = trust.reputation_cache.get(name, target)
+        if found:
+            results[name] = value
+        else:
+            pending[name] = target
+
+    if pending:
+        async with http_client() as client:
+            tasks = {name: asyncio.ensure_future(PROBES[name](client, target)) for name, target in pending.items()}
+            await asyncio.wait(tasks.values(), timeout=deadline)
+            for name, task in tasks.items():
+                if task.done() and task.exception() is None:
+                    results[name] = task.result()
+                    trust.reputation_cache.set(name, pending[name], results[name])
+                else:
+                    task.cancel()
+                    PROBE_TIMEOUTS.inc(probe=name)
+                    results[name] = 0
+                    if timed_out is not None:
+                        timed_out.add((name, pending[name]))
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return results
+
+async def extract_features_async(url, deadline=None, timed_out=None):
+    domain = urlparse(url).netloc
+    probes = await run_probes_async(url, domain, deadline, timed_out)
+    return trust.build_features(url, domain, probes)
+
+# mode as in trust.run_trust: the lexical model needs no probes, "tiered" only awaits
+# them when the lexical score is uncertain. Concurrent identical calls share one run.
+async def run_trust_async(url, deadline=None, mode="full"):
+    return dict(await inflight.do((url, deadline, mode), _run_trust_async, url, deadline, mode))
+
+async def _run_trust_async(url, deadline, mode):
+    if mode != "full":
+        lexical_score = await lexical_batcher.submit(url)
+        if mode == "offline" or not trust.is_uncertain(lexical_score):
+            return {**trust.trust_verdict(lexical_score), "scoring": "lexical"}
+    timed_out = set()
+    features = await extract_features_async(url, deadline, timed_out)
+    score = await trust_batcher.submit(features)
+    return trust.probed_verdict(score, timed_out, mode)
@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ScanJob, ScanRecord
+
+
+@admin.register(ScanJob)
+class ScanJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "processed", "total", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("id", "created_at", "started_at", "finished_at")
+
+
+@admin.register(ScanRecord)
+class ScanRecordAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "kind", "label", "score", "domain", "item")
+    list_filter = ("kind", "label")
+    search_fields = ("domain", "item_hash")
+    date_hierarchy = "created_at"
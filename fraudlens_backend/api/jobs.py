@@ -0,0 +1,252 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ai_models import registry
+from .models import ScanJob, ScanJobResult, ScanRecord
+from .scan_history import history
+
+# Bulk scans (POST /api/jobs/): the input is saved to UPLOAD_DIR, the job row is committed,
+# and a worker thread of this process scores the input chunk by chunk with the batched
+# scorers, bulk-inserting each chunk's results together with the progress update. With
+# WORKERS = 0 jobs stay queued for `manage.py process_jobs`. Claiming a job is an atomic
+# queued -> running update, so any number of workers and processes can share the queue.
+DEFAULTS = {
+    "WORKERS": 2,  # in-process worker threads
+    "CHUNK_SIZE": 1000,  # transactions / messages scored per step
+    "URL_CHUNK_SIZE": 100,  # URLs probed per step (one trust.BATCH_DEADLINE each)
+    "PROBE_WORKERS": 8,  # probe threads shared by all URL jobs, apart from the API's trust.probe_executor
+    "INSERT_BATCH_SIZE": 500,  # rows per INSERT statement
+    "UPLOAD_DIR": Path(settings.BASE_DIR) / "job_uploads",
+}
+
+
+def job_settings():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "FRAUDLENS_JOBS", {}))
+    return config
+
+
+def _input_path(suffix):
+    upload_dir = Path(job_settings()["UPLOAD_DIR"])
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    return upload_dir / f"{uuid.uuid4().hex}{suffix}"
+
+
+# An uploaded file, copied chunk by chunk (large uploads are never held in memory)
+def save_upload(upload, suffix):
+    path = _input_path(suffix)
+    with open(path, "wb") as f:
+        for chunk in upload.chunks():
+            f.write(chunk)
+    return path
+
+
+def save_items(items):
+    path = _input_path(".json")
+    with open(path, "w") as f:
+        json.dump(items, f)
+    return path
+
+
+# URLs or messages: a JSON list, or a text file with one per line
+def read_items(path):
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path) as f:
+            return json.load(f)
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def count_items(job):
+    if job.kind == ScanJob.TRANSACTIONS:
+        from ai_models import transactionFraud
+        return transactionFraud.count_transactions(job.input_path)
+    return len(read_items(job.input_path))
+
+
+# Each scanner yields one list of (item, score, label, detail) per chunk, in input order
+
+def scan_transactions(job, config):
+    from ai_models import transactionFraud
+
+    position = 0
+    for chunk in transactionFraud.read_transaction_chunks(job.input_path, config["CHUNK_SIZE"]):
+        if "Transaction_ID" in chunk.columns:
+            ids = chunk["Transaction_ID"].astype(str).tolist()
+        else:
+            ids = [str(i) for i in range(position, position + len(chunk))]
+        probs, labels = transactionFraud.predict_fraud_batch(transactionFraud.prepare_transactions(chunk))
+        yield [(item, float(prob), str(label), None) for item, prob, label in zip(ids, probs, labels)]
+        position += len(chunk)
+
+
+# Invalid URLs get an error result (run_trust_batch reports them per item); the job goes on
+def scan_urls(job, config):
+    from ai_models import trust
+
+    items = read_items(job.input_path)
+    size = config["URL_CHUNK_SIZE"]
+    for start in range(0, len(items), size):
+        batch = items[start:start + size]
+        canonical = [trust.canonical_url(url) if isinstance(url, str) else url for url in batch]
+        verdicts = trust.run_trust_batch(canonical, job.mode or "full", executor=probe_executor(config))
+        yield [(str(url), verdict.get("trust_score"), verdict.get("risk_level", "error" if "error" in verdict else ""),
+                verdict) for url, verdict in zip(batch, verdicts)]
+
+
+def scan_sms(job, config):
+    from ai_models import smsScam
+
+    smsScam.scorer.catch_up(smsScam.feedback_store)
+    items = read_items(job.input_path)
+    size = config["CHUNK_SIZE"]
+    for start in range(0, len(items), size):
+        batch = items[start:start + size]
+        verdicts = smsScam.predict_spam_batch(batch)
+        yield [(str(text), verdict.get("scam_probability"), verdict.get("result", "error"), verdict)
+               for text, verdict in zip(batch, verdicts)]
+
+
+SCANNERS = {ScanJob.TRANSACTIONS: scan_transactions, ScanJob.URLS: scan_urls, ScanJob.SMS: scan_sms}
+
+# Job kind -> (scan history kind, model in ai_models.registry)
+HISTORY_KINDS = {
+    ScanJob.TRANSACTIONS: (ScanRecord.TRANSACTION, "fraud"),
+    ScanJob.URLS: (ScanRecord.TRUST, "trust"),
+    ScanJob.SMS: (ScanRecord.SMS, "sms"),
+}
+
+
+def write_results(job, position, rows, batch_size):
+    results = [ScanJobResult(job_id=job.pk, position=position + i, item=item, score=score, label=label, detail=detail)
+               for i, (item, score, label, detail) in enumerate(rows)]
+    kind, model = HISTORY_KINDS[job.kind]
+    verdicts = [row for row in rows if not (row[3] and "error" in row[3])]
+    version = getattr(registry.models.get(model), "version", None)
+    with transaction.atomic():
+        ScanJobResult.objects.bulk_create(results, batch_size=batch_size)
+        # Already off the request path: the history goes in with the results
+        history.write(kind, verdicts, version, job_id=job.pk)
+        ScanJob.objects.filter(pk=job.pk).update(processed=F("processed") + len(results))
+
+
+def run_job(job_id):
+    """Claim a queued job and process it. False if it wasn't queued (e.g. another worker has it)."""
+    claimed = ScanJob.objects.filter(pk=job_id, status=ScanJob.QUEUED).update(
+        status=ScanJob.RUNNING, started_at=timezone.now())
+    if not claimed:
+        return False
+    job = ScanJob.objects.get(pk=job_id)
+    config = job_settings()
+    try:
+        if job.total is None:
+            job.total = count_items(job)
+            ScanJob.objects.filter(pk=job.pk).update(total=job.total)
+        position = job.processed  # 0 unless a crashed run was requeued
+        if position:
+            ScanJobResult.objects.filter(job_id=job.pk).delete()
+            ScanRecord.objects.filter(job_id=job.pk).delete()
+            ScanJob.objects.filter(pk=job.pk).update(processed=0)
+            position = 0
+        for rows in SCANNERS[job.kind](job, config):
+            write_results(job, position, rows, config["INSERT_BATCH_SIZE"])
+            position += len(rows)
+    except Exception as exc:
+        print(f"Warning: scan job {job.pk} failed: {exc!r}")
+        ScanJob.objects.filter(pk=job.pk).update(status=ScanJob.FAILED, error=repr(exc), finished_at=timezone.now())
+        Path(job.input_path).unlink(missing_ok=True)
+        return True
+    ScanJob.objects.filter(pk=job.pk).update(status=ScanJob.DONE, total=position, finished_at=timezone.now())
+    Path(job.input_path).unlink(missing_ok=True)  # the results are in the database now
+    return True
+
+
+_executor = None
+_probe_executor = None
+_executor_lock = threading.Lock()
+
+
+def _work(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()  # this worker thread's connection
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=job_settings()["WORKERS"], thread_name_prefix="scan-job")
+        return _executor
+
+
+# Bulk URL scans probe on their own bounded pool: a large job can't queue interactive
+# /api/check-website/ probes past their REQUEST_DEADLINE on trust.probe_executor
+def probe_executor(config):
+    global _probe_executor
+    with _executor_lock:
+        if _probe_executor is None:
+            _probe_executor = ThreadPoolExecutor(max_workers=config["PROBE_WORKERS"], thread_name_prefix="scan-job-probe")
+        return _probe_executor
+
+
+def submit(kind, input_path, mode="", total=None):
+    job = ScanJob.objects.create(kind=kind, mode=mode, input_path=str(input_path), total=total)
+    if job_settings()["WORKERS"] > 0:
+        # Only once the row is committed, or the worker might not see it yet
+        transaction.on_commit(lambda: executor().submit(_work, job.pk))
+    return job
+
+
+def job_payload(job):
+    payload = {
+        "id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "progress": round(job.processed / job.total, 4) if job.total else None,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": f"/api/jobs/{job.id}/",
+    }
+    if job.mode:
+        payload["mode"] = job.mode
+    if job.started_at and job.processed:
+        elapsed = ((job.finished_at or timezone.now()) - job.started_at).total_seconds()
+        payload["items_per_sec"] = round(job.processed / max(elapsed, 1e-6), 1)
+    if job.status == ScanJob.DONE:
+        payload["results_url"] = f"/api/jobs/{job.id}/results/"
+    if job.error:
+        payload["error"] = job.error
+    return payload
+
+
+# Requeue jobs left running by a worker process that died
+def requeue_running():
+    return ScanJob.objects.filter(status=ScanJob.RUNNING).update(status=ScanJob.QUEUED, started_at=None)
+
+
+def process_queued(poll=None):
+    """Run queued jobs one after another in this thread; with `poll` seconds, keep waiting for more."""
+    processed = 0
+    while True:
+        job_ids = list(ScanJob.objects.filter(status=ScanJob.QUEUED).order_by("created_at").values_list("pk", flat=True))
+        for job_id in job_ids:
+            processed += run_job(job_id)
+        if poll is None:
+            return processed
+        if not job_ids:
+            time.sleep(poll)
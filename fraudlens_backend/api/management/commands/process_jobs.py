@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Run queued bulk scan jobs (POST /api/jobs/) in this process: the worker for deployments "
+            "with FRAUDLENS_JOBS['WORKERS'] = 0, or to finish jobs a stopped server left queued.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requeue-running", action="store_true",
+                            help="First requeue jobs marked running (their worker died); they restart from scratch.")
+        parser.add_argument("--watch", type=float, metavar="SECONDS",
+                            help="Keep running, polling for new jobs every SECONDS.")
+
+    def handle(self, *args, **options):
+        from ai_models import artifacts
+
+        artifacts.AUTO_TRAIN = False
+        from api import jobs
+
+        if options["requeue_running"]:
+            self.stdout.write(f"requeued {jobs.requeue_running()} running job(s)")
+        started = time.perf_counter()
+        processed = jobs.process_queued(poll=options["watch"])
+        self.stdout.write(self.style.SUCCESS(
+            f"processed {processed} job(s) in {time.perf_counter() - started:.1f}s"
+        ))
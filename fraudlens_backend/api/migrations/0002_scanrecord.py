@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('trust', 'Website trust'), ('sms', 'SMS message'), ('transaction', 'Transaction')], max_length=16)),
+                ('item', models.TextField()),
+                ('item_hash', models.CharField(max_length=64)),
+                ('domain', models.CharField(blank=True, max_length=255)),
+                ('score', models.FloatField(null=True)),
+                ('label', models.CharField(blank=True, max_length=32)),
+                ('model_version', models.CharField(blank=True, max_length=64)),
+                ('detail', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.scanjob')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['domain', 'created_at'], name='scan_record_domain'), models.Index(fields=['item_hash', 'created_at'], name='scan_record_item'), models.Index(fields=['created_at'], name='scan_record_created')],
+            },
+        ),
+    ]
@@ -1,3 +1,82 @@
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+# A bulk scan submitted to POST /api/jobs/: the input is stored as a file and scored in the
+# background by api.jobs; results are written as ScanJobResult rows, one per input item.
+class ScanJob(models.Model):
+    TRANSACTIONS = "transactions"
+    URLS = "urls"
+    SMS = "sms"
+    KINDS = [(TRANSACTIONS, "Transactions"), (URLS, "URLs"), (SMS, "SMS messages")]
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [(QUEUED, "Queued"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+
+    # Random ids: the id is all a client needs to read a job's results
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=16, choices=KINDS)
+    mode = models.CharField(max_length=16, blank=True)  # trust mode, for URL scans
+    status = models.CharField(max_length=16, choices=STATUSES, default=QUEUED, db_index=True)
+    input_path = models.CharField(max_length=500)
+    total = models.PositiveIntegerField(null=True, blank=True)  # known once the input is counted
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.kind} scan {self.id} ({self.status})"
+
+
+class ScanJobResult(models.Model):
+    job = models.ForeignKey(ScanJob, on_delete=models.CASCADE, related_name="results")
+    position = models.PositiveIntegerField()  # index of the item in the input
+    item = models.TextField()  # the URL, the message or the Transaction_ID
+    score = models.FloatField(null=True)  # trust score, scam probability (%) or fraud probability
+    label = models.CharField(max_length=32, blank=True)  # risk level, Spam/Not Spam or Fraudulent/Legitimate
+    detail = models.JSONField(null=True, blank=True)  # the full verdict, for URLs and messages
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["job", "position"], name="unique_job_position")]
+        ordering = ["job", "position"]
+
+
+# Audit trail: one row per verdict served (trust, SMS) or computed by a bulk scan
+# (transactions), written in batches by api.scan_history. Look up a domain's or an item's
+# history with the indexed domain / item_hash (sha256 of the normalized item) + created_at.
+class ScanRecord(models.Model):
+    TRUST = "trust"
+    SMS = "sms"
+    TRANSACTION = "transaction"
+    KINDS = [(TRUST, "Website trust"), (SMS, "SMS message"), (TRANSACTION, "Transaction")]
+
+    kind = models.CharField(max_length=16, choices=KINDS)
+    item = models.TextField()  # the URL, the message or the Transaction_ID
+    item_hash = models.CharField(max_length=64)
+    domain = models.CharField(max_length=255, blank=True)  # URL host, for trust verdicts
+    score = models.FloatField(null=True)
+    label = models.CharField(max_length=32, blank=True)
+    model_version = models.CharField(max_length=64, blank=True)
+    detail = models.JSONField(null=True, blank=True)
+    job = models.ForeignKey(ScanJob, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    created_at = models.DateTimeField()  # when the verdict was given, not when it was written
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["domain", "created_at"], name="scan_record_domain"),
+            models.Index(fields=["item_hash", "created_at"], name="scan_record_item"),
+            models.Index(fields=["created_at"], name="scan_record_created"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.label} at {self.created_at:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Whole responses of the scoring endpoints, stored through a Django cache. Keys hash the
+# normalized request content (see views) together with the model version, so deploying a
+# new artifact starts from an empty cache and old entries just expire.
+DEFAULTS = {
+    "ENABLED": True,
+    "CACHE": "default",  # alias in CACHES; use a shared backend to share hits across workers
+    "TTL": 300,
+}
+
+
+class ResultCache:
+    def __init__(self, cache=None, ttl=300, enabled=True):
+        self.cache = cache
+        self.ttl = ttl
+        self.enabled = enabled and cache is not None
+        self._lock = threading.Lock()
+        self._counts = {}  # kind -> [hits, misses]
+
+    @classmethod
+    def from_settings(cls):
+        config = dict(DEFAULTS)
+        config.update(getattr(settings, "FRAUDLENS_RESULT_CACHE", {}))
+        cache = caches[config["CACHE"]] if config["ENABLED"] else None
+        return cls(cache, config["TTL"], config["ENABLED"])
+
+    @staticmethod
+    def key(kind, version, payload):
+        content = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return "fraudlens:result:%s:%s:%s" % (kind, version, hashlib.sha256(content.encode("utf-8")).hexdigest())
+
+    def _usable(self, version):
+        # Models trained in-process at startup have no version: don't share their results
+        return self.enabled and version is not None
+
+    def _count(self, kind, hits, misses):
+        with self._lock:
+            counts = self._counts.setdefault(kind, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    def get_many(self, kind, version, payloads):
+        """Cached results for payloads, in order, with None for each miss."""
+        if not self._usable(version) or not payloads:
+            return [None] * len(payloads)
+        keys = [self.key(kind, version, payload) for payload in payloads]
+        found = self.cache.get_many(keys)
+        results = [found.get(key) for key in keys]
+        hits = sum(result is not None for result in results)
+        self._count(kind, hits, len(results) - hits)
+        return results
+
+    def set_many(self, kind, version, payloads, results):
+        if self._usable(version) and payloads:
+            self.cache.set_many({self.key(kind, version, payload): result
+                                 for payload, result in zip(payloads, results)}, self.ttl)
+
+    def get(self, kind, version, payload):
+        return self.get_many(kind, version, [payload])[0]
+
+    def set(self, kind, version, payload, result):
+        self.set_many(kind, version, [payload], [result])
+
+    async def aget(self, kind, version, payload):
+        if not self._usable(version):
+            return None
+        result = await self.cache.aget(self.key(kind, version, payload))
+        self._count(kind, result is not None, result is None)
+        return result
+
+    async def aset(self, kind, version, payload, result):
+        if self._usable(version):
+            await self.cache.aset(self.key(kind, version, payload), result, self.ttl)
+
+    def stats(self):
+        with self._lock:
+            counts = {kind: list(value) for kind, value in self._counts.items()}
+        stats = {"enabled": self.enabled, "ttl": self.ttl, "kinds": {}}
+        for kind, (hits, misses) in counts.items():
+            lookups = hits + misses
+            stats["kinds"][kind] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
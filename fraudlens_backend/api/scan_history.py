@@ -0,0 +1,167 @@
+import atexit
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from ai_models import metrics
+from .models import ScanRecord
+
+# The scan history (ScanRecord) is written off the request path: views only append their
+# verdicts to an in-memory buffer, and a flusher thread bulk-inserts it once FLUSH_ROWS rows
+# are waiting or FLUSH_INTERVAL seconds have passed. Normalizing and hashing the items is
+# left to the flusher too. If the database falls behind, rows beyond MAX_BUFFER are dropped
+# (and counted) rather than slowing requests down or growing memory without bound.
+DEFAULTS = {
+    "ENABLED": True,
+    "FLUSH_ROWS": 500,  # flush as soon as this many rows are buffered
+    "FLUSH_INTERVAL": 1.0,  # seconds: buffered rows wait at most about this long
+    "MAX_BUFFER": 50000,  # rows held while the database is slow or down
+    "INSERT_BATCH_SIZE": 500,  # rows per INSERT statement
+}
+
+ROWS = metrics.counter("fraudlens_scan_history_rows_total", "Scan history rows by outcome.", ["outcome"])
+FLUSH_SECONDS = metrics.histogram("fraudlens_scan_history_flush_seconds", "Time spent writing one scan history batch.")
+
+# Verdict fields stored as score and label, per kind
+VERDICT_FIELDS = {ScanRecord.TRUST: ("trust_score", "risk_level"), ScanRecord.SMS: ("scam_probability", "result")}
+
+
+# The normalized item that is hashed: the canonical URL or the cleaned message text, so
+# every spelling of the same URL / message shares an item_hash
+def normalized(kind, item):
+    if kind == ScanRecord.TRUST:
+        from ai_models import trust
+        return trust.canonical_url(item)
+    if kind == ScanRecord.SMS:
+        from ai_models import smsScam
+        return smsScam.clean_text(item)
+    return item
+
+
+def url_domain(url):
+    try:
+        return (urlsplit(url if "//" in url else "//" + url).hostname or "")[:255]  # also "example.com/path"
+    except ValueError:
+        return ""
+
+
+# (item, score, label, detail) entries for the verdicts of a trust or SMS batch; errors
+# (invalid input, nothing was scored) are not history
+def verdict_entries(kind, items, verdicts):
+    score_field, label_field = VERDICT_FIELDS[kind]
+    return [(item, verdict.get(score_field), verdict.get(label_field, ""), verdict)
+            for item, verdict in zip(items, verdicts) if isinstance(item, str) and "error" not in verdict]
+
+
+def build_records(kind, entries, version, job_id, created_at):
+    records = []
+    for item, score, label, detail in entries:
+        item = str(item)
+        key = normalized(kind, item)
+        records.append(ScanRecord(
+            kind=kind, item=item, item_hash=hashlib.sha256(key.encode("utf-8")).hexdigest(),
+            domain=url_domain(key) if kind == ScanRecord.TRUST else "", score=score, label=str(label or "")[:32],
+            model_version="" if version is None else str(version)[:64], detail=detail, job_id=job_id,
+            created_at=created_at,
+        ))
+    return records
+
+
+class ScanHistoryWriter:
+    def __init__(self, enabled=True, flush_rows=500, flush_interval=1.0, max_buffer=50000, batch_size=500):
+        self.enabled = enabled
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self._pending = []  # (kind, entries, version, job_id, created_at)
+        self._buffered = 0
+        self._cond = threading.Condition()
+        self._flushing = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_settings(cls):
+        config = dict(DEFAULTS)
+        config.update(getattr(settings, "FRAUDLENS_SCAN_HISTORY", {}))
+        return cls(config["ENABLED"], config["FLUSH_ROWS"], config["FLUSH_INTERVAL"], config["MAX_BUFFER"],
+                   config["INSERT_BATCH_SIZE"])
+
+    def record(self, kind, entries, version=None, job_id=None):
+        """Buffer (item, score, label, detail) verdicts of one kind. Never touches the database."""
+        if not self.enabled or not entries:
+            return
+        created_at = timezone.now()
+        with self._cond:
+            full = self._buffered + len(entries) > self.max_buffer
+            if not full:
+                self._pending.append((kind, entries, version, job_id, created_at))
+                self._buffered += len(entries)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="scan-history", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+                if self._buffered >= self.flush_rows:
+                    self._cond.notify()
+        if full:
+            self._count(len(entries), "dropped")
+
+    def write(self, kind, entries, version=None, job_id=None):
+        """Insert verdicts right away, in the caller's thread (and transaction): for callers
+        that are off the request path already, like bulk scan jobs."""
+        if not self.enabled or not entries:
+            return 0
+        records = build_records(kind, entries, version, job_id, timezone.now())
+        ScanRecord.objects.bulk_create(records, batch_size=self.batch_size)
+        self._count(len(records), "written")
+        return len(records)
+
+    def flush(self):
+        """Write every buffered row now; returns how many were written."""
+        with self._flushing:
+            with self._cond:
+                pending, self._pending, self._buffered = self._pending, [], 0
+            if not pending:
+                return 0
+            rows = sum(len(entries) for _, entries, _, _, _ in pending)
+            try:
+                with FLUSH_SECONDS.time():
+                    records = [record for kind, entries, version, job_id, created_at in pending
+                               for record in build_records(kind, entries, version, job_id, created_at)]
+                    ScanRecord.objects.bulk_create(records, batch_size=self.batch_size)
+            except Exception as exc:
+                print(f"Warning: writing {rows} scan history rows failed: {exc!r}")
+                self._count(rows, "dropped")
+                return 0
+            self._count(rows, "written")
+            return rows
+
+    def _count(self, rows, outcome):
+        with self._cond:
+            if outcome == "written":
+                self.written += rows
+            else:
+                self.dropped += rows
+        ROWS.inc(rows, outcome=outcome)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._buffered < self.flush_rows:
+                    self._cond.wait(self.flush_interval)
+            self.flush()
+            connection.close()  # this thread's connection; the next flush opens a fresh one
+
+    def stats(self):
+        with self._cond:
+            buffered = self._buffered
+        return {"enabled": self.enabled, "buffered": buffered, "written": self.written, "dropped": self.dropped}
+
+
+history = ScanHistoryWriter.from_settings()
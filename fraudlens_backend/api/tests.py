@@ -1,3 +1,1298 @@
-from django.test import TestCase
+import asyncio
+import atexit
+import contextlib
+import copy
+import csv
+import gc
+import io
+import os
+import re
+import shutil
+import string
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import Client, SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from sklearn.preprocessing import LabelEncoder
+
+from ai_models import artifacts, compiled_trees, feature_store, matrix_cache, metrics, registry, reputation_cache, smsScam, transactionFraud, trust, trust_async
+from ai_models.categorical_codec import CategoricalCodec
+from ai_models.feedback_store import FeedbackStore
+from ai_models.microbatch import AsyncMicroBatcher, MicroBatcher
+from ai_models.reputation_cache import ReputationCache
+from ai_models.singleflight import AsyncSingleFlight, SingleFlight
+from ai_models.training import StageTimer, cached_matrices
+from benchmarks.stubs import StubResolver, StubServer, patch_trust
+
+from fraudlens_backend import preload
+
+from . import jobs
+from .models import ScanJob, ScanRecord
+from .scan_history import ScanHistoryWriter, history
+
+# Tests score with small models trained from the fixtures below into a temporary artifacts
+# directory: never with the exported models, and never skipped for the lack of one
+FIXTURE_DIR = Path(tempfile.mkdtemp(prefix="fraudlens-test-"))
+atexit.register(shutil.rmtree, FIXTURE_DIR, True)
+artifacts.ARTIFACTS_DIR = FIXTURE_DIR / "artifacts"
+artifacts.AUTO_TRAIN = False
+smsScam.feedback_store = FeedbackStore(FIXTURE_DIR / "feedback" / "sms.jsonl")
+
+
+# Every 10th phishtank row: enough for both trust models to score sensibly
+def train_trust_fixture():
+    csv_path = FIXTURE_DIR / "phishtank.csv"
+    pd.read_csv(trust.PHISHTANK_CSV).iloc[::10].to_csv(csv_path, index=False)
+    trust.save_model(*trust.train_model(csv_path, use_cache=False))
+
+
+# A synthetic transactions.csv: fraud mostly comes with Bitcoin or an unregistered device
+def write_transactions(csv_path, n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    currency = rng.choice(list(transactionFraud.currency_risk), n)
+    device = rng.choice(list(transactionFraud.device_risk), n)
+    fraud = ((currency == "Bitcoin") | (device == "Unregistered")) & (rng.random(n) < 0.7)
+    pd.DataFrame({
+        "Customer_ID": [f"C{i}" for i in range(n)], "Customer_Name": "Test Customer", "Gender": "F", "Age": 30,
+        "State": "Kerala", "City": "Kochi", "Bank_Branch": "Kochi Branch",
+        "Account_Type": rng.choice(["Savings", "Checking", "Business"], n),
+        "Transaction_ID": [f"T{i}" for i in range(n)],
+        "Transaction_Date": [f"{day:02d}-01-2025" for day in rng.integers(1, 29, n)],
+        "Transaction_Time": [f"{hour:02d}:{minute:02d}:00" for hour, minute in rng.integers(0, [24, 60], (n, 2))],
+        "Transaction_Amount": rng.uniform(1, 10000, n).round(2),
+        "Merchant_ID": [f"M{i}" for i in rng.integers(0, 50, n)],
+        "Transaction_Type": rng.choice(["UPI", "Transfer", "Debit"], n),
+        "Merchant_Category": rng.choice(["Groceries", "Electronics", "Travel"], n),
+        "Account_Balance": rng.uniform(0, 50000, n).round(2),
+        "Transaction_Device": rng.choice(["Mobile", "ATM", "POS"], n), "Transaction_Location": "Kochi, Kerala",
+        "Device_Type": device, "Is_Fraud": fraud.astype(int), "Transaction_Currency": currency,
+        "Customer_Contact": "+91-0000000000",
+        "Transaction_Description": rng.choice(["Bill payment", "Online shopping", "Crypto purchase"], n),
+        "Customer_Email": "customer@example.com",
+    }).to_csv(csv_path, index=False)
+
+
+def train_fraud_fixture():
+    csv_path = FIXTURE_DIR / "transactions.csv"
+    write_transactions(csv_path)
+    with contextlib.redirect_stdout(io.StringIO()):  # train_model prints its evaluation
+        booster, label_encoders, feature_columns, metrics = transactionFraud.train_model(csv_path, use_cache=False)
+    transactionFraud.save_model(booster, label_encoders, feature_columns, metrics)
+
+
+def train_sms_fixture():
+    smsScam.save_model(*smsScam.train_model(use_cache=False))
+
+
+FIXTURES = {"trust": train_trust_fixture, "sms": train_sms_fixture, "fraud": train_fraud_fixture}
+_trained = set()
+_fixture_lock = threading.Lock()
+
+
+# The registry's model `name`, trained from its fixture and exported on first use
+def fixture_model(name):
+    with _fixture_lock:
+        if name not in _trained:
+            FIXTURES[name]()
+            _trained.add(name)
+    model = registry.models.get(name)
+    if model is None:
+        raise AssertionError(f"the {name} fixture model was exported but did not load")
+    return model
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+# Test cases scoring through the API: their fixture models are loaded once per class, and
+# the response cache and scan history are kept out of the way
+class ApiTestMixin:
+    fixture_models = ()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in cls.fixture_models:
+            fixture_model(name)
+
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        trust.reputation_cache.clear()
+        self.addCleanup(trust.reputation_cache.clear)
+        patcher = mock.patch.object(history, "enabled", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+# A time.monotonic() the test moves forward by hand
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+# Stand-ins for the trust probes: each counts its calls and answers 1 after `delay`
+# seconds (`slow_delay` for the probes named in `slow`)
+class FakeProbes:
+    def __init__(self, delay=0.0, slow=(), slow_delay=1.0):
+        self.delay = delay
+        self.slow = set(slow)
+        self.slow_delay = slow_delay
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def probe(self, name):
+        def run(target):
+            with self._lock:
+                self.calls[(name, target)] += 1
+            time.sleep(self.slow_delay if name in self.slow else self.delay)
+            return 1
+        return run
+
+    def patch(self):
+        return mock.patch.dict(trust.PROBES, {name: self.probe(name) for name in trust.PROBES})
+
+
+class TrustProbeTests(SimpleTestCase):
+    URL = "http://shop.example.com/login"
+    DOMAIN = "shop.example.com"
+
+    def setUp(self):
+        trust.reputation_cache.clear()
+        self.addCleanup(trust.reputation_cache.clear)
+
+    def features(self, **probes):
+        return trust.build_features(self.URL, self.DOMAIN, {**dict.fromkeys(trust.PROBES, 1), **probes})
+
+    def test_each_distinct_probe_runs_once_and_concurrently(self):
+        probes = FakeProbes(delay=0.2)
+        with probes.patch():
+            started = time.perf_counter()
+            features = trust.extract_features(self.URL)
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(probes.calls, Counter(trust.probe_targets(self.URL, self.DOMAIN).items()))
+        self.assertLess(elapsed, 0.6)  # five 0.2 s probes, not one after the other
+        self.assertEqual(features, self.features())
+
+    def test_batch_probes_each_domain_once(self):
+        probes = FakeProbes()
+        with probes.patch():
+            trust.extract_features_batch(["http://a.example.com/x", "http://a.example.com/y", "http://b.example.com/"])
+        self.assertEqual(set(probes.calls.values()), {1})
+        self.assertEqual(len(probes.calls), 3 * 2 + 2 * 3)  # ip and index per url, ssl, dns and traffic per domain
+
+    def test_probes_past_the_deadline_score_zero_and_are_not_cached(self):
+        timed_out = set()
+        with FakeProbes(slow={"traffic"}).patch():
+            started = time.perf_counter()
+            features = trust.extract_features(self.URL, deadline=0.2, timed_out=timed_out)
+            elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(features, self.features(traffic=0))
+        self.assertEqual(timed_out, {("traffic", self.DOMAIN)})
+        self.assertEqual(trust.reputation_cache.get("traffic", self.DOMAIN), (False, None))
+        self.assertEqual(trust.reputation_cache.get("ssl", self.DOMAIN), (True, 1))
+
+    def test_hanging_dns_lookups_time_out(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        hang = lambda host: release.wait(10) and "127.0.0.1"
+        timed_out = set()
+        with mock.patch.object(trust, "DNS_TIMEOUT", 0.1), mock.patch("socket.gethostbyname", hang):
+            started = time.perf_counter()
+            with self.assertRaises(TimeoutError):
+                trust.resolve_host("hang.example.com")
+            results = trust.run_probe_jobs([("dns", "hang.example.com")], deadline=5, timed_out=timed_out)
+            elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(results, {("dns", "hang.example.com"): 0})
+        self.assertEqual(timed_out, {("dns", "hang.example.com")})
+        self.assertEqual(trust.reputation_cache.get("dns", "hang.example.com"), (False, None))
+
+    def test_probes_that_never_got_a_worker_are_reported(self):
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        load = trust.PoolLoad(1)
+        queue_timeouts = trust.PROBE_QUEUE_TIMEOUTS.value(probe="dns")
+        timed_out = set()
+        with FakeProbes(delay=0.5).patch(), mock.patch.object(trust, "probe_executor", pool), \
+                mock.patch.object(trust, "probe_load", load):
+            trust.run_probe_jobs([("ssl", self.DOMAIN), ("dns", self.DOMAIN)], deadline=0.1, timed_out=timed_out)
+            stats = load.stats()
+
+        self.assertEqual(timed_out, {("ssl", self.DOMAIN), ("dns", self.DOMAIN)})
+        self.assertEqual(trust.PROBE_QUEUE_TIMEOUTS.value(probe="dns"), queue_timeouts + 1)
+        self.assertEqual(stats, {"workers": 1, "running": 1, "queued": 0, "saturated": True})
+
+
+class ReputationCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(reputation_cache, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_expire_after_their_ttl(self):
+        cache = ReputationCache(ttl=60, negative_ttl=10)
+        cache.set("ssl", "a.example.com", 1)
+        self.clock.advance(59)
+        self.assertEqual(cache.get("ssl", "a.example.com"), (True, 1))
+        self.clock.advance(2)
+        self.assertEqual(cache.get("ssl", "a.example.com"), (False, None))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_failed_probes_are_cached_for_the_negative_ttl(self):
+        cache = ReputationCache(ttl=60, negative_ttl=10)
+        cache.set("dns", "gone.example.com", 0)
+        self.clock.advance(9)
+        self.assertEqual(cache.get("dns", "gone.example.com"), (True, 0))
+        self.clock.advance(2)
+        self.assertEqual(cache.get("dns", "gone.example.com"), (False, None))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ReputationCache(max_entries=2)
+        cache.set("ssl", "a", 1)
+        cache.set("ssl", "b", 1)
+        cache.get("ssl", "a")  # now b is the least recently used
+        cache.set("ssl", "c", 1)
+        self.assertEqual(cache.get("ssl", "b"), (False, None))
+        self.assertEqual(cache.get("ssl", "a"), (True, 1))
+        self.assertEqual(cache.get("ssl", "c"), (True, 1))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_probes_and_targets_are_cached_apart(self):
+        cache = ReputationCache()
+        cache.set("ssl", "a.example.com", 1)
+        self.assertEqual(cache.get("dns", "a.example.com"), (False, None))
+        self.assertEqual(cache.get("ssl", "b.example.com"), (False, None))
+
+    def test_results_are_shared_through_a_django_cache(self):
+        shared = caches["default"]
+        shared.clear()
+        self.addCleanup(shared.clear)
+        writer = ReputationCache(shared_cache=shared)
+        reader = ReputationCache(shared_cache=shared)
+        writer.set("traffic", "a.example.com", 1)
+
+        self.assertEqual(reader.get("traffic", "a.example.com"), (True, 1))
+        self.assertEqual(reader.get("traffic", "a.example.com"), (True, 1))
+        self.assertEqual(reader.stats()["shared_hits"], 1)
+        self.assertEqual(reader.stats()["hits"], 1)
+
+
+class TrustBatchTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("trust",)
+    URLS = ["http://a.example.com/", "", 5, "http://[::1", "http://b.example.com/x", "http://a.example.com/"]
+
+    def setUp(self):
+        super().setUp()
+        patcher = FakeProbes().patch()
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_keep_input_order_with_per_item_errors(self):
+        results = trust.run_trust_batch(self.URLS)
+        self.assertEqual([result["url"] for result in results], self.URLS)
+        self.assertEqual(results[1]["error"], "url must be a non-empty string")
+        self.assertEqual(results[2]["error"], "url must be a non-empty string")
+        self.assertEqual(results[3]["error"], "invalid url")
+        for i in (0, 4, 5):
+            self.assertEqual(results[i], {"url": self.URLS[i], **trust.run_trust(self.URLS[i])})
+
+    def test_endpoint_scores_the_rest_of_a_batch_with_an_invalid_url(self):
+        response = self.client.post("/api/check-websites/", {"urls": self.URLS}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([result["url"] for result in results], self.URLS)
+        self.assertEqual([i for i, result in enumerate(results) if "error" in result], [1, 2, 3])
+        self.assertEqual(results[0], results[5])
+
+    def test_endpoint_rejects_malformed_batches(self):
+        for data in ({"urls": "http://a.example.com/"}, {"urls": ["http://a.example.com/"] * 1000}):
+            response = self.client.post("/api/check-websites/", data, content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+
+
+class FraudBatchTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("fraud",)
+
+    def transactions(self, scorer, n=60):
+        rng = np.random.default_rng(1)
+        records = []
+        for i in range(n):
+            record = {col: float(rng.uniform(0, 5000)) for col in scorer.feature_columns if col not in scorer.codec.columns}
+            record["Transaction_Day"] = int(rng.integers(0, 7))
+            for col in scorer.codec.columns:
+                classes = list(scorer.codec.classes[col])
+                # Every 7th row has an unseen category
+                record[col] = "unseen" if i % 7 == 0 else classes[int(rng.integers(len(classes)))]
+            records.append(record)
+        return records
+
+    def test_batch_matches_scalar_predictions(self):
+        records = self.transactions(transactionFraud.scorer)
+        for threshold in (0.1, 0.35, 0.6):
+            probabilities, labels = transactionFraud.predict_fraud_batch(records, fraud_threshold=threshold)
+            scalar = [transactionFraud.predict_fraud(record, fraud_threshold=threshold) for record in records]
+            self.assertEqual(list(labels), scalar, f"threshold {threshold}")
+        self.assertEqual(len(probabilities), len(records))
+
+    def test_dataframe_and_records_score_alike(self):
+        records = self.transactions(transactionFraud.scorer, n=20)
+        from_records, _ = transactionFraud.predict_fraud_batch(records)
+        from_frame, _ = transactionFraud.predict_fraud_batch(pd.DataFrame(records))
+        np.testing.assert_allclose(from_frame, from_records)
+
+
+class CleanTextTests(SimpleTestCase):
+    MESSAGES = [
+        "WINNER!! Claim your £1000 prize: call 09061701461 now.",
+        "  Ok lar... Joking wif u oni...  ",
+        "Café 24/7 — ½ price, Ümlaut & ١٢٣ Arabic-Indic digits",
+        "", "12345", "!!!", "tab\tand\nnewline",
+    ]
+
+    # clean_text before it was precompiled
+    @staticmethod
+    def reference(text):
+        text = text.lower()
+        text = re.sub(r'\d+', '', text)
+        text = text.translate(str.maketrans('', '', string.punctuation))
+        return text.strip()
+
+    def test_clean_text_matches_the_reference(self):
+        for text in self.MESSAGES:
+            self.assertEqual(smsScam.clean_text(text), self.reference(text), text)
+
+    def test_clean_texts_cleans_each_message(self):
+        self.assertEqual(smsScam.clean_texts(self.MESSAGES), [self.reference(text) for text in self.MESSAGES])
+
+    def test_both_vectorizers_train(self):
+        for kind in ("hashing", "tfidf"):
+            _, _, metrics = smsScam.train_model(vectorizer_kind=kind, use_cache=False)
+            self.assertEqual(metrics["vectorizer"], kind)
+            self.assertGreater(metrics["accuracy"], 0.9)
+
+
+class SingleUrlTrustTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("trust",)
+
+    def test_single_url_endpoints_reject_invalid_urls(self):
+        for path in ("/api/check-website/", "/api/check-website-async/"):
+            for url in (123, "", "http://[::1"):
+                response = self.client.post(path, {"url": url}, content_type="application/json")
+                self.assertEqual(response.status_code, 400, (path, url))
+
+
+@unittest.skipIf(trust_async.aiohttp is None, "aiohttp is not installed")
+class AsyncProbeTests(SimpleTestCase):
+    URL = "http://shop.example.com/login"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = cls.enterClassContext(StubServer(latency=0.01))
+
+    def setUp(self):
+        trust.reputation_cache.clear()
+        self.addCleanup(trust.reputation_cache.clear)
+        patcher = patch_trust(trust, self.server, StubResolver(latency=0.01))
+        patcher.__enter__()
+        self.addCleanup(patcher.__exit__, None, None, None)
+        self.sessions = []
+        new_http_client = trust_async.new_http_client
+
+        def counted():
+            self.sessions.append(new_http_client())
+            return self.sessions[-1]
+
+        patcher = mock.patch.object(trust_async, "new_http_client", counted)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_async_and_sync_probes_agree(self):
+        features = asyncio.run(trust_async.extract_features_async(self.URL))
+        trust.reputation_cache.clear()
+        self.assertEqual(features, trust.extract_features(self.URL))
+
+    def test_a_short_lived_loop_closes_its_session(self):
+        for _ in range(3):
+            trust.reputation_cache.clear()
+            asyncio.run(trust_async.extract_features_async(self.URL))
+        self.assertEqual(len(self.sessions), 3)
+        self.assertTrue(all(session.closed for session in self.sessions))
+        self.assertEqual(trust_async._clients, {})
+
+    def test_a_serving_loop_shares_one_pooled_session(self):
+        async def serve():
+            await trust_async.open_http_pool()
+            for i in range(3):
+                await trust_async.extract_features_async(f"http://shop{i}.example.com/")
+            self.assertFalse(self.sessions[0].closed)
+            await trust_async.close_http_pool()
+
+        asyncio.run(serve())
+        self.assertEqual(len(self.sessions), 1)
+        self.assertTrue(self.sessions[0].closed)
+        self.assertEqual(trust_async._clients, {})
+
+    def test_async_dns_goes_through_the_resolve_host_hook(self):
+        def timeout(host):
+            raise TimeoutError(host)
+
+        timed_out = set()
+        with mock.patch.object(trust, "resolve_host", timeout):
+            asyncio.run(trust_async.extract_features_async(self.URL, timed_out=timed_out))
+        self.assertEqual(timed_out, {("ip", self.URL), ("dns", "shop.example.com")})
+        self.assertEqual(trust.reputation_cache.get("dns", "shop.example.com"), (False, None))
+        self.assertEqual(trust.reputation_cache.get("ssl", "shop.example.com"), (True, 0))
+
+    def test_asgi_lifespan_opens_and_closes_the_pool(self):
+        with mock.patch("fraudlens_backend.preload.PRELOAD_MODELS", False), \
+                mock.patch("fraudlens_backend.preload.start_warm_up"):
+            from fraudlens_backend.asgi import application
+        events = iter(["lifespan.startup", "lifespan.shutdown"])
+        sent = []
+
+        async def receive():
+            return {"type": next(events)}
+
+        async def send(message):
+            sent.append((message["type"], asyncio.get_running_loop() in trust_async._clients))
+
+        asyncio.run(application({"type": "lifespan"}, receive, send))
+        self.assertEqual(sent, [("lifespan.startup.complete", True), ("lifespan.shutdown.complete", False)])
+
+
+class TrustModeTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("trust",)
+    URL = "http://shop.example.com/login"
+
+    def setUp(self):
+        super().setUp()
+        self.probes = FakeProbes()
+        patcher = self.probes.patch()
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lexical_codes_use_the_dataset_scale(self):
+        self.assertEqual(trust.lexical_codes("http://www.example.com/", "www.example.com"), [1, 1, 1, 1, 1, 1, 1, 1, 0])
+        self.assertEqual(trust.lexical_codes("http://bit.ly/a@b//c", "bit.ly"), [1, -1, -1, -1, 1, 1, 1, 1, 1])
+        self.assertEqual(trust.lexical_codes("https://a.b.c.pay-https.com:8080/" + "x" * 60, "a.b.c.pay-https.com:8080"),
+                         [-1, 1, 1, 1, -1, -1, -1, -1, 0])
+
+    def test_offline_mode_never_probes(self):
+        verdict = trust.run_trust(self.URL, "offline")
+        self.assertEqual(verdict["scoring"], "lexical")
+        self.assertEqual(verdict, {**trust.trust_verdict(trust.predict_lexical_score(self.URL)), "scoring": "lexical"})
+        self.assertEqual(self.probes.calls, Counter())
+
+    def test_tiered_mode_probes_only_uncertain_urls(self):
+        with mock.patch.object(trust, "predict_lexical_score", return_value=95):
+            self.assertEqual(trust.run_trust(self.URL, "tiered")["scoring"], "lexical")
+        self.assertEqual(self.probes.calls, Counter())
+
+        with mock.patch.object(trust, "predict_lexical_score", return_value=50):
+            verdict = trust.run_trust(self.URL, "tiered")
+        self.assertEqual(verdict["scoring"], "full")
+        self.assertEqual(len(self.probes.calls), len(trust.PROBES))
+
+    def test_tiered_batches_probe_only_uncertain_urls(self):
+        urls = ["http://certain.example.com/", "http://uncertain.example.com/"]
+        with mock.patch.object(trust, "predict_lexical_scores", return_value=[10, 74.9]):
+            results = trust.run_trust_batch(urls, "tiered")
+        self.assertEqual([result["scoring"] for result in results], ["lexical", "full"])
+        self.assertEqual(results[0]["trust_score"], 10)
+        self.assertEqual({target for _, target in self.probes.calls}, {"uncertain.example.com", urls[1]})
+
+    def test_endpoints_reject_unknown_modes(self):
+        for path, data in (("/api/check-website/", {"url": self.URL}), ("/api/check-websites/", {"urls": [self.URL]}),
+                           ("/api/check-website-async/", {"url": self.URL})):
+            response = self.client.post(path, {**data, "mode": "fast"}, content_type="application/json")
+            self.assertEqual(response.status_code, 400, path)
+
+
+# The compiled ensembles score exactly like the native predictors, row by row and in batches
+class CompiledTreeTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("trust", "fraud")
+
+    def trust_rows(self, n_features, n=300):
+        rng = np.random.default_rng(2)
+        rows = rng.integers(-1, 2, size=(n, n_features)).astype(float)
+        rows[::3] = rng.integers(-1, 120, size=rows[::3].shape)  # live rows: url lengths, sub-domain counts
+        rows[::13, 4] = np.nan
+        return rows
+
+    def assertScoresIdentical(self, native, compiled, rows):
+        expected = native(rows)
+        self.assertTrue(np.array_equal(compiled.predict(rows), expected))
+        self.assertEqual([compiled.predict_row(row) for row in rows], list(expected))
+
+    def test_xgboost_trust_models(self):
+        scorer = trust.scorer
+        self.assertScoresIdentical(lambda X: scorer.model.predict_proba(X)[:, 1],
+                                   compiled_trees.from_xgboost(scorer.model), self.trust_rows(len(trust.FEATURE_NAMES)))
+        self.assertScoresIdentical(lambda X: scorer.lexical_model.predict_proba(X)[:, 1],
+                                   compiled_trees.from_xgboost(scorer.lexical_model),
+                                   self.trust_rows(len(trust.LEXICAL_INDEXES)))
+
+    def test_lightgbm_fraud_model(self):
+        scorer = transactionFraud.scorer
+        df = pd.read_csv(FIXTURE_DIR / "transactions.csv", dtype=transactionFraud.TRANSACTION_DTYPES)
+        df = transactionFraud.prepare_transactions(df)
+        df["Transaction_Currency_Encoded"], df["Device_Type_Encoded"] = df["Transaction_Currency"], df["Device_Type"]
+        rows, _ = scorer.feature_matrix(df)
+        rows[::11, 1] = np.nan
+        self.assertScoresIdentical(scorer.booster.predict, compiled_trees.from_lightgbm(scorer.booster), rows)
+
+    def test_trust_scorer_scores_alike_with_compiled_trees(self):
+        scorer = trust.scorer
+        rows = self.trust_rows(len(trust.FEATURE_NAMES), n=compiled_trees.ROW_LOOP_LIMIT)
+        with mock.patch.object(compiled_trees, "ENABLED", True):
+            compiled = trust.TrustScorer(scorer.model, scorer.lexical_model, scorer.version)
+        self.assertIsNotNone(compiled.compiled_model)
+        self.assertEqual(compiled.score(rows), trust.TrustScorer(scorer.model).score(rows))
+
+
+class ResultCacheTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("trust",)
+
+    def setUp(self):
+        super().setUp()
+        patcher = FakeProbes().patch()
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(trust, "run_trust", wraps=trust.run_trust)
+        self.run_trust = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def check(self, url):
+        response = self.client.post("/api/check-website/", {"url": url}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_canonical_url(self):
+        for url, canonical in [
+            ("  HTTP://Shop.Example.COM:80/Path?q=1#top ", "http://shop.example.com/Path?q=1"),
+            ("https://shop.example.com:443/", "https://shop.example.com/"),
+            ("https://shop.example.com:8443/", "https://shop.example.com:8443/"),
+            ("http://User@Shop.example.com/", "http://User@shop.example.com/"),
+            ("http://[::1]:80/", "http://[::1]/"),
+            ("shop.example.com/login", "shop.example.com/login"),
+            ("http://[::1", "http://[::1"),
+            ("http://shop.example.com:port/", "http://shop.example.com:port/"),
+        ]:
+            self.assertEqual(trust.canonical_url(url), canonical, url)
+
+    def test_spellings_of_a_url_share_one_cached_result(self):
+        first = self.check("http://shop.example.com/login")
+        self.assertEqual(self.check("HTTP://SHOP.example.com:80/login#form"), first)
+        self.assertEqual(self.run_trust.call_count, 1)
+
+    def test_a_new_model_version_misses_the_cache(self):
+        self.check("http://shop.example.com/login")
+        with mock.patch.object(trust.scorer, "version", "retrained"):
+            self.check("http://shop.example.com/login")
+            self.check("http://shop.example.com/login")
+        self.assertEqual(self.run_trust.call_count, 2)
+
+    def test_partial_verdicts_are_not_cached(self):
+        self.run_trust.side_effect = lambda url, mode: {**trust.trust_verdict(50), "partial": True}
+        self.check("http://shop.example.com/login")
+        self.check("http://shop.example.com/login")
+        self.assertEqual(self.run_trust.call_count, 2)
+
+    def test_batches_reuse_and_fill_the_cache(self):
+        self.check("http://a.example.com/")
+        response = self.client.post("/api/check-websites/", {"urls": ["http://A.example.com/", "http://b.example.com/"]},
+                                    content_type="application/json")
+        self.assertEqual(response.json()["results"][0], {**self.check("http://a.example.com/"), "url": "http://A.example.com/"})
+        self.check("http://b.example.com/")
+        self.assertEqual(self.run_trust.call_count, 1)  # the batch scored b without run_trust, and cached it
+
+    def test_endpoints_answer_503_without_a_model(self):
+        with mock.patch.object(registry.models, "get", return_value=None):
+            for path, data in (("/api/check-website/", {"url": "http://a.example.com/"}),
+                               ("/api/check-website-async/", {"url": "http://a.example.com/"}),
+                               ("/api/check-websites/", {"urls": ["http://a.example.com/"]}),
+                               ("/api/check-sms/", {"sms_text": "hello"}),
+                               ("/api/check-sms-batch/", {"messages": ["hello"]})):
+                response = self.client.post(path, data, content_type="application/json")
+                self.assertEqual(response.status_code, 503, path)
+
+
+class SingleFlightTests(SimpleTestCase):
+    CALLERS = 8
+
+    def concurrently(self, call):
+        barrier = threading.Barrier(self.CALLERS)
+        outcomes = [None] * self.CALLERS
+
+        def run(i):
+            barrier.wait()
+            try:
+                outcomes[i] = call()
+            except Exception as exc:
+                outcomes[i] = exc
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(self.CALLERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_identical_concurrent_calls_run_once(self):
+        flight = SingleFlight()
+        calls = Counter()
+
+        def slow(key):
+            calls[key] += 1
+            time.sleep(0.2)
+            return {"key": key}
+
+        outcomes = self.concurrently(lambda: flight.do("a", slow, "a"))
+        self.assertEqual(calls, Counter({"a": 1}))
+        self.assertEqual(outcomes, [{"key": "a"}] * self.CALLERS)
+        self.assertEqual(flight.stats(), {"in_flight": 0, "executed": 1, "coalesced": self.CALLERS - 1})
+
+        flight.do("a", slow, "a")  # the key is free again once the call finished
+        self.assertEqual(calls["a"], 2)
+
+    def test_waiters_get_the_leaders_exception(self):
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.2)
+            raise ValueError("probe pool gone")
+
+        outcomes = self.concurrently(lambda: flight.do("a", fail))
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+
+    def test_async_waiters_share_one_task_and_survive_a_cancelled_one(self):
+        flight = AsyncSingleFlight()
+        calls = Counter()
+
+        async def slow(key):
+            calls[key] += 1
+            await asyncio.sleep(0.1)
+            return key
+
+        async def run():
+            waiters = [asyncio.ensure_future(flight.do("a", slow, "a")) for _ in range(self.CALLERS)]
+            await asyncio.sleep(0.01)
+            waiters[0].cancel()  # a client that went away
+            return await asyncio.gather(*waiters[1:])
+
+        self.assertEqual(asyncio.run(run()), ["a"] * (self.CALLERS - 1))
+        self.assertEqual(calls, Counter({"a": 1}))
+        self.assertEqual(flight.stats(), {"in_flight": 0, "executed": 1, "coalesced": self.CALLERS - 1})
+
+
+# Concurrent identical check-website requests share one set of probes
+class SingleFlightEndpointTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("trust",)
+    REQUESTS = 8
+    ONE_PROBE_SET = {"ssl": 1, "index": 1, "traffic": 1, "dns": 2}  # the ip and dns probes both resolve
+
+    def test_concurrent_identical_requests_probe_once(self):
+        barrier = threading.Barrier(self.REQUESTS)
+        responses = [None] * self.REQUESTS
+
+        def request(i):
+            barrier.wait()
+            responses[i] = Client().post("/api/check-website/", {"url": "http://campaign.example.com/login"},
+                                         content_type="application/json")
+
+        resolver = StubResolver(latency=0.3)
+        with StubServer(latency=0.3) as server, patch_trust(trust, server, resolver):
+            threads = [threading.Thread(target=request, args=(i,)) for i in range(self.REQUESTS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        probes = {"ssl": server.hits["ssl"], "index": server.hits["index"], "traffic": server.hits["traffic"],
+                  "dns": sum(resolver.calls.values())}
+
+        self.assertEqual(probes, self.ONE_PROBE_SET)
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertTrue(all(response.json() == responses[0].json() for response in responses))
+
+
+class MicroBatchTests(SimpleTestCase):
+    # Doubles each row; records the size of every batch
+    def predictor(self, delay=0.05, fail=False):
+        sizes = []
+
+        def predict_batch(rows):
+            sizes.append(len(rows))
+            time.sleep(delay)
+            if fail:
+                raise ValueError("model crashed")
+            return [row * 2 for row in rows]
+        return predict_batch, sizes
+
+    def submit_from_threads(self, batcher, n):
+        barrier = threading.Barrier(n)
+        outcomes = [None] * n
+
+        def run(i):
+            barrier.wait()
+            try:
+                outcomes[i] = batcher.submit(i)
+            except Exception as exc:
+                outcomes[i] = exc
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_concurrent_rows_are_scored_together(self):
+        predict_batch, sizes = self.predictor()
+        batcher = MicroBatcher(predict_batch, max_batch_size=8)
+        self.assertEqual(self.submit_from_threads(batcher, 20), [i * 2 for i in range(20)])
+        self.assertEqual(sum(sizes), 20)
+        self.assertLess(len(sizes), 20)
+        self.assertLessEqual(max(sizes), 8)
+        self.assertEqual(batcher.stats()["rows"], 20)
+
+    def test_every_row_of_a_failed_batch_gets_the_error(self):
+        predict_batch, _ = self.predictor(fail=True)
+        outcomes = self.submit_from_threads(MicroBatcher(predict_batch), 6)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+
+    def test_lists_and_disabled_batchers_score_directly(self):
+        predict_batch, sizes = self.predictor(delay=0)
+        self.assertEqual(MicroBatcher(predict_batch, max_batch_size=3).submit_many([1, 2, 3]), [2, 4, 6])
+        self.assertEqual(self.submit_from_threads(MicroBatcher(predict_batch, enabled=False), 4), [0, 2, 4, 6])
+        self.assertEqual(sizes, [3, 1, 1, 1, 1])
+
+    def test_async_rows_of_one_loop_turn_form_a_batch(self):
+        predict_batch, sizes = self.predictor(delay=0)
+        batcher = AsyncMicroBatcher(predict_batch, max_batch_size=8)
+
+        async def run():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+
+        self.assertEqual(asyncio.run(run()), [i * 2 for i in range(20)])
+        self.assertEqual(sizes, [8, 8, 4])
+
+
+class SmsReportTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("sms",)
+    REPORT = {"sms_text": "Your parcel is held, pay the fee at parcel-fee.example", "label": "spam"}
+
+    def reporter(self):
+        client = APIClient()
+        client.force_authenticate(User(pk=1, username="reporter"))
+        return client
+
+    def test_anonymous_reports_are_refused(self):
+        response = self.client.post("/api/report-sms/", self.REPORT, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_reports_are_learned_by_the_live_model(self):
+        scorer = smsScam.scorer
+        version = scorer.version
+        response = self.reporter().post("/api/report-sms/", self.REPORT, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "learned", "model_version": scorer.version})
+        self.assertNotEqual(scorer.version, version)
+        self.assertEqual(scorer.feedback_offset, smsScam.feedback_store.size())
+        self.assertEqual(smsScam.feedback_store.read()[0][-1]["text"], self.REPORT["sms_text"])
+
+    def test_reports_are_rate_limited_per_user(self):
+        with override_settings(FRAUDLENS_SMS_REPORTS={"RATE": "2/hour"}):
+            client = self.reporter()
+            statuses = [client.post("/api/report-sms/", self.REPORT, format="json").status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_invalid_reports_are_rejected(self):
+        for data in ({"sms_text": "", "label": "spam"}, {"sms_text": "hi", "label": "scam"}):
+            self.assertEqual(self.reporter().post("/api/report-sms/", data, format="json").status_code, 400)
+
+
+class SpamScorerTests(ApiTestMixin, SimpleTestCase):
+    fixture_models = ("sms",)
+
+    def setUp(self):
+        super().setUp()
+        live = smsScam.scorer
+        self.scorer = smsScam.SpamScorer(live.vectorizer, copy.deepcopy(live.model), "v1")
+        self.store = FeedbackStore(FIXTURE_DIR / "feedback" / f"{self._testMethodName}.jsonl")
+
+    def test_the_default_vectorizer_learns_incrementally(self):
+        self.assertIsInstance(smsScam.make_vectorizer(), smsScam.HashingVectorizer)
+        self.assertTrue(self.scorer.incremental)
+
+    def test_learning_swaps_in_an_updated_copy(self):
+        before = self.scorer.model
+        counts = before.class_count_.copy()
+        self.scorer.learn(["claim your free prize now"], [1])
+        self.assertIsNot(self.scorer.model, before)
+        np.testing.assert_array_equal(before.class_count_, counts)  # in use by predictions started earlier
+        self.assertEqual(self.scorer.model.class_count_[1], counts[1] + 1)
+
+    def test_predictions_run_while_the_model_learns(self):
+        errors = []
+        stop = threading.Event()
+
+        def predict():
+            while not stop.is_set():
+                try:
+                    self.scorer.predict_spam_proba(["win a prize", "lunch at noon?"])
+                except Exception as exc:
+                    errors.append(exc)
+
+        thread = threading.Thread(target=predict)
+        thread.start()
+        for i in range(50):
+            self.scorer.learn([f"free entry number {i}"], [i % 2])
+        stop.set()
+        thread.join()
+        self.assertEqual(errors, [])
+
+    def test_catch_up_learns_new_reports_and_is_throttled(self):
+        self.store.append("urgent: verify your account", "spam")
+        self.assertEqual(self.scorer.catch_up(self.store, interval=60), 1)
+        self.assertEqual(self.scorer.version, f"v1+{self.store.size()}")
+
+        self.store.append("see you tomorrow", "ham")
+        with mock.patch.object(self.store, "size", wraps=self.store.size) as size:
+            self.assertEqual(self.scorer.catch_up(self.store, interval=60), 0)  # checked a moment ago
+            size.assert_not_called()
+            self.assertEqual(self.scorer.catch_up(self.store), 1)
+
+
+class MatrixCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.root = FIXTURE_DIR / "matrix-cache" / self._testMethodName
+        self.source = FIXTURE_DIR / f"{self._testMethodName}.csv"
+        self.source.write_text("a,b\n1,2\n")
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {"dense": np.arange(6, dtype=np.float32).reshape(2, 3),
+                "sparse": scipy.sparse.random(5, 8, density=0.3, format="csr", random_state=0)}, {"rows": 2}
+
+    def load(self, tag="v1", enabled=True):
+        return matrix_cache.load_or_build("test", [self.source], self.build, tag=tag, enabled=enabled, root=self.root)
+
+    def test_a_second_load_reads_the_cached_arrays(self):
+        built, meta, hit = self.load()
+        self.assertFalse(hit)
+        cached, cached_meta, hit = self.load()
+        self.assertTrue(hit)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(cached_meta, meta)
+        np.testing.assert_array_equal(cached["dense"], built["dense"])
+        self.assertEqual(cached["dense"].dtype, np.float32)
+        self.assertEqual((cached["sparse"] != built["sparse"]).nnz, 0)
+
+    def test_editing_a_source_or_the_tag_rebuilds(self):
+        self.load()
+        self.assertFalse(self.load(tag="v2")[2])
+        self.source.write_text("a,b\n1,3\n")
+        self.assertFalse(self.load()[2])
+        self.assertEqual(self.builds, 3)
+        self.assertTrue(self.load()[2])
+
+    def test_a_disabled_cache_always_builds(self):
+        self.load(enabled=False)
+        self.load(enabled=False)
+        self.assertEqual(self.builds, 2)
+        self.assertFalse(self.root.exists())
+
+    def test_frames_round_trip_with_their_categories(self):
+        df = pd.DataFrame({"amount": [1.5, 2.0, 3.25], "count": [1, 2, 3],
+                           "kind": pd.Categorical(["b", "a", "b"], categories=["a", "b"])})
+        arrays, meta = matrix_cache.frame_arrays(df)
+        pd.testing.assert_frame_equal(matrix_cache.arrays_frame(arrays, meta), df)
+
+    def test_cached_matrices_times_and_reports_the_cache(self):
+        with mock.patch.object(matrix_cache, "CACHE_DIR", self.root):
+            timers = [StageTimer() for _ in range(3)]
+            for timer, use_cache in zip(timers, (True, True, False)):
+                cached_matrices(timer, "test", [self.source], self.build, "v1", use_cache)
+        self.assertEqual([timer.cache["test"] for timer in timers], ["miss", "hit", "off"])
+        self.assertIn("load", timers[1].stages)
+
+
+class FeatureStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.csv_path = FIXTURE_DIR / f"{self._testMethodName}.csv"
+        write_transactions(self.csv_path, n=120)
+        patcher = mock.patch.object(matrix_cache, "CACHE_DIR", FIXTURE_DIR / "matrix-cache" / self._testMethodName)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def load(self, use_cache=True):
+        timer = StageTimer()
+        return feature_store.transactions(self.csv_path, timer, use_cache), timer.cache["transactions"]
+
+    def test_cached_frames_match_a_fresh_build(self):
+        built, status = self.load()
+        self.assertEqual(status, "miss")
+        cached, status = self.load()
+        self.assertEqual(status, "hit")
+        pd.testing.assert_frame_equal(cached, built)
+        pd.testing.assert_frame_equal(cached, feature_store.build_transactions(self.csv_path))
+
+    def test_editing_the_csv_rebuilds_the_frame(self):
+        self.load()
+        write_transactions(self.csv_path, n=120, seed=1)
+        frame, status = self.load()
+        self.assertEqual(status, "miss")
+        pd.testing.assert_frame_equal(frame, feature_store.build_transactions(self.csv_path))
+
+    def test_text_columns_are_sorted_categoricals(self):
+        frame, _ = self.load()
+        raw = pd.read_csv(self.csv_path)
+        self.assertEqual(frame["Transaction_Day"].tolist(),
+                         pd.to_datetime(raw["Transaction_Date"], dayfirst=True).dt.dayofweek.tolist())
+        for col in ("Transaction_Currency", "Merchant_ID", "Transaction_Time"):
+            codes = frame[col].cat.codes.tolist()
+            self.assertEqual(codes, LabelEncoder().fit_transform(raw[col]).tolist(), col)
+
+    # The feature store's training frame is the one encoding the parsed CSV gives
+    def test_training_frames_match_encoding_the_csv(self):
+        X, y, encoders = transactionFraud.training_frame(self.csv_path)
+        plain = transactionFraud.prepare_transactions(pd.read_csv(self.csv_path))
+        X_plain, y_plain, plain_encoders = transactionFraud.encode_transactions(plain)
+        pd.testing.assert_frame_equal(X, X_plain)
+        np.testing.assert_array_equal(y, y_plain)
+        for col, encoder in encoders.items():
+            np.testing.assert_array_equal(encoder.classes_, plain_encoders[col].classes_)
+
+
+class CategoricalCodecTests(SimpleTestCase):
+    VALUES = ["UPI", "Debit", "Transfer", "Crypto", "Debit", None]
+
+    def setUp(self):
+        self.encoder = LabelEncoder().fit(["Transfer", "UPI", "Debit", "UPI"])
+        self.codec = CategoricalCodec.from_encoders({"Transaction_Type": self.encoder})
+
+    def test_codes_match_the_label_encoder(self):
+        for value in self.encoder.classes_:
+            self.assertEqual(self.codec.encode("Transaction_Type", value), self.encoder.transform([value])[0])
+
+    def test_unseen_and_unhashable_values_are_unknown(self):
+        self.assertEqual(self.codec.encode("Transaction_Type", "Crypto"), -1)
+        self.assertEqual(self.codec.encode("Transaction_Type", ["UPI"]), -1)
+        codec = CategoricalCodec(self.codec.classes, unknown=99)
+        self.assertEqual(codec.encode("Transaction_Type", "Crypto"), 99)
+        self.assertEqual(codec.encode_column("Transaction_Type", pd.Series(["Crypto", "UPI"])).tolist(), [99, 2])
+
+    def test_columns_encode_like_scalars(self):
+        expected = [self.codec.encode("Transaction_Type", value) for value in self.VALUES]
+        for values in (self.VALUES, pd.Series(self.VALUES), pd.Series(self.VALUES, dtype="category")):
+            self.assertEqual(self.codec.encode_column("Transaction_Type", values).tolist(), expected)
+
+    def test_save_and_load(self):
+        path = FIXTURE_DIR / "codec.json"
+        self.codec.save(path)
+        loaded = CategoricalCodec.load(path)
+        self.assertEqual(loaded.classes, self.codec.classes)
+        self.assertEqual(loaded.encode_column("Transaction_Type", self.VALUES).tolist(),
+                         self.codec.encode_column("Transaction_Type", self.VALUES).tolist())
+
+
+class MetricsTests(SimpleTestCase):
+    def test_histograms_render_cumulative_buckets(self):
+        histogram = metrics.Histogram("test_seconds", "Test.", ["probe"], buckets=(1, 0.5))
+        for value in (0.25, 0.5, 1.0, 4.0):
+            histogram.observe(value, probe="ssl")
+        self.assertEqual(histogram.samples(), [
+            'test_seconds_bucket{probe="ssl",le="0.5"} 2',
+            'test_seconds_bucket{probe="ssl",le="1.0"} 3',
+            'test_seconds_bucket{probe="ssl",le="+Inf"} 4',
+            'test_seconds_sum{probe="ssl"} 5.75',
+            'test_seconds_count{probe="ssl"} 4',
+        ])
+
+    def test_counters_escape_label_values(self):
+        counter = metrics.Counter("test_total", "Test.", ["view"])
+        counter.inc(view='say "hi"\n')
+        counter.inc(2, view="plain")
+        self.assertEqual(counter.samples(), ['test_total{view="plain"} 2', 'test_total{view="say \\"hi\\"\\n"} 1'])
+        with self.assertRaises(ValueError):
+            counter.inc(status="200")
+
+    def test_registry_renders_help_and_type_once_per_metric(self):
+        registry_ = metrics.Registry()
+        counter = registry_.register(metrics.Counter("test_total", "Requests.", ["view"]))
+        self.assertIs(registry_.register(metrics.Counter("test_total", "Requests.", ["view"])), counter)
+        with self.assertRaises(ValueError):
+            registry_.register(metrics.Histogram("test_total", "Requests.", ["view"]))
+        counter.inc(view="a")
+        self.assertEqual(registry_.expose(), '# HELP test_total Requests.\n# TYPE test_total counter\ntest_total{view="a"} 1\n')
+
+    def test_timers_observe_sync_and_async_calls(self):
+        histogram = metrics.Histogram("test_seconds", "Test.", ["probe"])
+
+        @histogram.time(probe="dns")
+        def resolve():
+            return "127.0.0.1"
+
+        @histogram.time(probe="ssl")
+        async def fetch():
+            return 1
+
+        resolve()
+        asyncio.run(fetch())
+        with histogram.time(probe="dns"):
+            pass
+        self.assertEqual((histogram.count(probe="dns"), histogram.count(probe="ssl")), (2, 1))
+
+    def test_metrics_endpoint_counts_requests(self):
+        self.client.get("/api/cache-stats/")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        self.assertIn('fraudlens_requests_total{view="cache_stats",status="200"}', response.content.decode())
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def fresh_registry(self, **loaders):
+        models = registry.ModelRegistry()
+        for name, loader in loaders.items():
+            models.register(name, loader)
+        patcher = mock.patch.object(registry, "models", models)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return models
+
+    def test_concurrent_first_calls_load_once(self):
+        calls = Counter()
+
+        def load():
+            calls["trust"] += 1
+            time.sleep(0.05)
+            return object()
+
+        models = self.fresh_registry(trust=load)
+        with ThreadPoolExecutor(8) as pool:
+            loaded = list(pool.map(lambda _: models.get("trust"), range(8)))
+        self.assertEqual(calls["trust"], 1)
+        self.assertTrue(all(model is loaded[0] for model in loaded))
+        self.assertEqual(models.status()["trust"]["state"], "warm")
+
+    def test_a_failed_load_is_retried(self):
+        attempts = iter([OSError("artifact unreadable"), "model"])
+
+        def load():
+            result = next(attempts)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        models = self.fresh_registry(sms=load)
+        with self.assertRaises(OSError):
+            models.get("sms")
+        self.assertEqual(models.status()["sms"]["state"], "failed")
+        self.assertIn("artifact unreadable", models.status()["sms"]["error"])
+        self.assertEqual(models.get("sms"), "model")
+        self.assertEqual(models.status()["sms"]["state"], "warm")
+        self.assertNotIn("error", models.status()["sms"])
+
+    def test_readiness_waits_for_the_warm_up_models(self):
+        models = self.fresh_registry(trust=object, sms=lambda: None, fraud=object)
+        with override_settings(FRAUDLENS_MODELS={"WARM_UP": ("trust",)}):
+            response = self.client.get("/api/ready/")
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()["models"]["trust"]["state"], "cold")
+            models.warm_up(["trust", "sms"])
+            response = self.client.get("/api/ready/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["models"]["sms"]["state"], "missing")
+            self.assertEqual(response.json()["models"]["fraud"]["state"], "cold")
+        with override_settings(FRAUDLENS_MODELS={"WARM_UP": ("trust", "sms")}):
+            self.assertEqual(self.client.get("/api/ready/").status_code, 503)
+
+    @override_settings(FRAUDLENS_MODELS={"WARM_UP": ("sms",), "BACKGROUND": True})
+    def test_preload_loads_the_warm_up_models_before_returning(self):
+        models = self.fresh_registry(trust=object, sms=object, fraud=object)
+        with mock.patch.object(artifacts, "AUTO_TRAIN", True), mock.patch.object(gc, "freeze") as freeze:
+            preload.preload_models()
+            self.assertFalse(artifacts.AUTO_TRAIN)
+        self.assertEqual({name for name in registry.MODULES if models.is_loaded(name)}, {"sms"})
+        freeze.assert_called_once()
+
+    @override_settings(FRAUDLENS_MODELS={"WARM_UP": ("trust",), "BACKGROUND": True})
+    def test_warm_up_in_the_background_answers_not_ready_meanwhile(self):
+        release = threading.Event()
+        self.fresh_registry(trust=lambda: release.wait(5) and object())
+        preload.start_warm_up()
+        self.assertEqual(self.client.get("/api/ready/").status_code, 503)
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == "model-warm-up":
+                thread.join(5)
+        self.assertEqual(self.client.get("/api/ready/").status_code, 200)
+
+
+# Jobs write their history inline (history.write), with the results: TransactionTestCase,
+# so the worker threads see the committed job rows
+class ScanJobTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fixture_model("trust")
+        fixture_model("sms")
+
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        upload_dir = tempfile.mkdtemp(prefix="fraudlens-test-jobs-", dir=FIXTURE_DIR)
+        settings = override_settings(FRAUDLENS_JOBS={"WORKERS": 1, "UPLOAD_DIR": upload_dir, "CHUNK_SIZE": 2,
+                                                     "URL_CHUNK_SIZE": 2})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def wait_until_finished(self, status_url):
+        state = {}
+
+        def finished():
+            state.update(self.client.get(status_url).json())
+            return state["status"] in (ScanJob.DONE, ScanJob.FAILED)
+
+        self.assertTrue(wait_for(finished, timeout=30), state)
+        return state
+
+    def results(self, job):
+        response = self.client.get(job["results_url"])
+        self.assertEqual(response.status_code, 200)
+        return list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+    def test_url_job_lifecycle(self):
+        urls = ["http://ok.example.com/", "http://[::1", "http://other.example.com/login"]
+        response = self.client.post("/api/jobs/", {"kind": "urls", "items": urls, "mode": "offline"},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        created = response.json()
+        self.assertEqual((created["status"], created["total"]), (ScanJob.QUEUED, 3))
+
+        job = self.wait_until_finished(created["status_url"])
+        self.assertEqual((job["status"], job["processed"], job["progress"]), (ScanJob.DONE, 3, 1.0))
+        rows = self.results(job)
+        self.assertEqual([row["item"] for row in rows], urls)
+        self.assertEqual([row["label"] == "error" for row in rows], [False, True, False])
+        self.assertEqual(ScanRecord.objects.filter(job_id=job["id"]).count(), 2)  # errors aren't history
+
+    def test_sms_job_from_an_uploaded_file(self):
+        upload = io.BytesIO(b"WINNER! claim your prize now\nare we still on for lunch\n\nfree entry, text WIN\n")
+        upload.name = "messages.txt"
+        response = self.client.post("/api/jobs/", {"kind": "sms", "file": upload})
+        self.assertEqual(response.status_code, 202)
+
+        job = self.wait_until_finished(response.json()["status_url"])
+        self.assertEqual((job["status"], job["total"], job["processed"]), (ScanJob.DONE, 3, 3))
+        self.assertEqual([row["position"] for row in self.results(job)], ["0", "1", "2"])
+        self.assertFalse(os.path.exists(ScanJob.objects.get(pk=job["id"]).input_path))  # removed once done
+
+    def test_results_conflict_until_done_and_unknown_jobs_404(self):
+        job = ScanJob.objects.create(kind=ScanJob.SMS, input_path="-")
+        self.assertEqual(self.client.get(f"/api/jobs/{job.pk}/results/").status_code, 409)
+        self.assertEqual(self.client.get("/api/jobs/00000000-0000-0000-0000-000000000000/").status_code, 404)
+
+    def test_rejects_invalid_submissions(self):
+        for data in ({"kind": "nope", "items": []}, {"kind": "transactions", "items": []}, {"kind": "sms"},
+                     {"kind": "urls", "items": [], "mode": "nope"}):
+            response = self.client.post("/api/jobs/", data, content_type="application/json")
+            self.assertEqual(response.status_code, 400, data)
+
+    def test_queued_jobs_run_by_process_queued(self):
+        with override_settings(FRAUDLENS_JOBS={**jobs.job_settings(), "WORKERS": 0}):
+            job = jobs.submit(ScanJob.SMS, jobs.save_items(["hello there"]), total=1)
+            missing = jobs.submit(ScanJob.SMS, "/nonexistent/messages.txt")
+        time.sleep(0.1)
+        self.assertEqual(ScanJob.objects.get(pk=job.pk).status, ScanJob.QUEUED)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(jobs.process_queued(), 2)
+        self.assertIn(f"scan job {missing.pk} failed", output.getvalue())
+        self.assertEqual(ScanJob.objects.get(pk=job.pk).status, ScanJob.DONE)
+        failed = ScanJob.objects.get(pk=missing.pk)
+        self.assertEqual(failed.status, ScanJob.FAILED)
+        self.assertIn("FileNotFoundError", failed.error)
+
+
+# Buffered history writes against the (SQLite) test database: TransactionTestCase, so the
+# flusher thread sees committed rows
+class ScanHistoryTests(TransactionTestCase):
+    def test_flushes_once_flush_rows_are_buffered(self):
+        writer = ScanHistoryWriter(flush_rows=3, flush_interval=60)
+        writer.record(ScanRecord.TRUST, [("http://a.example.com/", 90, "Very Safe", None)] * 2)
+        time.sleep(0.2)
+        self.assertEqual(ScanRecord.objects.count(), 0)
+        self.assertEqual(writer.stats()["buffered"], 2)
+
+        writer.record(ScanRecord.TRUST, [("http://b.example.com/", 40, "High Risk", None)])
+        self.assertTrue(wait_for(lambda: ScanRecord.objects.count() == 3))
+        self.assertEqual(writer.stats(), {"enabled": True, "buffered": 0, "written": 3, "dropped": 0})
+
+    def test_flushes_after_flush_interval(self):
+        writer = ScanHistoryWriter(flush_rows=1000, flush_interval=0.2)
+        writer.record(ScanRecord.TRUST, [("http://a.example.com/", 90, "Very Safe", None)])
+        self.assertTrue(wait_for(lambda: ScanRecord.objects.count() == 1, timeout=5))
+
+    def test_normalized_items_share_a_hash_and_urls_are_indexed_by_domain(self):
+        writer = ScanHistoryWriter(flush_rows=1000, flush_interval=60)
+        writer.record(ScanRecord.SMS, [("Free PRIZE, call now!!", 98.0, "Spam", None),
+                                       ("free prize call now", 98.0, "Spam", None)], version="v1")
+        writer.record(ScanRecord.TRUST, [("HTTPS://Shop.Example.com:443/a#x", 20, "Dangerous", None),
+                                         ("shop.example.com/b", 20, "Dangerous", None)])
+        self.assertEqual(writer.flush(), 4)
+
+        sms = list(ScanRecord.objects.filter(kind=ScanRecord.SMS))
+        self.assertEqual(len({record.item_hash for record in sms}), 1)
+        self.assertEqual({record.model_version for record in sms}, {"v1"})
+        self.assertEqual(ScanRecord.objects.filter(domain="shop.example.com").count(), 2)
+
+    def test_drops_rows_beyond_max_buffer(self):
+        writer = ScanHistoryWriter(flush_rows=1000, flush_interval=60, max_buffer=2)
+        writer.record(ScanRecord.TRUST, [("http://a.example.com/", 90, "Very Safe", None)] * 2)
+        writer.record(ScanRecord.TRUST, [("http://b.example.com/", 90, "Very Safe", None)])
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(writer.stats()["dropped"], 1)
+
+    def test_views_record_verdicts_off_the_request_path(self):
+        fixture_model("sms")
+        caches["default"].clear()
+        self.assertTrue(history.enabled)
+        response = self.client.post("/api/check-sms-batch/", {"messages": ["win a prize now", "see you at 5", 7]},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        history.flush()
+        self.assertEqual(sorted(ScanRecord.objects.values_list("item", flat=True)), ["see you at 5", "win a prize now"])
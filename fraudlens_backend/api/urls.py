@@ -1,7 +1,19 @@
 from django.urls import path
-from .views import check_website_trust, detect_scam_email
+from .views import (check_website_trust, check_website_trust_async, check_websites_trust, detect_scam_email,
+                    check_sms_scam, check_sms_scam_batch, report_sms, cache_stats, readiness,
+                    create_scan_job, scan_job_status, scan_job_results)
 
 urlpatterns = [
     path('check-website/', check_website_trust),
+    path('check-website-async/', check_website_trust_async),
+    path('check-websites/', check_websites_trust),
     path('detect-scam-email/', detect_scam_email),
+    path('check-sms/', check_sms_scam),
+    path('check-sms-batch/', check_sms_scam_batch),
+    path('report-sms/', report_sms),
+    path('cache-stats/', cache_stats),
+    path('ready/', readiness),
+    path('jobs/', create_scan_job),
+    path('jobs/<uuid:job_id>/', scan_job_status),
+    path('jobs/<uuid:job_id>/results/', scan_job_results),
 ]
@@ -1,19 +1,226 @@
-from django.shortcuts import render
-from django.http import JsonResponse
-from rest_framework.decorators import api_view
+import asyncio
+import csv
+import functools
+import importlib.util
+import inspect
+import json
+import time
+from pathlib import Path
+from django.conf import settings
+from django.shortcuts import get_object_or_404, render
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from ai_models import trust, smsScam
+from rest_framework.throttling import UserRateThrottle
+from ai_models import metrics, registry
+from ai_models.feedback_store import LABELS
+from . import jobs
+from .models import ScanJob, ScanRecord
+from .result_cache import ResultCache
+from .scan_history import history, verdict_entries
 
+# The model modules (pandas, XGBoost, scikit-learn and the artifacts) are imported inside
+# the views, on first use: loading the URLconf, e.g. for a management command's system
+# checks, stays cheap. Serving processes warm them up as wsgi.py/asgi.py load
+# (fraudlens_backend.preload).
 
+MAX_BATCH_URLS = 500
+MAX_BATCH_MESSAGES = 5000
+
+# Responses keyed on (canonical url, mode) or the cleaned SMS text, plus the model version
+result_cache = ResultCache.from_settings()
+
+REQUEST_SECONDS = metrics.histogram("fraudlens_request_seconds", "Time spent in each API view.", ["view"])
+REQUESTS = metrics.counter("fraudlens_requests_total", "API requests by view and response status.", ["view", "status"])
+
+
+# Per-view latency and status counts for /metrics (the view itself when metrics are disabled)
+def instrumented(name):
+    def decorate(view):
+        if not metrics.ENABLED:
+            return view
+
+        def record(started, status):
+            REQUEST_SECONDS.observe(time.perf_counter() - started, view=name)
+            REQUESTS.inc(view=name, status=status)
+
+        if inspect.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def timed_view(request, *args, **kwargs):
+                started, status = time.perf_counter(), 500
+                try:
+                    response = await view(request, *args, **kwargs)
+                    status = response.status_code
+                    return response
+                finally:
+                    record(started, status)
+        else:
+            @functools.wraps(view)
+            def timed_view(request, *args, **kwargs):
+                started, status = time.perf_counter(), 500
+                try:
+                    response = view(request, *args, **kwargs)
+                    status = response.status_code
+                    return response
+                finally:
+                    record(started, status)
+        return timed_view
+    return decorate
+
+
+def trust_mode(data):
+    from ai_models import trust
+    mode = data.get('mode', 'full')
+    return mode if mode in trust.TRUST_MODES else None
+
+def invalid_mode_response():
+    from ai_models import trust
+    return JsonResponse({"error": f"'mode' must be one of: {', '.join(trust.TRUST_MODES)}"}, status=400)
+
+# 400 for a url the trust checks can't handle (what run_trust_batch reports per item)
+def invalid_url_response(url):
+    from ai_models import trust
+    if not isinstance(url, str) or not url.strip():
+        return JsonResponse({"error": "'url' must be a non-empty string"}, status=400)
+    if not trust.is_valid_url(url):
+        return JsonResponse({"error": "invalid url"}, status=400)
+    return None
+
+# 503 when model `name` has nothing to load (no exported artifact and in-process training
+# off): the server isn't ready to score, the request itself is fine. None once it loaded.
+def model_unavailable_response(name):
+    if registry.models.get(name) is not None:
+        return None
+    return JsonResponse({"error": f"The {name} model is not available"}, status=503)
+
+def trust_payload(url, mode):
+    return {"url": url, "mode": mode}
+
+# Cached results for the entries of a batch that have a payload (None for the others and
+# for misses), then score_batch() on the rest. Distinct new results are cached, except
+# errors and partial verdicts (scored with timed-out probes).
+def cached_batch(kind, version, items, payloads, score_batch):
+    keyed = [i for i, payload in enumerate(payloads) if payload is not None]
+    results = [None] * len(items)
+    for i, cached in zip(keyed, result_cache.get_many(kind, version, [payloads[i] for i in keyed])):
+        results[i] = cached
+
+    misses = [i for i, result in enumerate(results) if result is None]
+    fresh = {}
+    for i, result in zip(misses, score_batch([items[i] for i in misses])):
+        results[i] = result
+        if payloads[i] is not None and "error" not in result and not result.get("partial"):
+            fresh[ResultCache.key(kind, version, payloads[i])] = (payloads[i], result)
+    result_cache.set_many(kind, version, [payload for payload, _ in fresh.values()],
+                          [result for _, result in fresh.values()])
+    return results
+
+def cached_trust_batch(urls, mode):
+    from ai_models import trust
+    canonical = [trust.canonical_url(url) if isinstance(url, str) else url for url in urls]
+    payloads = [trust_payload(url, mode) if isinstance(url, str) and url else None for url in canonical]
+    # Cache verdicts without the url so any spelling of it can reuse them
+    score = lambda batch: [{k: v for k, v in r.items() if k != "url"} for r in trust.run_trust_batch(batch, mode)]
+    verdicts = cached_batch("trust", trust.scorer.version, canonical, payloads, score)
+    history.record(ScanRecord.TRUST, verdict_entries(ScanRecord.TRUST, urls, verdicts), trust.scorer.version)
+    return [{"url": url, **verdict} for url, verdict in zip(urls, verdicts)]
+
+# Keyed on clean_text(): messages that clean to the same text get the same result
+def cached_spam_batch(messages):
+    from ai_models import smsScam
+    # Reports other workers received; the store is checked at most once per interval
+    interval = getattr(settings, "FRAUDLENS_SMS_REPORTS", {}).get("CATCH_UP_INTERVAL", 1.0)
+    smsScam.scorer.catch_up(smsScam.feedback_store, interval)
+    payloads = [smsScam.clean_text(text) if isinstance(text, str) else None for text in messages]
+    verdicts = cached_batch("sms", smsScam.scorer.version, messages, payloads, smsScam.predict_spam_batch)
+    history.record(ScanRecord.SMS, verdict_entries(ScanRecord.SMS, messages, verdicts), smsScam.scorer.version)
+    return verdicts
+
+
+@instrumented("check_website_trust")
 @api_view(['POST'])
 def check_website_trust(request):
+    from ai_models import trust
     url = request.data.get('url', '')
+    mode = trust_mode(request.data)
+    if mode is None:
+        return invalid_mode_response()
+    invalid = invalid_url_response(url)
+    if invalid is not None:
+        return invalid
+    unavailable = model_unavailable_response("trust")
+    if unavailable is not None:
+        return unavailable
+    url = trust.canonical_url(url)
     # Here, you'll later call the AI function
-    response = trust.run_trust(url)
+    version = trust.scorer.version
+    response = result_cache.get("trust", version, trust_payload(url, mode))
+    if response is None:
+        response = trust.run_trust(url, mode)
+        if not response.get("partial"):  # probes timed out: don't serve it for the whole TTL
+            result_cache.set("trust", version, trust_payload(url, mode), response)
+    history.record(ScanRecord.TRUST, verdict_entries(ScanRecord.TRUST, [url], [response]), version)
     #print(response, "In api call", url)
     #response = {"trust_score": 78, "message": f"Website seems safe {url}"}  
     return JsonResponse(response)
 
+# Async twin of check_website_trust for ASGI deployments: probes are awaited instead of
+# pinning a worker thread each. DRF's api_view is sync-only, so this is a plain Django view.
+@instrumented("check_website_trust_async")
+@csrf_exempt
+@require_POST
+async def check_website_trust_async(request):
+    if not registry.models.is_loaded("trust"):
+        await asyncio.to_thread(registry.models.get, "trust")  # cold start: import and load off the event loop
+    from ai_models import trust, trust_async
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Request body must be JSON"}, status=400)
+    if not isinstance(data, dict):
+        data = {}
+    url = data.get('url', '')
+    mode = trust_mode(data)
+    if mode is None:
+        return invalid_mode_response()
+    invalid = invalid_url_response(url)
+    if invalid is not None:
+        return invalid
+    unavailable = model_unavailable_response("trust")  # loaded above: no blocking here
+    if unavailable is not None:
+        return unavailable
+    url = trust.canonical_url(url)
+    version = trust.scorer.version
+    response = await result_cache.aget("trust", version, trust_payload(url, mode))
+    if response is None:
+        response = await trust_async.run_trust_async(url, mode=mode)
+        if not response.get("partial"):
+            await result_cache.aset("trust", version, trust_payload(url, mode), response)
+    history.record(ScanRecord.TRUST, verdict_entries(ScanRecord.TRUST, [url], [response]), version)  # only buffers
+    return JsonResponse(response)
+
+@instrumented("check_websites_trust")
+@api_view(['POST'])
+def check_websites_trust(request):
+    urls = request.data.get('urls', [])
+    if not isinstance(urls, list):
+        return JsonResponse({"error": "'urls' must be a list of URLs"}, status=400)
+    if len(urls) > MAX_BATCH_URLS:
+        return JsonResponse({"error": f"At most {MAX_BATCH_URLS} URLs per request"}, status=400)
+    mode = trust_mode(request.data)
+    if mode is None:
+        return invalid_mode_response()
+    unavailable = model_unavailable_response("trust")
+    if unavailable is not None:
+        return unavailable
+    # One probe per distinct domain/url and one model call for the uncached rest of the batch
+    results = cached_trust_batch(urls, mode)
+    return JsonResponse({"results": results})
+
+@instrumented("detect_scam_email")
 @api_view(['POST'])
 def detect_scam_email(request):
     email_text = request.data.get('email_text', '')
@@ -21,9 +228,160 @@ def detect_scam_email(request):
     response = {"scam_probability": 92, "message": "Likely a phishing attempt"}
     return JsonResponse(response)
 
+@instrumented("check_sms_scam")
 @api_view(['POST'])
 def check_sms_scam(request):
     sms_text = request.data.get('sms_text', '')
-    # Call AI function here later
-    response = {"scam_probability": 90, "message": "Likely a scam"}
-    return JsonResponse(response)
\ No newline at end of file
+    if not isinstance(sms_text, str):
+        return JsonResponse({"error": "'sms_text' must be a string"}, status=400)
+    unavailable = model_unavailable_response("sms")
+    if unavailable is not None:
+        return unavailable
+    response = cached_spam_batch([sms_text])[0]
+    return JsonResponse(response)
+
+@instrumented("check_sms_scam_batch")
+@api_view(['POST'])
+def check_sms_scam_batch(request):
+    messages = request.data.get('messages', [])
+    if not isinstance(messages, list):
+        return JsonResponse({"error": "'messages' must be a list of strings"}, status=400)
+    if len(messages) > MAX_BATCH_MESSAGES:
+        return JsonResponse({"error": f"At most {MAX_BATCH_MESSAGES} messages per request"}, status=400)
+    unavailable = model_unavailable_response("sms")
+    if unavailable is not None:
+        return unavailable
+    return JsonResponse({"results": cached_spam_batch(messages)})
+
+# A user's label for a message: appended to the feedback store and learned immediately
+# by incremental (hashing) models; `manage.py compact_sms_feedback` folds it into a retrain.
+# Reports train the live model, so only authenticated users may send them, at a limited
+# rate each (FRAUDLENS_SMS_REPORTS['RATE']): anonymous clients can't poison the model.
+class SmsReportThrottle(UserRateThrottle):
+    scope = "sms_reports"
+
+    def get_rate(self):
+        return getattr(settings, "FRAUDLENS_SMS_REPORTS", {}).get("RATE", "100/hour")
+
+@instrumented("report_sms")
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([SmsReportThrottle])
+def report_sms(request):
+    from ai_models import smsScam
+    sms_text = request.data.get('sms_text', '')
+    label = request.data.get('label')
+    if not isinstance(sms_text, str) or not sms_text.strip():
+        return JsonResponse({"error": "'sms_text' must be a non-empty string"}, status=400)
+    if label not in LABELS:
+        return JsonResponse({"error": f"'label' must be one of: {', '.join(LABELS)}"}, status=400)
+    unavailable = model_unavailable_response("sms")
+    if unavailable is not None:
+        return unavailable
+    smsScam.report_feedback(sms_text, label)
+    return JsonResponse({
+        "status": "learned" if smsScam.scorer.incremental else "stored",
+        "model_version": smsScam.scorer.version,
+    })
+
+# Hit ratios of the response cache and the probe reputation cache in this process, and
+# how many trust checks were coalesced with an identical one already in flight, how busy
+# the probe pool is, and the scan history writer's buffered / written / dropped rows
+@instrumented("cache_stats")
+@api_view(['GET'])
+def cache_stats(request):
+    from ai_models import smsScam, trust, trust_async
+    return JsonResponse({
+        "result_cache": result_cache.stats(),
+        "reputation_cache": trust.reputation_cache.stats(),
+        "probe_pool": trust.probe_load.stats(),
+        "single_flight": trust.inflight.stats(),
+        "single_flight_async": trust_async.inflight.stats(),
+        "micro_batch": {
+            "trust": trust.trust_batcher.stats(),
+            "trust_lexical": trust.lexical_batcher.stats(),
+            "trust_async": trust_async.trust_batcher.stats(),
+            "trust_lexical_async": trust_async.lexical_batcher.stats(),
+            "sms": smsScam.spam_batcher.stats(),
+        },
+        "scan_history": history.stats(),
+    })
+
+# Bulk scan: a file upload ("file", plus "kind" and for URLs "mode") or a JSON list of
+# URLs/messages ("items"). Saved, queued and processed in the background; poll status_url,
+# then download results_url as CSV.
+@instrumented("create_scan_job")
+@api_view(['POST'])
+def create_scan_job(request):
+    kind = request.data.get('kind')
+    if kind not in dict(ScanJob.KINDS):
+        return JsonResponse({"error": f"'kind' must be one of: {', '.join(dict(ScanJob.KINDS))}"}, status=400)
+    mode = ""
+    if kind == ScanJob.URLS:
+        mode = trust_mode(request.data)
+        if mode is None:
+            return invalid_mode_response()
+
+    upload = request.FILES.get('file')
+    items = request.data.get('items')
+    total = None
+    if upload is not None:
+        suffix = Path(upload.name).suffix.lower()
+        if kind == ScanJob.TRANSACTIONS and suffix not in (".csv", ".parquet"):
+            return JsonResponse({"error": "Transactions must be a .csv or .parquet file"}, status=400)
+        if kind != ScanJob.TRANSACTIONS and suffix != ".json":
+            suffix = ".txt"  # one URL / message per line
+        if suffix == ".parquet" and importlib.util.find_spec("pyarrow") is None:
+            return JsonResponse({"error": "Parquet uploads need pyarrow on the server; send a .csv"}, status=400)
+        input_path = jobs.save_upload(upload, suffix)
+    elif kind != ScanJob.TRANSACTIONS and isinstance(items, list):
+        input_path = jobs.save_items(items)
+        total = len(items)
+    else:
+        expected = "a 'file' upload" if kind == ScanJob.TRANSACTIONS else "a 'file' upload or an 'items' list"
+        return JsonResponse({"error": f"Send {expected}"}, status=400)
+
+    job = jobs.submit(kind, input_path, mode, total)
+    return JsonResponse(jobs.job_payload(job), status=202)
+
+@instrumented("scan_job_status")
+@api_view(['GET'])
+def scan_job_status(request, job_id):
+    return JsonResponse(jobs.job_payload(get_object_or_404(ScanJob, pk=job_id)))
+
+class _Echo:
+    def write(self, value):
+        return value
+
+# CSV of a finished job, streamed from the database so large scans aren't built in memory
+@instrumented("scan_job_results")
+@api_view(['GET'])
+def scan_job_results(request, job_id):
+    job = get_object_or_404(ScanJob, pk=job_id)
+    if job.status != ScanJob.DONE:
+        return JsonResponse({"error": f"Job is {job.status}", **jobs.job_payload(job)}, status=409)
+    writer = csv.writer(_Echo())
+    rows = job.results.order_by("position").values_list("position", "item", "score", "label", "detail")
+
+    def lines():
+        yield writer.writerow(["position", "item", "score", "label", "detail"])
+        for position, item, score, label, detail in rows.iterator(chunk_size=2000):
+            yield writer.writerow([position, item, "" if score is None else score, label,
+                                   "" if detail is None else json.dumps(detail)])
+
+    response = StreamingHttpResponse(lines(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{job.kind}-scan-{job.id}.csv"'
+    return response
+
+# Readiness probe: which models are loaded (and how long that took); 503 until every
+# FRAUDLENS_MODELS['WARM_UP'] model is, so a load balancer holds traffic back meanwhile
+@instrumented("readiness")
+def readiness(request):
+    ready, models = registry.readiness()
+    return JsonResponse({"ready": ready, "models": models}, status=200 if ready else 503)
+
+# Prometheus text format: request, probe and model latency histograms plus counters
+def metrics_endpoint(request):
+    if not metrics.ENABLED:
+        raise Http404("Metrics are disabled (FRAUDLENS_METRICS['ENABLED'])")
+    return HttpResponse(metrics.expose(), content_type=metrics.CONTENT_TYPE)
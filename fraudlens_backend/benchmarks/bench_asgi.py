@@ -0,0 +1,66 @@
+"""Concurrent trust scans: sync view on a WSGI-style thread pool vs. the async view on one ASGI event loop.
+
+Every request uses a distinct URL (no cache hits) and each stub probe takes --latency-ms.
+Run from fraudlens_backend/:  python -m benchmarks.bench_asgi
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import setup_django, summarize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300, help="Concurrent scans to fire")
+    parser.add_argument("--wsgi-threads", type=int, default=16, help="Threads of the WSGI worker")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Stub latency per HTTP/DNS probe")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.test import AsyncClient, Client
+
+    from ai_models import trust, trust_async
+    from benchmarks.stubs import StubResolver, patch_trust, stub_server_process
+
+    latency = args.latency_ms / 1000
+    results = {"aiohttp": trust_async.aiohttp is not None}
+
+    def wsgi_request(url):
+        started = time.perf_counter()
+        Client().post("/api/check-website/", {"url": url}, content_type="application/json")
+        return time.perf_counter() - started
+
+    async def asgi_request(client, url):
+        started = time.perf_counter()
+        await client.post("/api/check-website-async/", {"url": url}, content_type="application/json")
+        return time.perf_counter() - started
+
+    async def asgi_run(urls):
+        client = AsyncClient()
+        await trust_async.open_http_pool()  # as at ASGI lifespan startup: one session for the run
+        samples = await asyncio.gather(*(asgi_request(client, url) for url in urls))
+        await trust_async.close_http_pool()
+        return samples
+
+    with stub_server_process(latency=latency) as server, patch_trust(trust, server, StubResolver(latency=latency)):
+        for mode in ("wsgi", "asgi"):
+            trust.reputation_cache.clear()
+            urls = [f"http://{mode}{i}.example.com/" for i in range(args.requests)]
+            started = time.perf_counter()
+            if mode == "wsgi":
+                with ThreadPoolExecutor(max_workers=args.wsgi_threads) as pool:
+                    samples = list(pool.map(wsgi_request, urls))
+            else:
+                samples = asyncio.run(asgi_run(urls))
+            elapsed = time.perf_counter() - started
+            results[mode] = {"seconds": round(elapsed, 3), "requests_per_sec": round(len(urls) / elapsed, 1),
+                             **summarize(samples)}
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
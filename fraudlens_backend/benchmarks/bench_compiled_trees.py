@@ -0,0 +1,100 @@
+"""Compiled (array-backed) tree inference vs. the native XGBoost/LightGBM predictors:
+bit-for-bit agreement, single-row p50/p99 latency and batch rows/sec.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_compiled_trees
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ai_models import compiled_trees, transactionFraud, trust
+from benchmarks.utils import summarize, timed
+
+
+def trust_rows(n):
+    rows = pd.read_csv(trust.PHISHTANK_CSV).drop(columns=["index", "Result"]).to_numpy(dtype=float)
+    # Live extract_features() rows are on a different scale than the dataset (URL length,
+    # sub-domain counts): add some so both sides of every threshold get exercised
+    live = np.random.RandomState(0).randint(-1, 120, size=(len(rows), rows.shape[1])).astype(float)
+    rows = np.vstack([rows, live])
+    return rows[:n]
+
+
+def fraud_rows(csv_path, n):
+    df = pd.read_csv(csv_path, nrows=n, dtype=transactionFraud.TRANSACTION_DTYPES)
+    matrix, _ = transactionFraud.scorer.feature_matrix(transactionFraud.prepare_transactions(df))
+    matrix[::11, 1] = np.nan  # missing values take the same branch as in LightGBM
+    return matrix
+
+
+def compare(name, native_batch, native_row, compiled, rows, single_rows):
+    native = native_batch(rows)
+    result = {
+        "trees": compiled.n_trees,
+        "nodes": compiled.n_nodes,
+        "max_depth": compiled.max_depth,
+        "rows_checked": len(rows),
+        "batch_identical": bool(np.array_equal(native, compiled.predict(rows))),
+        "row_identical": all(compiled.predict_row(row) == native[i] for i, row in enumerate(rows[:single_rows])),
+    }
+    sample = rows[:single_rows]
+    result["native_row"] = summarize([timed(native_row, row) for row in sample])
+    result["compiled_row"] = summarize([timed(compiled.predict_row, row) for row in sample])
+
+    started = time.perf_counter()
+    native_batch(rows)
+    result["native_batch_rows_per_sec"] = round(len(rows) / (time.perf_counter() - started))
+    started = time.perf_counter()
+    compiled.predict(rows)
+    result["compiled_batch_rows_per_sec"] = round(len(rows) / (time.perf_counter() - started))
+    print(f"{name}: identical={result['batch_identical'] and result['row_identical']}")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--single-rows", type=int, default=1000, help="Rows scored one at a time")
+    parser.add_argument("--transactions", default=str(transactionFraud.TRANSACTIONS_CSV))
+    args = parser.parse_args(argv)
+
+    results = {}
+
+    if trust.scorer is None:
+        results["trust_xgboost"] = {"skipped": "no trust model; run `manage.py train_models trust`"}
+    else:
+        xgb = trust.scorer.model
+        rows = trust_rows(args.rows)
+        results["trust_xgboost"] = compare(
+            "trust", lambda X: xgb.predict_proba(X)[:, 1], lambda row: xgb.predict_proba([row])[:, 1][0],
+            compiled_trees.from_xgboost(xgb), rows, args.single_rows)
+
+    # The fraud rows come from the transactions CSV, which isn't shipped with the repo
+    if transactionFraud.scorer is None:
+        results["fraud_lightgbm"] = {"skipped": "no fraud model; run `manage.py train_models fraud`"}
+    elif not os.path.exists(args.transactions):
+        results["fraud_lightgbm"] = {"skipped": f"no transactions file at {args.transactions}; pass --transactions"}
+    else:
+        booster = transactionFraud.scorer.booster
+        rows = fraud_rows(args.transactions, args.rows)
+        results["fraud_lightgbm"] = compare(
+            "fraud", booster.predict, lambda row: booster.predict(row.reshape(1, -1))[0],
+            compiled_trees.from_lightgbm(booster), rows, args.single_rows)
+        # predict_fraud() used to hand LightGBM a one-row DataFrame
+        frames = [pd.DataFrame(row.reshape(1, -1), columns=transactionFraud.scorer.feature_columns)
+                  for row in rows[:args.single_rows]]
+        results["fraud_lightgbm"]["native_dataframe_row"] = summarize([timed(booster.predict, f) for f in frames])
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name}: skipped ({result['skipped']})")
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
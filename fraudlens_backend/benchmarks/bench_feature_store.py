@@ -0,0 +1,62 @@
+"""Startup cost of the transaction scripts: parsing transactions.csv (read_csv + dayfirst
+dates + LabelEncoder fits, as the scripts used to) vs. building the feature store once vs.
+loading it again (memory-mapped columns + category dictionaries). The store goes to a
+temporary directory.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_feature_store --transactions PATH
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", required=True)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    os.environ["FRAUDLENS_MATRIX_CACHE_DIR"] = tempfile.mkdtemp(prefix="fraudlens-store-")
+    import pandas as pd
+    from sklearn.preprocessing import LabelEncoder
+
+    from ai_models import feature_store
+    from ai_models.training import StageTimer
+
+    def parse_csv():
+        df = pd.read_csv(args.transactions)
+        df["Transaction_Date"] = pd.to_datetime(df["Transaction_Date"], dayfirst=True, errors='coerce')
+        df["Transaction_Day"] = df["Transaction_Date"].dt.dayofweek
+        for col in df.select_dtypes(include=["object", "string"]).columns:
+            df[col] = LabelEncoder().fit_transform(df[col])
+        return df
+
+    def best_of(fn):
+        times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        return round(min(times), 3)
+
+    timer = StageTimer()
+    started = time.perf_counter()
+    df = feature_store.transactions(args.transactions, timer)
+    build_seconds = time.perf_counter() - started
+
+    results = {
+        "rows": len(df),
+        "parse_csv_and_label_encode_seconds": best_of(parse_csv),
+        "store_build_seconds": round(build_seconds, 3),
+        "store_build_stages": timer.stages,
+        "store_load_seconds": best_of(lambda: feature_store.transactions(args.transactions)),
+    }
+    results["speedup"] = round(results["parse_csv_and_label_encode_seconds"] / results["store_load_seconds"], 1)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
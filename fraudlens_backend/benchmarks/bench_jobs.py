@@ -0,0 +1,117 @@
+"""Bulk scan jobs (api.jobs) against a throwaway SQLite file database: result rows written
+per-row with create() (one autocommitted INSERT each) vs. bulk_create() in one transaction
+per chunk, then a whole transactions job (read, score, insert, progress) at a few chunk
+sizes, next to scoring the same file without writing anything.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_jobs [--csv transactions.csv]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from ai_models import artifacts
+
+artifacts.AUTO_TRAIN = False
+from benchmarks.utils import setup_django  # noqa: E402
+
+setup_django(database=False)  # times writes to its own database file, created in main()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from ai_models import transactionFraud  # noqa: E402
+from api import jobs  # noqa: E402
+from api.models import ScanJob, ScanJobResult  # noqa: E402
+
+DEFAULT_CSV = Path(__file__).resolve().parent.parent / "ai_models" / "transactions.csv"
+
+
+def rows_per_sec(rows, seconds):
+    return round(rows / max(seconds, 1e-9), 1)
+
+
+def result_rows(n):
+    return [(f"T{i}", 0.5, "Legitimate", None) for i in range(n)]
+
+
+def write_per_row(rows):
+    job = ScanJob.objects.create(kind=ScanJob.TRANSACTIONS, input_path="-")
+    started = time.perf_counter()
+    for position, (item, score, label, detail) in enumerate(rows):
+        ScanJobResult.objects.create(job=job, position=position, item=item, score=score, label=label, detail=detail)
+        ScanJob.objects.filter(pk=job.pk).update(processed=position + 1)
+    return time.perf_counter() - started
+
+
+def write_bulk(rows, chunk_size):
+    job = ScanJob.objects.create(kind=ScanJob.TRANSACTIONS, input_path="-")
+    started = time.perf_counter()
+    for start in range(0, len(rows), chunk_size):
+        jobs.write_results(job, start, rows[start:start + chunk_size], jobs.job_settings()["INSERT_BATCH_SIZE"])
+    return time.perf_counter() - started
+
+
+def run_transactions_job(csv_path, workdir, chunk_size):
+    source = Path(workdir) / f"input-{chunk_size}.csv"
+    shutil.copyfile(csv_path, source)  # a finished job deletes its input
+    job = ScanJob.objects.create(kind=ScanJob.TRANSACTIONS, input_path=str(source))
+    started = time.perf_counter()
+    with override_settings(FRAUDLENS_JOBS={**getattr(settings, "FRAUDLENS_JOBS", {}), "CHUNK_SIZE": chunk_size}):
+        jobs.run_job(job.pk)
+    elapsed = time.perf_counter() - started
+    job.refresh_from_db()
+    assert job.status == ScanJob.DONE, job.error
+    return job.processed, elapsed
+
+
+def score_only(csv_path, chunk_size):
+    started, rows = time.perf_counter(), 0
+    for chunk in transactionFraud.read_transaction_chunks(csv_path, chunk_size):
+        transactionFraud.predict_fraud_batch(transactionFraud.prepare_transactions(chunk))
+        rows += len(chunk)
+    return rows, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--csv", default=str(DEFAULT_CSV), help="Transactions CSV to scan")
+    parser.add_argument("--rows", type=int, default=20000, help="Result rows written by the insert comparison")
+    parser.add_argument("--per-row-rows", type=int, default=2000, help="Rows written one by one (slow)")
+    parser.add_argument("--chunk-sizes", default="100,1000,5000")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="bench-jobs-")
+    database_name = connection.settings_dict["NAME"]
+    connection.settings_dict["TEST"]["NAME"] = os.path.join(workdir, "bench.sqlite3")
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        chunk_sizes = [int(size) for size in args.chunk_sizes.split(",")]
+        per_row = write_per_row(result_rows(args.per_row_rows))
+        inserts = {"per_row_create_rows_per_sec": rows_per_sec(args.per_row_rows, per_row)}
+        for size in chunk_sizes:
+            inserts[f"bulk_create_chunk_{size}_rows_per_sec"] = rows_per_sec(args.rows, write_bulk(result_rows(args.rows), size))
+
+        results = {"inserts": inserts}
+        if transactionFraud.scorer is not None and os.path.exists(args.csv):
+            rows, seconds = score_only(args.csv, max(chunk_sizes))
+            job_runs = {"score_only_rows_per_sec": rows_per_sec(rows, seconds), "rows": rows}
+            for size in chunk_sizes:
+                rows, seconds = run_transactions_job(args.csv, workdir, size)
+                job_runs[f"job_chunk_{size}_rows_per_sec"] = rows_per_sec(rows, seconds)
+            results["transactions_job"] = job_runs
+        else:
+            results["transactions_job"] = "skipped (no fraud model or CSV)"
+    finally:
+        connection.creation.destroy_test_db(database_name, verbosity=0)
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Cost of the /metrics instrumentation: per-call overhead of a timed function, a timer
+block and model_call() with metrics enabled vs. disabled, next to a real single-row model
+call for scale, and the time to render the exposition text.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_metrics
+"""
+import argparse
+import json
+import time
+
+from ai_models import artifacts
+
+artifacts.AUTO_TRAIN = False
+
+from ai_models import metrics, smsScam  # noqa: E402
+
+
+def per_call_us(fn, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return round((time.perf_counter() - started) / calls * 1e6, 3)
+
+
+def overheads(calls):
+    histogram = metrics.histogram("bench_seconds", "Benchmark timings.", ["name"])
+
+    def noop():
+        return None
+
+    decorated = histogram.time(name="decorated")(noop)
+
+    def timer_block():
+        with histogram.time(name="block"):
+            pass
+
+    def model_block():
+        with metrics.model_call("bench"):
+            pass
+
+    return {
+        "plain_call_us": per_call_us(noop, calls),
+        "decorated_call_us": per_call_us(decorated, calls),
+        "timer_block_us": per_call_us(timer_block, calls),
+        "model_call_block_us": per_call_us(model_block, calls),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    results = {"enabled": overheads(args.calls)}
+    metrics.ENABLED = False
+    results["disabled"] = overheads(args.calls)
+    metrics.ENABLED = True
+
+    if smsScam.scorer is not None:
+        results["sms_predict_spam_proba_us"] = per_call_us(lambda: smsScam.predict_spam_proba(["free prize call now"]), 2000)
+
+    # A scrape with every probe, model and view series populated
+    histogram = metrics.histogram("bench_scrape_seconds", "Benchmark timings.", ["view", "status"])
+    for i in range(40):
+        histogram.observe(i / 1000, view=f"view_{i}", status="200")
+    results["expose_ms"] = round(per_call_us(metrics.expose, 200) / 1000, 3)
+    results["expose_bytes"] = len(metrics.expose())
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Throughput vs. added latency of the micro-batcher under synthetic concurrent load.
+
+Each of --threads closed-loop clients scores one row at a time (an SMS message, a
+lexical trust row, a full trust feature row) through the module's batcher, for every
+batcher setting below. "disabled" is one predict call per request, as before.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_microbatch
+"""
+import argparse
+import json
+import threading
+import time
+
+from ai_models import artifacts
+
+artifacts.AUTO_TRAIN = False
+
+from ai_models import smsScam, trust  # noqa: E402
+from benchmarks.bench_sms import load_messages  # noqa: E402
+from benchmarks.utils import summarize  # noqa: E402
+
+SETTINGS = {
+    "disabled": {"enabled": False},
+    "wait_0ms": {"enabled": True, "max_wait_ms": 0},
+    "wait_1ms": {"enabled": True, "max_wait_ms": 1},
+    "wait_5ms": {"enabled": True, "max_wait_ms": 5},
+}
+
+
+def urls(n):
+    hosts = ["example.com", "secure-login.example-bank.com", "192.168.10.4", "shop.example.org"]
+    return [f"http://{hosts[i % len(hosts)]}/path/{i}?q={i}" for i in range(n)]
+
+
+def load(call, items, threads, seconds):
+    """Closed-loop load; returns per-request latencies and requests/sec."""
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+    stop = time.perf_counter() + seconds + 0.05
+
+    def client(index):
+        samples = latencies[index]
+        barrier.wait()
+        i = index
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            call(items[i % len(items)])
+            samples.append(time.perf_counter() - started)
+            i += threads
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    samples = [sample for samples in latencies for sample in samples]
+    return samples, len(samples) / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=2.0, help="Load duration per setting")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    if smsScam.scorer is None or trust.scorer is None:
+        raise SystemExit("No model artifacts. Run `python manage.py train_models` first.")
+
+    sample_urls = urls(512)
+    feature_rows = [trust.build_features(url, trust.urlparse(url).netloc,
+                                         {"ip": 1, "ssl": 1, "dns": 1, "index": 1, "traffic": 1}) for url in sample_urls]
+    workloads = {
+        "sms": (smsScam.spam_batcher, load_messages(2000)),
+        "trust_lexical": (trust.lexical_batcher, sample_urls),
+        "trust_full_model": (trust.trust_batcher, feature_rows),
+    }
+
+    results = {}
+    for name, (batcher, items) in workloads.items():
+        batcher.max_batch_size = args.max_batch_size
+        results[name] = {}
+        for threads in args.threads:
+            runs = {}
+            for setting, knobs in SETTINGS.items():
+                for knob, value in knobs.items():
+                    setattr(batcher, knob, value)
+                batcher.batches = batcher.rows = 0
+                samples, throughput = load(batcher.submit, items, threads, args.seconds)
+                runs[setting] = {**summarize(samples), "requests_per_sec": round(throughput),
+                                 "mean_batch_size": batcher.stats()["mean_batch_size"]}
+            baseline = runs["disabled"]
+            for run in runs.values():
+                run["added_p50_ms"] = round(run["p50_ms"] - baseline["p50_ms"], 3)
+                run["throughput_x"] = round(run["requests_per_sec"] / max(baseline["requests_per_sec"], 1), 2)
+            results[name][f"threads_{threads}"] = runs
+        batcher.enabled, batcher.max_wait_ms = True, 0
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
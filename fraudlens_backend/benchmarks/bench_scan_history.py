@@ -0,0 +1,105 @@
+"""Request latency with the scan history on: concurrent clients hammer /api/check-sms/ (result
+cache hits, so the request itself is cheap and any write cost would show) with the history
+disabled, buffered (api.scan_history, the default) and written inline per request (one
+INSERT in the request, what the buffer avoids). Runs against a throwaway SQLite file
+database and checks that every buffered verdict was written.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_scan_history [--threads 8 --requests 300]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from ai_models import artifacts
+
+artifacts.AUTO_TRAIN = False
+from benchmarks.utils import setup_django, summarize  # noqa: E402
+
+setup_django(database=False)  # times writes to its own database file, created in main()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from ai_models import smsScam  # noqa: E402
+from api.models import ScanRecord  # noqa: E402
+from api.scan_history import history  # noqa: E402
+
+MESSAGES = [f"Congratulations! You won prize number {i}, call now" for i in range(50)]
+
+
+def hammer(threads, requests):
+    """(latencies, errors, seconds) of `threads` clients sending `requests` requests each."""
+    latencies, errors, lock = [], [0], threading.Lock()
+
+    def client_loop(offset):
+        client, mine, failed = Client(), [], 0
+        for i in range(requests):
+            started = time.perf_counter()
+            response = client.post("/api/check-sms/", {"sms_text": MESSAGES[(offset + i) % len(MESSAGES)]},
+                                   content_type="application/json")
+            mine.append(time.perf_counter() - started)
+            failed += response.status_code != 200
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+        connection.close()
+
+    workers = [threading.Thread(target=client_loop, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, errors[0], time.perf_counter() - started
+
+
+def run(mode, threads, requests):
+    record = history.record
+    history.enabled = mode != "off"
+    if mode == "inline":
+        history.record = history.write
+    before = ScanRecord.objects.count()
+    try:
+        latencies, errors, seconds = hammer(threads, requests)
+    finally:
+        history.record = record
+    history.flush()
+    result = {**summarize(latencies), "qps": round(len(latencies) / seconds, 1), "errors": errors}
+    if mode != "off":
+        result["rows_written"] = ScanRecord.objects.count() - before
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per thread")
+    args = parser.parse_args(argv)
+
+    if smsScam.scorer is None:
+        print(json.dumps({"skipped": "no SMS model; run `manage.py train_models sms`"}))
+        return None
+
+    workdir = tempfile.mkdtemp(prefix="bench-history-")
+    database_name = connection.settings_dict["NAME"]
+    connection.settings_dict["TEST"]["NAME"] = os.path.join(workdir, "bench.sqlite3")
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        history.enabled = False
+        hammer(1, len(MESSAGES))  # fill the result cache
+        results = {mode: run(mode, args.threads, args.requests) for mode in ("off", "buffered", "inline")}
+        results["requests"] = args.threads * args.requests
+        results["buffered_p99_overhead_ms"] = round(results["buffered"]["p99_ms"] - results["off"]["p99_ms"], 3)
+    finally:
+        connection.creation.destroy_test_db(database_name, verbosity=0)
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Memory held by the slim scorer objects vs. the training state the model modules used
+to keep as module globals (df, X, the train/test splits, SMOTE output, ...).
+
+The training state is the set of locals of each train_model() at the moment it returns,
+which are exactly the objects the old module-level training code left behind. Sizes come
+from tracemalloc (NumPy and pandas buffers included; memory held inside the XGBoost and
+LightGBM C++ libraries is not traced, and is the same on both sides).
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_scorer_memory
+"""
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+
+from ai_models import artifacts
+
+artifacts.AUTO_TRAIN = False  # measure loading, never train at import
+
+from ai_models import smsScam, transactionFraud, trust  # noqa: E402
+
+
+def traced(fn, *args):
+    """Call fn and return (result, MB still allocated once it returned)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, round((after - before) / 2 ** 20, 2)
+
+
+def training_state(train, *args):
+    """Run a train_model() and keep all of its locals alive, like module globals would."""
+    state = {}
+
+    def keep_locals(frame, event, arg):
+        if event == "return" and frame.f_code is train.__code__:
+            state.update(frame.f_locals)
+
+    sys.setprofile(keep_locals)
+    try:
+        train(*args)
+    finally:
+        sys.setprofile(None)
+    return state
+
+
+def measure(name, scorer_cls, train, *train_args):
+    scorer, scorer_mb = traced(scorer_cls.load)
+    if scorer is None:
+        raise SystemExit(f"No {name} artifact. Run `python manage.py train_models` first.")
+    state, state_mb = traced(training_state, train, *train_args)
+    print(f"{name}: scorer {scorer_mb} MB vs training state {state_mb} MB", file=sys.stderr)
+    return {
+        "scorer_mb": scorer_mb,
+        "scorer_slots": list(scorer_cls.__slots__),
+        "training_state_mb": state_mb,
+        "training_state_variables": sorted(state),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", default=str(transactionFraud.TRANSACTIONS_CSV))
+    args = parser.parse_args(argv)
+
+    results = {
+        "trust": measure("trust", trust.TrustScorer, trust.train_model),
+        "sms": measure("sms", smsScam.SpamScorer, smsScam.train_model),
+        "fraud": measure("fraud", transactionFraud.FraudScorer, transactionFraud.train_model, args.transactions),
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""N concurrent identical /api/check-website/ requests against the local stub server:
+with single-flight coalescing they cause exactly one set of probes (one TLS, Google and
+Alexa request and two DNS lookups) in both the threaded WSGI view and the ASGI view.
+Without it (trust._run_trust called directly) every request probes on its own.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_singleflight
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import setup_django
+
+ONE_PROBE_SET = {"ssl": 1, "index": 1, "traffic": 1, "dns": 2}
+
+
+def probe_counts(server, resolver):
+    return {"ssl": server.hits["ssl"], "index": server.hits["index"], "traffic": server.hits["traffic"],
+            "dns": sum(resolver.calls.values())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50, help="Concurrent identical requests")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Stub latency per HTTP/DNS probe")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.test import AsyncClient, Client
+
+    from ai_models import trust, trust_async
+    from api import views
+    from benchmarks.stubs import StubResolver, StubServer, patch_trust
+
+    latency = args.latency_ms / 1000
+    n = args.requests
+    results = {}
+
+    def run(name, url, fire):
+        trust.reputation_cache.clear()
+        views.result_cache.reset_stats()
+        with StubServer(latency=latency) as server:
+            resolver = StubResolver(latency=latency)
+            with patch_trust(trust, server, resolver):
+                responses = fire(url)
+            counts = probe_counts(server, resolver)
+        results[name] = {
+            "requests": n,
+            "probes": counts,
+            "one_probe_set": counts == ONE_PROBE_SET,
+            "identical_responses": all(response == responses[0] for response in responses),
+        }
+
+    def threaded(call):
+        barrier = threading.Barrier(n)
+
+        def worker(url):
+            barrier.wait()  # release all requests at once
+            return call(url)
+
+        def fire(url):
+            with ThreadPoolExecutor(max_workers=n) as pool:
+                return list(pool.map(worker, [url] * n))
+        return fire
+
+    def wsgi_request(url):
+        return Client().post("/api/check-website/", {"url": url}, content_type="application/json").json()
+
+    async def asgi_requests(url):
+        client = AsyncClient()
+        await trust_async.open_http_pool()  # as at ASGI lifespan startup: one session for the run
+        responses = await asyncio.gather(*(
+            client.post("/api/check-website-async/", {"url": url}, content_type="application/json")
+            for _ in range(n)))
+        await trust_async.close_http_pool()
+        return [response.json() for response in responses]
+
+    run("without_coalescing", "http://campaign-direct.example.com/login", threaded(lambda url: trust._run_trust(url, "full")))
+    run("wsgi", "http://campaign-wsgi.example.com/login", threaded(wsgi_request))
+    run("asgi", "http://campaign-asgi.example.com/login", lambda url: asyncio.run(asgi_requests(url)))
+    results["single_flight"] = trust.inflight.stats()
+    results["single_flight_async"] = trust_async.inflight.stats()
+
+    print(json.dumps(results, indent=2))
+    if not (results["wsgi"]["one_probe_set"] and results["asgi"]["one_probe_set"]):
+        sys.exit("identical concurrent requests were not coalesced into one probe set")
+    return results
+
+
+if __name__ == "__main__":
+    main()
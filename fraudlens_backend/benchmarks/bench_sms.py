@@ -0,0 +1,71 @@
+"""Messages/sec of the SMS classifier (one predict_spam() per message vs. one batched call),
+clean_text() normalizer speed, and TF-IDF vs. feature-hashing accuracy.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_sms
+"""
+import argparse
+import json
+import re
+import string
+import time
+
+import pandas as pd
+
+from ai_models import smsScam
+
+
+def load_messages(n):
+    messages = pd.read_csv(smsScam.SPAM_CSV, encoding="latin-1").iloc[:, 1].astype(str).tolist()
+    return (messages * (n // len(messages) + 1))[:n]
+
+
+def original_clean_text(text):
+    # Reference: the normalizer before the tables were precompiled
+    text = text.lower()
+    text = re.sub(r'\d+', '', text)
+    text = text.translate(str.maketrans("", "", string.punctuation))
+    return text.strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    messages = load_messages(args.messages)
+    results = {}
+
+    started = time.perf_counter()
+    for message in messages:
+        smsScam.predict_spam(message)
+    elapsed = time.perf_counter() - started
+    results["single"] = {"seconds": round(elapsed, 3), "messages_per_sec": round(len(messages) / elapsed)}
+
+    started = time.perf_counter()
+    smsScam.predict_spam_batch(messages)
+    elapsed = time.perf_counter() - started
+    results["batch"] = {"seconds": round(elapsed, 3), "messages_per_sec": round(len(messages) / elapsed)}
+
+    timings = {}
+    for name, clean in [("original_per_message", lambda texts: [original_clean_text(t) for t in texts]),
+                        ("clean_text_per_message", lambda texts: [smsScam.clean_text(t) for t in texts]),
+                        ("clean_texts_batch", smsScam.clean_texts)]:
+        started = time.perf_counter()
+        cleaned = clean(messages)
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+        assert cleaned == [original_clean_text(t) for t in messages]
+    results["clean_text_ms"] = timings
+
+    results["accuracy"] = {}
+    for kind in ("tfidf", "hashing"):
+        started = time.perf_counter()
+        _, _, metrics = smsScam.train_model(vectorizer_kind=kind)
+        results["accuracy"][kind] = {"accuracy": round(metrics["accuracy"], 4),
+                                     "train_seconds": round(time.perf_counter() - started, 3)}
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
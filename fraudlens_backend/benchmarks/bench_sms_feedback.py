@@ -0,0 +1,100 @@
+"""Absorbing reported SMS messages: incremental learning vs. a full retrain.
+
+A synthetic spam campaign (plus some ham) is reported one message at a time: each report is
+appended to a temporary feedback store and learned with partial_fit. The same reports are
+then folded into a full retrain, as `manage.py compact_sms_feedback` does. Both models are
+scored on the spam.csv test split and on unseen messages of the same campaign.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_sms_feedback
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from ai_models import artifacts
+
+artifacts.AUTO_TRAIN = False
+
+from ai_models import smsScam  # noqa: E402
+from ai_models.feedback_store import FeedbackStore  # noqa: E402
+from benchmarks.utils import summarize  # noqa: E402
+
+SPAM_TEMPLATES = [
+    "your parcel {code} is held at customs pay the {fee} release fee at {site}",
+    "final notice toll charge unpaid settle {fee} today at {site} ref {code}",
+    "{site} security alert your wallet {code} was locked verify now",
+]
+HAM_TEMPLATES = [
+    "running late, see you at {place} around {hour}",
+    "can you grab {item} on the way home",
+    "thanks for dinner at {place} yesterday",
+]
+
+
+def campaign(n, seed):
+    rng = random.Random(seed)
+    words = lambda k: "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(k))
+    messages = []
+    for i in range(n):
+        if i % 4 == 3:
+            text = rng.choice(HAM_TEMPLATES).format(place=words(6), hour=rng.choice(["six", "seven", "noon"]),
+                                                    item=rng.choice(["milk", "bread", "the charger"]))
+            messages.append({"text": text, "label": "ham"})
+        else:
+            text = rng.choice(SPAM_TEMPLATES).format(code=words(8), fee=rng.choice(["small", "one time", "late"]),
+                                                     site=words(7) + "-delivery")
+            messages.append({"text": text, "label": "spam"})
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    reports = campaign(args.reports, seed=1)
+    unseen = campaign(400, seed=2)
+    unseen_texts = [r["text"] for r in unseen]
+    unseen_labels = [smsScam.LABELS[r["label"]] for r in unseen]
+    holdout = smsScam.holdout_set()
+
+    vectorizer, model, _ = smsScam.train_model(vectorizer_kind="hashing")
+    incremental = smsScam.SpamScorer(vectorizer, model, version="bench")
+    before = {"spam_csv_test": incremental.accuracy(*holdout),
+              "campaign_unseen": incremental.accuracy(unseen_texts, unseen_labels)}
+
+    latencies = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeedbackStore(Path(tmp) / "sms.jsonl")
+        for report in reports:
+            started = time.perf_counter()
+            store.append(report["text"], report["label"])
+            incremental.catch_up(store)
+            latencies.append(time.perf_counter() - started)
+        stored_records = len(store.read()[0])
+
+    started = time.perf_counter()
+    vectorizer, model, _ = smsScam.train_model(vectorizer_kind="hashing", feedback=reports)
+    retrain_seconds = time.perf_counter() - started
+    retrained = smsScam.SpamScorer(vectorizer, model)
+
+    results = {
+        "reports": len(reports),
+        "stored_records": stored_records,
+        "report_latency": summarize(latencies),
+        "full_retrain_seconds": round(retrain_seconds, 3),
+        "accuracy_before_reports": {k: round(v, 4) for k, v in before.items()},
+        "accuracy_incremental": {"spam_csv_test": round(incremental.accuracy(*holdout), 4),
+                                 "campaign_unseen": round(incremental.accuracy(unseen_texts, unseen_labels), 4)},
+        "accuracy_retrained": {"spam_csv_test": round(retrained.accuracy(*holdout), 4),
+                               "campaign_unseen": round(retrained.accuracy(unseen_texts, unseen_labels), 4)},
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
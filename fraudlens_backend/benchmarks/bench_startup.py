@@ -0,0 +1,91 @@
+"""Django startup cost, from `python -X importtime`: total import time of `manage.py check`
+(what migrate, shell and every other management command pay before doing anything), the
+slowest top-level imports, and which ML libraries got imported at all. Also the wall time
+of a fresh process answering its first /api/ready/ request, and of its first scoring request.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_startup
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "xgboost", "lightgbm", "requests", "joblib")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+FIRST_REQUEST = """
+import time
+started = time.perf_counter()
+from benchmarks.utils import setup_django
+setup_django()
+from django.test import Client
+client = Client()
+status = client.get("/api/ready/").status_code
+ready = time.perf_counter() - started
+client.post("/api/check-sms/", {"sms_text": "free prize, call now"}, content_type="application/json")
+print(ready, time.perf_counter() - started, status)
+"""
+
+
+def importtime(args, env):
+    """(total seconds, {top-level package: cumulative seconds}, imported packages, wall seconds)"""
+    started = time.perf_counter()
+    stderr = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stderr
+    wall = time.perf_counter() - started
+    total, top_level, imported = 0, {}, set()
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        total += int(self_us)
+        imported.add(name.split(".")[0])
+        if len(indent) <= 1:  # not imported by another import
+            top = name.split(".")[0]
+            top_level[top] = top_level.get(top, 0) + int(cumulative_us) / 1e6
+    return total / 1e6, top_level, imported, wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, FRAUDLENS_AUTO_TRAIN="0")
+    env.setdefault("DJANGO_SETTINGS_MODULE", "fraudlens_backend.settings")
+    runs = [importtime(["manage.py", "check"], env) for _ in range(args.repeat)]
+    total, top_level, imported, _ = min(runs, key=lambda run: run[0])
+    slowest = sorted(top_level.items(), key=lambda item: -item[1])[:args.top]
+
+    first = []
+    for _ in range(args.repeat):
+        out = subprocess.run([sys.executable, "-c", FIRST_REQUEST], cwd=BACKEND_DIR, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        ready, scored, status = out.split()[-3:]
+        first.append((float(ready), float(scored), int(status)))
+    ready, scored, status = min(first)
+
+    results = {
+        "manage_py_check": {
+            "import_seconds": round(total, 3),
+            "wall_seconds": round(min(run[3] for run in runs), 3),
+            "ml_libraries_imported": sorted(name for name in HEAVY_MODULES if name in imported),
+            "slowest_imports": {name: round(seconds, 3) for name, seconds in slowest},
+        },
+        "first_ready_request_seconds": round(ready, 3),
+        "first_ready_status": status,
+        "first_scoring_request_seconds": round(scored, 3),
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
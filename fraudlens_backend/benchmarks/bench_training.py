@@ -0,0 +1,56 @@
+"""Wall time of the training pipeline: sequential vs. one process per model, and cold vs.
+warm feature-matrix cache, with the per-stage breakdown of every run. Artifacts and
+cached matrices go to a temporary directory.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_training --transactions PATH
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", help="transactions.csv for the fraud model (skipped when absent)")
+    parser.add_argument("--processes", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None, help="Threads per job (default: library default)")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="fraudlens-training-")
+    # Before ai_models is imported, here and in the spawned job processes
+    os.environ["FRAUDLENS_ARTIFACTS_DIR"] = os.path.join(tmp, "artifacts")
+    os.environ["FRAUDLENS_MATRIX_CACHE_DIR"] = os.path.join(tmp, "cache")
+    os.environ["FRAUDLENS_AUTO_TRAIN"] = "0"
+    from ai_models import training
+
+    names = ["trust", "sms"] + (["fraud"] if args.transactions else [])
+    options = {"transactions": args.transactions}
+    threads = {name: args.threads for name in names} if args.threads else {}
+
+    def run(processes, use_cache):
+        started = time.perf_counter()
+        results = dict(training.run_jobs(names, processes, threads, use_cache, options))
+        for name, result in results.items():
+            if isinstance(result, Exception):
+                raise SystemExit(f"{name} failed: {result}")
+        return {
+            "seconds": round(time.perf_counter() - started, 3),
+            "models": {name: {"seconds": r["seconds"], "stages": r["stages"], "cache": r["cache"],
+                              "accuracy": r["metrics"]["accuracy"]} for name, r in results.items()},
+        }
+
+    results = {
+        "cpus": os.cpu_count(),
+        "sequential_cold_cache": run(1, True),
+        "sequential_warm_cache": run(1, True),
+        "sequential_no_cache": run(1, False),
+        f"processes_{args.processes}_warm_cache": run(args.processes, True),
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""p50/p99 latency of trust.run_trust against local stub HTTP/DNS servers.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_trust
+"""
+import argparse
+import json
+from urllib.parse import urlparse
+
+from ai_models import trust
+from benchmarks.stubs import StubResolver, StubServer, patch_trust
+from benchmarks.utils import summarize, timed
+
+
+def sequential_extract_features(url):
+    # Reference for the old behaviour: all 18 network probes, one after another
+    domain = urlparse(url).netloc
+    calls = ([(trust.check_ip_address, url)] + [(trust.check_ssl_state, domain)] * 2
+             + [(trust.check_dns_record, domain)] * 3 + [(trust.check_web_traffic, domain)] * 2
+             + [(trust.check_google_index, url)] * 11)
+    for probe, arg in calls:
+        probe(arg)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20, help="Stub latency per HTTP/DNS probe")
+    parser.add_argument("--slow-every", type=int, default=0,
+                        help="Every Nth URL hangs past the deadline (exercises the partial-result fallback)")
+    args = parser.parse_args(argv)
+
+    urls = [f"http://site{i}.example.com/login" for i in range(args.requests)]
+    if args.slow_every:
+        urls = [u.replace("site", "slowsite") if i % args.slow_every == 0 else u for i, u in enumerate(urls)]
+
+    latency = args.latency_ms / 1000
+    results = {}
+    with StubServer(latency=latency, slow_latency=trust.REQUEST_DEADLINE * 2) as server:
+        with patch_trust(trust, server, StubResolver(latency=latency)):
+            fast_urls = [u for u in urls if "slow" not in u][:10]
+            results["sequential_probes"] = summarize([timed(sequential_extract_features, u) for u in fast_urls])
+            trust.reputation_cache.clear()
+            results["run_trust"] = summarize([timed(trust.run_trust, u) for u in urls])
+            # Same URLs again: every probe result now comes from the reputation cache
+            results["run_trust_cached"] = summarize([timed(trust.run_trust, u) for u in urls])
+            results["reputation_cache"] = trust.reputation_cache.stats()
+            trust.reputation_cache.clear()
+            # Every 4th host looks like a typosquat, which the lexical model is unsure about
+            urls = [u.replace("site", "secure-login") if i % 4 == 0 else u for i, u in enumerate(urls)]
+            results["run_trust_offline"] = summarize([timed(trust.run_trust, u, "offline") for u in urls])
+            results["run_trust_tiered"] = summarize([timed(trust.run_trust, u, "tiered") for u in urls])
+            tiered = [trust.run_trust(u, "tiered") for u in urls]
+            results["tiered_escalation_rate"] = sum(r["scoring"] == "full" for r in tiered) / len(tiered)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
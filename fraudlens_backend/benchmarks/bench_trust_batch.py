@@ -0,0 +1,51 @@
+"""Throughput (URLs/sec) of POST /api/check-websites/ vs. one POST /api/check-website/ per URL.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_trust_batch
+"""
+import argparse
+import json
+import time
+
+from benchmarks.utils import setup_django
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--urls", type=int, default=200)
+    parser.add_argument("--domains", type=int, default=20, help="Distinct domains among the URLs")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Stub latency per HTTP/DNS probe")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.test import Client
+
+    from ai_models import trust
+    from benchmarks.stubs import StubResolver, StubServer, patch_trust
+
+    urls = [f"http://site{i % args.domains}.example.com/page/{i}" for i in range(args.urls)]
+    client = Client()
+    latency = args.latency_ms / 1000
+    results = {}
+    with StubServer(latency=latency) as server, patch_trust(trust, server, StubResolver(latency=latency)):
+        trust.reputation_cache.clear()
+        started = time.perf_counter()
+        for url in urls:
+            client.post("/api/check-website/", {"url": url}, content_type="application/json")
+        elapsed = time.perf_counter() - started
+        results["single"] = {"seconds": round(elapsed, 3), "urls_per_sec": round(len(urls) / elapsed, 1),
+                             "http_probes": sum(server.hits.values())}
+
+        trust.reputation_cache.clear()
+        server.hits.clear()
+        started = time.perf_counter()
+        response = client.post("/api/check-websites/", {"urls": urls}, content_type="application/json")
+        elapsed = time.perf_counter() - started
+        assert len(response.json()["results"]) == len(urls)
+        results["batch"] = {"seconds": round(elapsed, 3), "urls_per_sec": round(len(urls) / elapsed, 1),
+                            "http_probes": sum(server.hits.values())}
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
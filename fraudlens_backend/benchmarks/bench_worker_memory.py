@@ -0,0 +1,115 @@
+"""Per-worker memory with models loaded in each worker vs. once in a pre-fork master.
+
+Forks --workers processes the way gunicorn does; each serves a few API requests, then
+/proc/<pid>/smaps_rollup is read. PSS splits shared pages between the processes using
+them, so the sum of PSS is what the workers really cost the host. Linux only.
+
+Run from fraudlens_backend/:  python -m benchmarks.bench_worker_memory
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.utils import setup_django
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def smaps_rollup(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in SMAPS_FIELDS:
+                values[key] = int(rest.split()[0]) // 1024  # kB -> MB
+    return {
+        "rss_mb": values["Rss"],
+        "pss_mb": values["Pss"],
+        "shared_mb": values["Shared_Clean"] + values["Shared_Dirty"],
+        "private_mb": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def serve_requests(requests_per_worker):
+    from django.test import Client
+
+    client = Client()
+    for i in range(requests_per_worker):
+        # offline trust mode keeps the network out of a memory benchmark
+        client.post("/api/check-website/", {"url": f"http://site{i}.example.com/login", "mode": "offline"},
+                    content_type="application/json")
+        client.post("/api/check-sms/", {"sms_text": f"WINNER!! Claim your prize {i} now"},
+                    content_type="application/json")
+
+
+def run_workers(preload, workers, requests_per_worker):
+    setup_django()
+    from fraudlens_backend.preload import preload_models
+
+    if preload:
+        preload_models()
+
+    ready_r, ready_w = os.pipe()
+    stop_r, stop_w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(stop_w)
+            if not preload:
+                preload_models()
+            serve_requests(requests_per_worker)
+            os.write(ready_w, b".")
+            os.read(stop_r, 1)  # stay alive until the parent has measured
+            os._exit(0)
+        pids.append(pid)
+
+    os.close(ready_w)
+    os.close(stop_r)
+    for _ in range(workers):
+        os.read(ready_r, 1)
+    report = {
+        "preload": preload,
+        "master": smaps_rollup(os.getpid()),
+        "workers": [smaps_rollup(pid) for pid in pids],
+    }
+    os.close(stop_w)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    per_worker = report["workers"]
+    report["workers_total_pss_mb"] = sum(w["pss_mb"] for w in per_worker)
+    report["host_total_pss_mb"] = report["workers_total_pss_mb"] + report["master"]["pss_mb"]
+    report["mean_worker_rss_mb"] = round(sum(w["rss_mb"] for w in per_worker) / workers)
+    report["mean_worker_private_mb"] = round(sum(w["private_mb"] for w in per_worker) / workers)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20, help="Requests served by each worker before measuring")
+    parser.add_argument("--mode", choices=["preload", "per-worker"], help="Run one mode (used internally)")
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        print(json.dumps(run_workers(args.mode == "preload", args.workers, args.requests)))
+        return
+
+    # Each mode in a fresh interpreter so neither starts with the other's imports
+    results = {}
+    for mode in ("per-worker", "preload"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_worker_memory", "--mode", mode,
+             "--workers", str(args.workers), "--requests", str(args.requests)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
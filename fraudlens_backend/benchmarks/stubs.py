@@ -0,0 +1,110 @@
+import multiprocessing
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Offline stand-ins for the network probes in ai_models.trust:
+# a local HTTP server for the TLS/Google/Alexa requests and a fake DNS resolver.
+
+
+class StubServer:
+    def __init__(self, latency=0.02, slow_latency=2.0):
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.hits = Counter()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                target = (query.get("q") or query.get("url") or [parsed.path])[0]
+                kind = parsed.path.strip("/").split("/")[0]
+                with stub._lock:
+                    stub.hits[kind] += 1
+                time.sleep(stub.slow_latency if "slow" in target else stub.latency)
+                body = b"<ALEXA><RANK>42</RANK></ALEXA>" if kind == "traffic" else b"<html>ok</html>"
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (probe timeout / deadline)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 1024  # accept bursts of concurrent probes without SYN retries
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _serve(latency, slow_latency, ready):
+    server = StubServer(latency=latency, slow_latency=slow_latency)
+    ready.put(server.base_url)
+    server.httpd.serve_forever()
+
+
+@contextmanager
+def stub_server_process(latency=0.02, slow_latency=2.0):
+    """StubServer in a child process, for load tests where hundreds of stub threads
+    would otherwise compete with the code under test for the GIL. No hit counts."""
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(latency, slow_latency, ready), daemon=True)
+    process.start()
+    try:
+        yield SimpleNamespace(base_url=ready.get(timeout=10))
+    finally:
+        process.terminate()
+        process.join()
+
+
+class StubResolver:
+    """Resolves every host to 127.0.0.1 after `latency` seconds; *.invalid hosts fail."""
+
+    def __init__(self, latency=0.01):
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, host):
+        with self._lock:
+            self.calls[host] += 1
+        time.sleep(self.latency)
+        if host.endswith(".invalid"):
+            raise socket.gaierror(f"stub resolver: {host} not found")
+        return "127.0.0.1"
+
+
+@contextmanager
+def patch_trust(trust, server, resolver):
+    """Point the trust module's probes at the stub server and resolver."""
+    saved = {name: getattr(trust, name) for name in
+             ("SSL_PROBE_URL", "GOOGLE_INDEX_URL", "WEB_TRAFFIC_URL", "resolve_host")}
+    trust.SSL_PROBE_URL = server.base_url + "/ssl/{domain}"
+    trust.GOOGLE_INDEX_URL = server.base_url + "/index?q={url}"
+    trust.WEB_TRAFFIC_URL = server.base_url + "/traffic?url={domain}"
+    trust.resolve_host = resolver  # the async probes (ai_models.trust_async) resolve through it too
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(trust, name, value)
@@ -0,0 +1,340 @@
+"""Benchmark suite for every model and endpoint, with results kept as JSON so runs on
+different commits can be compared.
+
+Groups (all by default, or pick some with --only):
+  import    wall time of importing ai_models.trust / smsScam / transactionFraud (fresh process),
+            then of loading the module's model
+  predict   single-row latency and batched rows/sec of each predict function
+  features  trust.extract_features / extract_features_batch against the local stub HTTP/DNS server
+  api       Django test-client latency and requests/sec for each api/ route (distinct payloads,
+            so no response-cache hits; website routes probe the stub server)
+
+Inputs are fixed (seeded, or taken from the bundled datasets), every timed call is warmed
+up first, and the results file records the commit, library versions and machine. Models
+come from the exported artifacts; groups needing a model that isn't exported are skipped.
+
+Run from fraudlens_backend/:  python -m benchmarks.suite [--only predict,api] [--quick]
+Compare two runs:            python -m benchmarks.suite --compare OLD.json NEW.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+IMPORT_MODULES = ("ai_models.trust", "ai_models.smsScam", "ai_models.transactionFraud")
+PACKAGES = ("numpy", "pandas", "sklearn", "scipy", "xgboost", "lightgbm", "django", "rest_framework")
+
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    versions = {}
+    for name in PACKAGES:
+        try:
+            versions[name] = __import__(name).__version__
+        except (ImportError, AttributeError):
+            versions[name] = None
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+def latency(fn, items, warmup=5):
+    """p50/p99/mean of fn(item) over items, after a few untimed calls."""
+    from benchmarks.utils import summarize
+
+    for item in items[:warmup]:
+        fn(item)
+    samples = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def throughput(fn, batches, rows_per_batch):
+    fn(batches[0])
+    started = time.perf_counter()
+    for batch in batches:
+        fn(batch)
+    elapsed = time.perf_counter() - started
+    return {"batch_size": rows_per_batch, "batches": len(batches),
+            "rows_per_sec": round(len(batches) * rows_per_batch / elapsed, 1)}
+
+
+def bench_import(args):
+    """Seconds to import each model module in a fresh interpreter, and to then load its
+    model from the exported artifact (no training)."""
+    from benchmarks.utils import summarize
+
+    env = dict(os.environ, FRAUDLENS_AUTO_TRAIN="0", PYTHONPATH=os.pathsep.join(
+        filter(None, [str(BACKEND_DIR), os.environ.get("PYTHONPATH")])))
+    code = ("import time; started = time.perf_counter(); import {module} as module; "
+            "imported = time.perf_counter(); module.scorer; "
+            "print(imported - started, time.perf_counter() - started)")
+    results = {}
+    for module in IMPORT_MODULES:
+        imports, loads = [], []
+        for _ in range(args.import_repeat):
+            out = subprocess.run([sys.executable, "-c", code.format(module=module)], cwd=BACKEND_DIR, env=env,
+                                 capture_output=True, text=True, check=True).stdout
+            imported, loaded = out.strip().splitlines()[-1].split()
+            imports.append(float(imported))
+            loads.append(float(loaded))
+        results[module] = {"import": summarize(imports), "import_and_load": summarize(loads)}
+    return results
+
+
+def trust_rows(n, rng):
+    from ai_models import trust
+
+    probes = rng.integers(0, 2, size=(n, len(trust.PROBES)))
+    urls = [f"http://site{i}.example.com/login?id={i}" for i in range(n)]
+    return urls, [trust.build_features(url, f"site{i}.example.com", dict(zip(trust.PROBES, row)))
+                  for i, (url, row) in enumerate(zip(urls, probes))]
+
+
+def fraud_rows(scorer, n, rng):
+    rows = []
+    for _ in range(n):
+        row = {col: float(rng.integers(0, 5)) for col in scorer.feature_columns}
+        row["Transaction_Amount"] = float(rng.uniform(1, 5000))
+        for col, classes in scorer.codec.classes.items():
+            row[col] = classes[rng.integers(len(classes))]
+        rows.append(row)
+    return rows
+
+
+def batches(items, size):
+    return [items[i:i + size] for i in range(0, len(items) - size + 1, size)]
+
+
+def bench_predict(args):
+    from ai_models import smsScam, transactionFraud, trust
+    from benchmarks.bench_sms import load_messages
+
+    rng = np.random.default_rng(0)
+    n, size = args.rows, args.batch_size
+    results = {}
+    if trust.scorer is not None:
+        urls, rows = trust_rows(n, rng)
+        results["trust.predict_trust_scores"] = {
+            "single": latency(lambda row: trust.predict_trust_scores([row]), rows[:args.single]),
+            "batch": throughput(trust.predict_trust_scores, batches(rows, size), size),
+        }
+        if trust.scorer.lexical_model is not None:
+            results["trust.predict_lexical_scores"] = {
+                "single": latency(lambda url: trust.predict_lexical_scores([url]), urls[:args.single]),
+                "batch": throughput(trust.predict_lexical_scores, batches(urls, size), size),
+            }
+    if smsScam.scorer is not None:
+        messages = load_messages(n)
+        results["smsScam.predict_spam"] = {"single": latency(smsScam.predict_spam, messages[:args.single])}
+        results["smsScam.predict_spam_proba"] = {
+            "batch": throughput(smsScam.predict_spam_proba, batches(messages, size), size),
+        }
+    if transactionFraud.scorer is not None:
+        rows = fraud_rows(transactionFraud.scorer, n, rng)
+        results["transactionFraud.predict_fraud"] = {"single": latency(transactionFraud.predict_fraud, rows[:args.single])}
+        results["transactionFraud.predict_fraud_batch"] = {
+            "batch": throughput(transactionFraud.predict_fraud_batch, batches(rows, size), size),
+        }
+    return results
+
+
+def bench_features(args):
+    from ai_models import trust
+    from benchmarks.stubs import StubResolver, StubServer, patch_trust
+
+    stub_latency = args.stub_latency_ms / 1000
+    urls = [f"http://features{i}.example.com/login" for i in range(args.single)]
+    with StubServer(latency=stub_latency) as server, patch_trust(trust, server, StubResolver(latency=stub_latency)):
+        trust.reputation_cache.clear()
+        results = {"stub_latency_ms": args.stub_latency_ms,
+                   "extract_features": latency(trust.extract_features, urls)}
+        trust.reputation_cache.clear()
+        batch_urls = [f"http://batch{i}.example.com/page" for i in range(args.batch_size)]
+        started = time.perf_counter()
+        trust.extract_features_batch(batch_urls)
+        elapsed = time.perf_counter() - started
+        results["extract_features_batch"] = {"urls": len(batch_urls), "seconds": round(elapsed, 3),
+                                             "urls_per_sec": round(len(batch_urls) / elapsed, 1)}
+        trust.reputation_cache.clear()
+    return results
+
+
+def bench_api(args):
+    from benchmarks.utils import setup_django, summarize
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from rest_framework.test import APIClient
+
+    from ai_models import trust
+    from benchmarks.bench_sms import load_messages
+    from benchmarks.stubs import StubResolver, StubServer, patch_trust
+
+    client = Client()
+    # report-sms takes authenticated users only, at a limited rate: an unthrottled reporter
+    reporter = APIClient()
+    reporter.force_authenticate(User(username="bench-reporter"))
+    settings.FRAUDLENS_SMS_REPORTS = {"RATE": None}
+    n = args.requests
+    messages = [f"{text} {i}" for i, text in enumerate(load_messages(n + 1))]
+    routes = {
+        "check-website": lambda i: client.post(
+            "/api/check-website/", {"url": f"http://api{i}.example.com/"}, content_type="application/json"),
+        "check-website offline": lambda i: client.post(
+            "/api/check-website/", {"url": f"http://offline{i}.example.com/", "mode": "offline"},
+            content_type="application/json"),
+        "check-website-async": lambda i: client.post(
+            "/api/check-website-async/", {"url": f"http://async{i}.example.com/"}, content_type="application/json"),
+        "check-websites": lambda i: client.post(
+            "/api/check-websites/", {"urls": [f"http://many{i}-{j}.example.com/" for j in range(10)]},
+            content_type="application/json"),
+        "detect-scam-email": lambda i: client.post(
+            "/api/detect-scam-email/", {"email_text": messages[i]}, content_type="application/json"),
+        "check-sms": lambda i: client.post(
+            "/api/check-sms/", {"sms_text": messages[i]}, content_type="application/json"),
+        "check-sms-batch": lambda i: client.post(
+            "/api/check-sms-batch/", {"messages": [f"{messages[i]} {j}" for j in range(50)]},
+            content_type="application/json"),
+        "report-sms": lambda i: reporter.post(
+            "/api/report-sms/", {"sms_text": messages[i], "label": "spam" if i % 2 else "ham"}, format="json"),
+        "cache-stats": lambda i: client.get("/api/cache-stats/"),
+        "metrics": lambda i: client.get("/metrics"),
+    }
+    stub_latency = args.stub_latency_ms / 1000
+    results = {"requests": n, "stub_latency_ms": args.stub_latency_ms}
+    with StubServer(latency=stub_latency) as server, patch_trust(trust, server, StubResolver(latency=stub_latency)):
+        for name, request in routes.items():
+            status = request(n).status_code  # warm-up, on a payload the timed loop doesn't use
+            if status >= 400:
+                results[name] = {"skipped": f"HTTP {status}"}
+                continue
+            samples = []
+            started = time.perf_counter()
+            for i in range(n):
+                t0 = time.perf_counter()
+                request(i)
+                samples.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - started
+            results[name] = {"requests_per_sec": round(n / elapsed, 1), **summarize(samples)}
+    return results
+
+
+GROUPS = {"import": bench_import, "predict": bench_predict, "features": bench_features, "api": bench_api}
+
+
+# Leaf numbers of a results file, as "group/name/.../key" -> value
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def higher_is_better(path):
+    return path.endswith("_per_sec")
+
+
+def compare(old_path, new_path, threshold):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"old: {old['environment']['commit']} {old['environment']['timestamp']}")
+    print(f"new: {new['environment']['commit']} {new['environment']['timestamp']}")
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    timed_keys = ("_ms", "_per_sec")
+    regressions = 0
+    for path in sorted(old_flat.keys() & new_flat.keys()):
+        if not path.endswith(timed_keys) or not old_flat[path]:
+            continue
+        change = (new_flat[path] - old_flat[path]) / old_flat[path]
+        worse = -change if higher_is_better(path) else change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif worse < -threshold:
+            flag = "  improved"
+        print(f"{path:70} {old_flat[path]:>12} {new_flat[path]:>12} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"Comma-separated groups of: {', '.join(GROUPS)}")
+    parser.add_argument("--quick", action="store_true", help="Fewer rows and requests (smoke run)")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per predict benchmark")
+    parser.add_argument("--single", type=int, default=200, help="Single-row calls per predict/feature benchmark")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per API route")
+    parser.add_argument("--import-repeat", type=int, default=5)
+    parser.add_argument("--stub-latency-ms", type=float, default=5, help="Stub latency per HTTP/DNS probe")
+    parser.add_argument("--output", help=f"Results file (default: {RESULTS_DIR.name}/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change flagged by --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    groups = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"Unknown groups: {', '.join(sorted(unknown))}")
+    if args.quick:
+        args.rows, args.single, args.requests, args.import_repeat = 400, 50, 20, 2
+
+    # Reports from the report-sms route go to a throwaway feedback store; use exported models only
+    os.environ.setdefault("FRAUDLENS_FEEDBACK_DIR", tempfile.mkdtemp(prefix="fraudlens-bench-feedback-"))
+    os.environ["FRAUDLENS_AUTO_TRAIN"] = "0"
+
+    run = {"environment": environment(), "arguments": vars(args), "results": {}}
+    for name in groups:
+        started = time.perf_counter()
+        run["results"][name] = GROUPS[name](args)
+        print(f"{name}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / "{}-{}.json".format(
+        run["environment"]["timestamp"].replace(":", "").replace("+0000", "Z"), run["environment"]["commit"] or "nogit")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(json.dumps(run["results"], indent=2))
+    print(f"Results: {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import time
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    return {
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(sum(samples) / max(len(samples), 1) * 1000, 3),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+_done = set()  # what setup_django() already did in this process
+
+
+def setup_django(database=True):
+    """Configure Django so benchmarks can drive the API through the test client.
+
+    With `database` the default database is a throwaway one with the migrations applied
+    (views record scan history): an in-memory SQLite database unless FRAUDLENS_DB says
+    otherwise, gone when the process exits. Benchmarks that time writes to a database
+    file create their own and pass database=False."""
+    import os
+
+    import django
+    from django.test.utils import setup_test_environment
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "fraudlens_backend.settings")
+    os.environ.setdefault("FRAUDLENS_DB", "sqlite")
+    django.setup()
+    if "environment" not in _done:
+        setup_test_environment()
+        _done.add("environment")
+    if database and "database" not in _done:
+        from django.db import connection
+
+        connection.creation.create_test_db(verbosity=0, serialize=False)
+        _done.add("database")
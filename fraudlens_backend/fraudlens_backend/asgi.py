@@ -11,6 +11,31 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from fraudlens_backend.preload import PRELOAD_MODELS, preload_models, start_warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fraudlens_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+# Django's handler only serves HTTP: the lifespan events are handled here, so the server's
+# event loop keeps one pooled session for the async trust probes from startup to shutdown
+async def application(scope, receive, send):
+    if scope["type"] != "lifespan":
+        return await django_application(scope, receive, send)
+    from ai_models import trust_async
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await trust_async.open_http_pool()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await trust_async.close_http_pool()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+if PRELOAD_MODELS:
+    preload_models()
+else:
+    start_warm_up()
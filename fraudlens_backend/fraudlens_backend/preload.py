@@ -0,0 +1,36 @@
+import gc
+import importlib
+import os
+
+from django.conf import settings
+
+from ai_models import artifacts, registry
+
+# How wsgi.py/asgi.py load the FRAUDLENS_MODELS['WARM_UP'] models:
+# - By default (FRAUDLENS_PRELOAD_MODELS=0) each process warms them up as configured, in a
+#   thread with BACKGROUND, so runserver and per-worker servers start serving at once and
+#   answer /api/ready/ with 503 until the models are in (start_warm_up()).
+# - FRAUDLENS_PRELOAD_MODELS=1 is for a pre-forking server that imports the app once in its
+#   master (gunicorn --preload, set by gunicorn.conf.py): the models are loaded there,
+#   synchronously, and the workers share those pages copy-on-write instead of each loading
+#   a copy (preload_models()).
+PRELOAD_MODELS = os.environ.get("FRAUDLENS_PRELOAD_MODELS", "0") == "1"
+
+
+def preload_models():
+    importlib.import_module(settings.ROOT_URLCONF)
+    # A master that forks workers never trains a missing model itself (run
+    # `manage.py train_models` first): the model is reported missing instead
+    artifacts.AUTO_TRAIN = False
+    # Not in a thread, whatever BACKGROUND says: a worker forked mid-load would get neither
+    # the models nor the thread
+    registry.warm_up(background=False)
+    # Park everything loaded so far outside the collector: a collection in a worker would
+    # otherwise write to every tracked object's header and un-share its page
+    gc.collect()
+    gc.freeze()
+
+
+# For processes that serve requests themselves and never fork
+def start_warm_up():
+    registry.warm_up()
@@ -37,7 +37,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'rest_framework',    
+    'rest_framework',
+    'api',
 ]
 
 MIDDLEWARE = [
@@ -85,6 +86,17 @@ DATABASES = {
     }
 }
 
+# FRAUDLENS_DB=sqlite: a local SQLite file instead of MySQL, e.g. to run bulk scan jobs
+# (api.jobs) on a laptop with the in-process worker, or the test suite without a MySQL
+# server: `FRAUDLENS_DB=sqlite python manage.py test` (an in-memory test database).
+if os.environ.get('FRAUDLENS_DB') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -126,3 +138,71 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'core/static')]
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# FraudLens: cache of raw trust probe results per domain/url (ai_models.reputation_cache)
+
+FRAUDLENS_REPUTATION_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TTL': 3600,  # seconds to keep a successful probe result
+    'NEGATIVE_TTL': 300,  # seconds to keep a failed probe result
+    'SHARED_CACHE': None,  # e.g. 'default' to share results across workers via CACHES
+}
+
+# FraudLens: cache of whole scoring responses (api.result_cache)
+
+FRAUDLENS_RESULT_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'default',  # alias in CACHES; a shared backend shares hits across workers
+    'TTL': 300,  # seconds; keep at or below the reputation cache's NEGATIVE_TTL
+}
+
+# FraudLens: micro-batching of single-row model calls from concurrent requests (ai_models.microbatch)
+
+FRAUDLENS_MICROBATCH = {
+    'ENABLED': True,
+    'MAX_BATCH_SIZE': 64,  # rows per vectorized predict call
+    'MAX_WAIT_MS': 0,  # extra time a batch waits for more rows; 0 = only rows that queued up meanwhile
+}
+
+# FraudLens: model loading (ai_models.registry); /api/ready/ reports which models are warm
+
+FRAUDLENS_MODELS = {
+    'WARM_UP': ('trust', 'sms'),  # loaded as a server process starts; the others on first use
+    'BACKGROUND': True,  # load in a thread so the process can answer /api/ready/ (503) meanwhile
+}
+
+# FraudLens: latency histograms and counters served at /metrics (ai_models.metrics)
+
+FRAUDLENS_METRICS = {
+    'ENABLED': True,  # False: no timing at all and /metrics returns 404
+    'BUCKETS': (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),  # seconds
+}
+
+# FraudLens: bulk scan jobs behind POST /api/jobs/ (api.jobs)
+
+FRAUDLENS_JOBS = {
+    'WORKERS': 2,  # worker threads per process; 0 = leave jobs to `manage.py process_jobs`
+    'CHUNK_SIZE': 1000,  # transactions / messages scored, then bulk-inserted, per step
+    'URL_CHUNK_SIZE': 100,  # URLs probed per step
+    'PROBE_WORKERS': 8,  # probe threads for URL jobs, separate from the API's probe pool
+    'INSERT_BATCH_SIZE': 500,  # result rows per INSERT statement
+    'UPLOAD_DIR': BASE_DIR / 'job_uploads',  # job inputs, deleted once a job is done
+}
+
+# FraudLens: scan history, the audit trail of every verdict (api.scan_history)
+
+FRAUDLENS_SCAN_HISTORY = {
+    'ENABLED': True,
+    'FLUSH_ROWS': 500,  # write as soon as this many verdicts are buffered
+    'FLUSH_INTERVAL': 1.0,  # seconds; buffered verdicts are written at least this often
+    'MAX_BUFFER': 50000,  # verdicts held in memory while the database lags; more are dropped
+    'INSERT_BATCH_SIZE': 500,  # rows per INSERT statement
+}
+
+# FraudLens: reported SMS labels (POST /api/report-sms/), learned by the live model at once;
+# authenticated users only
+
+FRAUDLENS_SMS_REPORTS = {
+    'RATE': '100/hour',  # reports per user (DRF rate syntax); None = no limit
+    'CATCH_UP_INTERVAL': 1.0,  # seconds between the SMS views' checks for other workers' reports
+}
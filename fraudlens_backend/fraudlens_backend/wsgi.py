@@ -11,6 +11,13 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from fraudlens_backend.preload import PRELOAD_MODELS, preload_models, start_warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fraudlens_backend.settings')
 
 application = get_wsgi_application()
+
+if PRELOAD_MODELS:
+    preload_models()
+else:
+    start_warm_up()
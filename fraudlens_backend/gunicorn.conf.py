@@ -0,0 +1,10 @@
+import os
+
+# gunicorn -c gunicorn.conf.py fraudlens_backend.wsgi
+# The app, and with it the FRAUDLENS_MODELS['WARM_UP'] models (see
+# fraudlens_backend/preload.py), is imported once in the master before the workers are
+# forked, so they share the loaded models. With FRAUDLENS_PRELOAD_MODELS=0 every worker
+# imports the app and warms up its own models instead.
+preload_app = os.environ.setdefault("FRAUDLENS_PRELOAD_MODELS", "1") == "1"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+bind = os.environ.get("FRAUDLENS_BIND", "127.0.0.1:8000")